@@ -1,9 +1,20 @@
+// Cloud shapes are pre-rendered once into a few sprite variants
+const CLOUD_VARIANTS = 8;
+const CLOUD_SPRITE_RES = 2; // Sprite pixels per world unit at cloud scale 1
+const CLOUD_SPRITE_HALF_W = 140; // Max puff extent from the cloud center (world units)
+const CLOUD_SPRITE_HALF_H = 105;
+
 class CloudSystem {
     constructor() {
         this.clouds = [];
         this.cloudCount = 25; // More clouds since they are smaller
         this.worldSize = 3000;
 
+        this.variants = [];
+        for (let i = 0; i < CLOUD_VARIANTS; i++) {
+            this.variants.push(this.renderVariant(this.generateComplexShapes()));
+        }
+
         for (let i = 0; i < this.cloudCount; i++) {
             this.spawnCloud(true);
         }
@@ -21,7 +32,7 @@ class CloudSystem {
             scale: 0.8 + Math.random() * 0.8, // Smaller clouds
             speed: 0.15 + Math.random() * 0.3, // Slow drift
             opacity: 0.9,
-            shapes: this.generateComplexShapes()
+            variant: Math.floor(Math.random() * this.variants.length)
         });
     }
 
@@ -47,10 +58,10 @@ class CloudSystem {
         return shapes;
     }
 
-    update() {
+    update(dt = 1) {
         for (let i = this.clouds.length - 1; i >= 0; i--) {
             let c = this.clouds[i];
-            c.x += c.speed;
+            c.x += c.speed * dt;
             if (c.x > this.worldSize / 2 + 500) {
                 this.clouds.splice(i, 1);
                 this.spawnCloud(false);
@@ -58,61 +69,72 @@ class CloudSystem {
         }
     }
 
+    // Renders the puffs and ground shadow of one cloud shape into sprites
+    renderVariant(shapes) {
+        const res = CLOUD_SPRITE_RES;
+        const w = CLOUD_SPRITE_HALF_W * 2 * res;
+        const h = CLOUD_SPRITE_HALF_H * 2 * res;
+
+        // 1. Cast Shadow on Ground (Key for depth perception)
+        // Drawn at 0.6 of the cloud size, so half the resolution is plenty
+        const shadow = createLayerCanvas(w / 2, h / 2);
+        const sctx = shadow.getContext('2d');
+        sctx.scale(res / 2, res / 2);
+        sctx.translate(CLOUD_SPRITE_HALF_W, CLOUD_SPRITE_HALF_H);
+        sctx.fillStyle = "rgba(0, 50, 0, 0.1)"; // Dark green shadow
+        sctx.beginPath();
+        for (let i = 0; i < shapes.length; i += 3) { // A few large circles are enough
+            const s = shapes[i];
+            sctx.moveTo(s.dx + s.r, s.dy);
+            sctx.arc(s.dx, s.dy, s.r, 0, Math.PI * 2);
+        }
+        sctx.fill();
+
+        // 2. Render Cloud Puffs
+        // We want a "Volumetric" look using Radial Gradients
+        const puffs = createLayerCanvas(w, h);
+        const pctx = puffs.getContext('2d');
+        pctx.scale(res, res);
+        pctx.translate(CLOUD_SPRITE_HALF_W, CLOUD_SPRITE_HALF_H);
+        for (let s of shapes) {
+            const px = s.dx;
+            const py = s.dy;
+            const r = s.r;
+
+            // Offset gradient center to top-left to simulate light source
+            const g = pctx.createRadialGradient(px - r * 0.3, py - r * 0.4, r * 0.1, px, py, r);
+
+            // Core: Bright White
+            g.addColorStop(0, "rgba(255, 255, 255, 0.95)");
+            // Mid: Fluffy White/Grey transition
+            g.addColorStop(0.5, "rgba(245, 250, 255, 0.8)");
+            // Edge: Transparent fade
+            g.addColorStop(1, "rgba(255, 255, 255, 0)");
+
+            pctx.fillStyle = g;
+            pctx.beginPath();
+            pctx.arc(px, py, r, 0, Math.PI * 2);
+            pctx.fill();
+        }
+
+        return { shadow, puffs };
+    }
+
     render(ctx) {
-        ctx.save();
+        const w = CLOUD_SPRITE_HALF_W * 2;
+        const h = CLOUD_SPRITE_HALF_H * 2;
 
         for (let c of this.clouds) {
+            const sprite = this.variants[c.variant];
+
+            // Shadow straight down on the ground, smaller than the cloud
+            const ss = c.scale * 0.6;
+            ctx.drawImage(sprite.shadow, c.x - (w / 2) * ss, c.y - (h / 2) * ss, w * ss, h * ss);
+
+            // Puffs up in the sky
             const sx = c.x;
             const sy = c.y - c.z;
-
-            // 1. Cast Shadow on Ground (Key for depth perception)
-            // Isometric shadow: straight down at y
-            // We draw a large blurred blob on the ground
-            ctx.fillStyle = "rgba(0, 50, 0, 0.1)"; // Dark green shadow
-
-            // Draw the aggregate shape of the cloud as a shadow
-            // Optimization: Just draw a few large circles for shadow to save perf
-            ctx.beginPath();
-            for (let i = 0; i < c.shapes.length; i += 3) { // Skip some for perf
-                let s = c.shapes[i];
-                let ox = s.dx * c.scale * 0.6; // Smaller shadow
-                let oy = s.dy * c.scale * 0.6;
-                let r = s.r * c.scale * 0.6;
-                ctx.moveTo(c.x + ox, c.y + oy);
-                ctx.arc(c.x + ox, c.y + oy, r, 0, Math.PI * 2);
-            }
-            ctx.fill();
-
-            // 2. Render Cloud Puffs
-            // We want a "Volumetric" look using Radial Gradients
-            // Iterate puffs
-            for (let s of c.shapes) {
-                const ox = s.dx * c.scale;
-                const oy = s.dy * c.scale;
-                const r = s.r * c.scale;
-
-                const px = sx + ox;
-                const py = sy + oy;
-
-                // Offset gradient center to top-left to simulate light source
-                const g = ctx.createRadialGradient(px - r * 0.3, py - r * 0.4, r * 0.1, px, py, r);
-
-                // Core: Bright White
-                g.addColorStop(0, "rgba(255, 255, 255, 0.95)");
-                // Mid: Fluffy White/Grey transition
-                g.addColorStop(0.5, "rgba(245, 250, 255, 0.8)");
-                // Edge: Transparent fade
-                g.addColorStop(1, "rgba(255, 255, 255, 0)");
-
-                ctx.fillStyle = g;
-
-                // Fill rect bounding box for gradient performance? Arc is fine.
-                ctx.beginPath();
-                ctx.arc(px, py, r, 0, Math.PI * 2);
-                ctx.fill();
-            }
+            ctx.drawImage(sprite.puffs, sx - (w / 2) * c.scale, sy - (h / 2) * c.scale, w * c.scale, h * c.scale);
         }
-
-        ctx.restore();
     }
 }
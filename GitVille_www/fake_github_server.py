@@ -0,0 +1,269 @@
+"""
+Offline stand-in for the GitHub REST endpoints used by fetch_stargazers.py.
+
+    python fake_github_server.py [port] [stargazers] [rate_limit] [failure_rate] [--no-last]
+    python fake_github_server.py --check
+
+Then point the fetcher at it:
+
+    GITHUB_API_URL=http://localhost:8765 python fetch_stargazers.py owner/repo 5000
+
+Serves synthetic users for /repos/<o>/<r>/stargazers, /repos/<o>/<r>/contributors
+and /users/<u>/followers. The paging, Link, ETag/304, X-RateLimit-* and 403
+behaviour follows GitHub. Responses get a little latency, and failure_rate of them
+(default 0.05) answer 502, so the retry path gets exercised too. With --no-last
+the Link header has no rel="last", like some GitHub endpoints.
+
+--check runs github_api.PageFetcher against an in-process server: paging with
+and without rel="last", waiting out the rate limit and retrying 502s.
+"""
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+DEFAULT_STARGAZERS = 3000
+DEFAULT_RATE_LIMIT = 5000
+DEFAULT_FAILURE_RATE = 0.05
+RATE_WINDOW_S = 60  # Shorter than GitHub's hour so the limit can be hit and recovered from
+LATENCY_S = (0.05, 0.2)
+MAX_PER_PAGE = 100
+
+
+def make_user(i):
+    login = f"user{i:05d}"
+    return {"login": login, "id": i, "avatar_url": f"https://avatars.example/{login}", "type": "User"}
+
+
+class FakeGitHub:
+    def __init__(self, stargazers, rate_limit, failure_rate, send_last=True,
+                 rate_window=RATE_WINDOW_S, latency=LATENCY_S):
+        self.lock = threading.Lock()
+        self.users = [make_user(i) for i in range(stargazers)]
+        self.rate_limit = rate_limit
+        self.failure_rate = failure_rate
+        self.send_last = send_last
+        self.rate_window = rate_window
+        self.latency = latency
+        self.remaining = rate_limit
+        self.reset_at = int(time.time()) + rate_window
+        self.requests = 0
+        self.fail_next = 0  # Requests that answer 502 regardless of failure_rate
+        self.rate_limited = 0  # 403s sent
+        self.failed = 0  # 502s sent
+
+    def take(self, count=True):
+        """
+        Counts a request against the rate limit. Returns (allowed, remaining, reset_at).
+        """
+        with self.lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.remaining = self.rate_limit
+                self.reset_at = int(now) + self.rate_window
+            self.requests += 1
+            if not count:
+                return True, self.remaining, self.reset_at
+            if self.remaining <= 0:
+                self.rate_limited += 1
+                return False, 0, self.reset_at
+            self.remaining -= 1
+            return True, self.remaining, self.reset_at
+
+    def fail(self):
+        """
+        Returns True if this request should answer 502.
+        """
+        with self.lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+            elif random.random() >= self.failure_rate:
+                return False
+            self.failed += 1
+            return True
+
+    def rate_headers(self, remaining, reset_at):
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset_at),
+        }
+
+    def items(self, path):
+        parts = path.strip("/").split("/")
+        if len(parts) == 4 and parts[0] == "repos" and parts[3] == "stargazers":
+            return [{"starred_at": "2024-01-01T00:00:00Z", "user": u} for u in self.users]
+        if len(parts) == 4 and parts[0] == "repos" and parts[3] == "contributors":
+            return [dict(u, contributions=1) for u in self.users[::10]]
+        if len(parts) == 3 and parts[0] == "users" and parts[2] == "followers":
+            return list(self.users)
+        return None
+
+
+def make_handler(github):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(random.uniform(*github.latency))
+            url = urllib.parse.urlparse(self.path)
+            items = github.items(url.path)
+            page_items = []
+            links = ""
+            if items is not None:
+                query = urllib.parse.parse_qs(url.query)
+                page = max(1, int(query.get("page", ["1"])[0]))
+                per_page = min(MAX_PER_PAGE, max(1, int(query.get("per_page", ["30"])[0])))
+                last = max(1, -(-len(items) // per_page))
+                start = (page - 1) * per_page
+                page_items = items[start:start + per_page]
+                links = self.links(url, query, page, last)
+            etag = '"%s"' % hashlib.sha1(json.dumps(page_items).encode()).hexdigest()
+
+            # Like GitHub, a conditional request that matches is free
+            if items is not None and self.headers.get("If-None-Match") == etag:
+                _, remaining, reset_at = github.take(count=False)
+                headers = github.rate_headers(remaining, reset_at)
+                headers["ETag"] = etag
+                if links:
+                    headers["Link"] = links
+                self.send_response(304)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                return
+
+            allowed, remaining, reset_at = github.take()
+            rate_headers = github.rate_headers(remaining, reset_at)
+            if not allowed:
+                self.send_json(403, {"message": "API rate limit exceeded"}, rate_headers)
+                return
+            if github.fail():
+                self.send_json(502, {"message": "Server Error"}, rate_headers)
+                return
+            if items is None:
+                self.send_json(404, {"message": "Not Found"}, rate_headers)
+                return
+
+            headers = dict(rate_headers)
+            headers["ETag"] = etag
+            if links:
+                headers["Link"] = links
+            self.send_json(200, page_items, headers)
+
+        def links(self, url, query, page, last):
+            def page_url(n):
+                q = {k: v[0] for k, v in query.items()}
+                q["page"] = n
+                return f"<http://{self.headers['Host']}{url.path}?{urllib.parse.urlencode(q)}>"
+
+            rels = []
+            if page < last:
+                rels.append(f'{page_url(page + 1)}; rel="next"')
+                if github.send_last:
+                    rels.append(f'{page_url(last)}; rel="last"')
+            if page > 1:
+                rels.append(f'{page_url(1)}; rel="first"')
+                rels.append(f'{page_url(page - 1)}; rel="prev"')
+            return ", ".join(rels)
+
+        def send_json(self, status, payload, headers):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def start_server(github, port=0):
+    """
+    Serves github on a daemon thread. Returns the server, port 0 picks a free one.
+    """
+    server = ThreadingHTTPServer(("localhost", port), make_handler(github))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check():
+    """
+    Runs PageFetcher against in-process servers. Returns the number of failed checks.
+    """
+    import github_api
+
+    # Retries and rate limit waits in seconds, not minutes
+    github_api.BACKOFF_BASE = 0.05
+    failures = 0
+
+    def run(name, github, expected, **fetch_args):
+        nonlocal failures
+        server = start_server(github)
+        api_base = f"http://localhost:{server.server_address[1]}"
+        fetcher = github_api.PageFetcher(api_base=api_base, per_page=10, max_workers=4)
+        started = time.time()
+        try:
+            items = fetcher.fetch_pages("/repos/o/r/stargazers", **fetch_args)
+        finally:
+            server.shutdown()
+            server.server_close()
+        logins = [item["user"]["login"] for item in items]
+        ok = logins == [u["login"] for u in github.users[:expected]]
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: {len(items)}/{expected} items, "
+              f"{github.requests} requests, {github.rate_limited} rate limited, "
+              f"{github.failed} failed, {time.time() - started:.1f}s")
+
+    quick = (0, 0.005)
+    run("pages with rel=last", FakeGitHub(95, 1000, 0, latency=quick), 95)
+    run("pages without rel=last", FakeGitHub(95, 1000, 0, send_last=False, latency=quick), 95)
+    run("limit without rel=last", FakeGitHub(95, 1000, 0, send_last=False, latency=quick), 35, limit=35)
+
+    # 4 requests per 2s window, the 10 pages need two resets
+    limited = FakeGitHub(95, 4, 0, rate_window=2, latency=quick)
+    run("rate limit wait", limited, 95)
+    failures += limited.rate_limited == 0
+
+    flaky = FakeGitHub(95, 1000, 0, send_last=False, latency=quick)
+    flaky.fail_next = 3
+    run("502 retry", flaky, 95)
+    failures += flaky.failed != 3
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    return failures
+
+
+def main():
+    if "--check" in sys.argv:
+        sys.exit(1 if check() else 0)
+    send_last = "--no-last" not in sys.argv
+    args = [arg for arg in sys.argv if arg != "--no-last"]
+    port = int(args[1]) if len(args) > 1 else DEFAULT_PORT
+    stargazers = int(args[2]) if len(args) > 2 else DEFAULT_STARGAZERS
+    rate_limit = int(args[3]) if len(args) > 3 else DEFAULT_RATE_LIMIT
+    failure_rate = float(args[4]) if len(args) > 4 else DEFAULT_FAILURE_RATE
+
+    github = FakeGitHub(stargazers, rate_limit, failure_rate, send_last)
+    server = ThreadingHTTPServer(("localhost", port), make_handler(github))
+    print(f"Fake GitHub API on http://localhost:{port} ({stargazers} users, "
+          f"{rate_limit} requests per {RATE_WINDOW_S}s, {failure_rate:.0%} failures)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {github.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,133 +1,27 @@
 import json
-import urllib.request
-import urllib.error
 import hashlib
 import math
 import sys
 import os
 
+from github_api import FetchError, HttpCache, PageFetcher
+
+# Set by main() unless --no-cache is given
+http_cache = None
+
 def get_stargazers(owner, repo, token=None, limit=1000):
-    url = f"https://api.github.com/repos/{owner}/{repo}/stargazers"
-    stargazers = []
-    page = 1
-    per_page = 50 # Reduced from 100 to improve stability
-    
-    headers = {
-        "Accept": "application/vnd.github.v3.star+json",
-        "User-Agent": "GitVille-Stargazer-Fetcher"
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-        
+    fetcher = PageFetcher(token, accept="application/vnd.github.v3.star+json",
+                          user_agent="GitVille-Stargazer-Fetcher", cache=http_cache)
     print(f"Fetching max {limit} stargazers from {owner}/{repo}...")
-    
-    import time
-    
-    while len(stargazers) < limit:
-        attempts = 0
-        success = False
-        
-        while attempts < 3:
-            try:
-                req = urllib.request.Request(f"{url}?page={page}&per_page={per_page}", headers=headers)
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    content = response.read().decode()
-                    if not content.strip():
-                        data = []
-                    else:
-                        data = json.loads(content)
-                        
-                    if not data:
-                        success = True # End of results
-                        return stargazers
-                    
-                    remaining = limit - len(stargazers)
-                    stargazers.extend(data[:remaining])
-                    
-                    print(f"Fetched page {page} (+{len(data[:remaining])}, total {len(stargazers)})")
-                    
-                    if len(data) < per_page:
-                        success = True
-                        # End of results
-                    else:
-                        success = True
-                        
-                    page += 1
-                    break
-                    
-            except (urllib.error.HTTPError, urllib.error.URLError, Exception) as e:
-                print(f"Attempt {attempts+1} failed: {e}")
-                attempts += 1
-                time.sleep(2) # Wait before retry
-                
-        if not success or (len(stargazers) >= limit):
-            if not success:
-                print("Failed to fetch page after retries.")
-            break
-            
-    return stargazers
+    return fetcher.fetch_pages(f"/repos/{owner}/{repo}/stargazers", limit=limit, label="stargazers")
 
 def get_contributors(owner, repo, token=None, limit=5000):
-    url = f"https://api.github.com/repos/{owner}/{repo}/contributors"
-    contributors = set()
-    page = 1
-    per_page = 100
-    
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "User-Agent": "GitVille-Contributor-Fetcher"
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-        
+    fetcher = PageFetcher(token, user_agent="GitVille-Contributor-Fetcher", cache=http_cache)
     print(f"Fetching contributors from {owner}/{repo}...")
-    
-    import time
-    
-    while len(contributors) < limit:
-        attempts = 0
-        success = False
-        
-        while attempts < 3:
-            try:
-                req = urllib.request.Request(f"{url}?page={page}&per_page={per_page}&anon=true", headers=headers)
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    content = response.read().decode()
-                    if not content.strip():
-                        data = []
-                    else:
-                        data = json.loads(content)
-                        
-                    if not data:
-                        success = True
-                        break
-                    
-                    for item in data:
-                        if 'login' in item:
-                            contributors.add(item['login'])
-                    
-                    print(f"Fetched contributors page {page} (+{len(data)}, total {len(contributors)})")
-                    
-                    if len(data) < per_page:
-                        success = True
-                    else:
-                        success = True
-                        
-                    page += 1
-                    break
-                    
-            except (urllib.error.HTTPError, urllib.error.URLError, Exception) as e:
-                print(f"Contributor fetch attempt {attempts+1} failed: {e}")
-                attempts += 1
-                time.sleep(2)
-                
-        if not success:
-            print("Failed to fetch contributors page after retries.")
-            break
-        if len(data) == 0: # Stop if no data returned
-            break
-            
-    return contributors
+    data = fetcher.fetch_pages(f"/repos/{owner}/{repo}/contributors", params={"anon": "true"},
+                               limit=limit, label="contributors")
+    # Anonymous contributors have no login
+    return {item['login'] for item in data if 'login' in item}
 
 def string_to_color(s):
     hash_object = hashlib.md5(s.encode())
@@ -140,198 +34,179 @@ def string_to_pseudo_random(s):
     nums = [int(hex_dig[i], 16) % 4 for i in range(5)]
     return nums
 
+# "Grand Cross" Layout
+# Hierarchy of spaces:
+# 1. House-to-House: 2 units (Dense)
+# 2. Block-to-Block: 4 units (Street)
+# 3. Quadrant-to-Quadrant: 12 units (Main Avenue)
+
+HOUSE_GAP = 2
+STREET_GAP = 2 # Reduced from 4 to be closer
+MAIN_AVENUE_WIDTH = 6
+
+CLUSTER_ROWS = 4
+CLUSTER_COLS = 4
+HOUSES_PER_BLOCK = CLUSTER_ROWS * CLUSTER_COLS
+
+# Calculate Block Size
+BLOCK_WIDTH = (CLUSTER_COLS - 1) * HOUSE_GAP
+BLOCK_HEIGHT = (CLUSTER_ROWS - 1) * HOUSE_GAP
+
+# Stride (How much space one block takes including its street)
+BLOCK_STRIDE_X = BLOCK_WIDTH + STREET_GAP
+BLOCK_STRIDE_Y = BLOCK_HEIGHT + STREET_GAP
+
+# Quadrant Multipliers
+# 0: NE (+x, -y), 1: NW (-x, -y), 2: SW (-x, +y), 3: SE (+x, +y)
+# Right: +x, Down: +y, Left: -x, Up: -y
+QUADRANTS = [
+    (1, -1),  # NE
+    (-1, -1), # NW
+    (-1, 1),  # SW
+    (1, 1)    # SE
+]
+
+# Ring road around the central house
+CENTER_RING = 2
+
+def block_position(block):
+    """
+    Block index -> (bx, by, qx, qy).
+    Blocks fill one quadrant in diagonal layers, (0,0), (1,0), (0,1), (2,0)...
+    and every position is placed in all 4 quadrants before moving on.
+    """
+    pos, q_idx = divmod(block, 4)
+    # Layer L starts at position L*(L+1)/2
+    layer = (math.isqrt(8 * pos + 1) - 1) // 2
+    bx = pos - layer * (layer + 1) // 2
+    by = layer - bx
+    qx, qy = QUADRANTS[q_idx]
+    return bx, by, qx, qy
+
+def slot_for_index(index):
+    """
+    (x, y, facing) of slot number index, in O(1). Slot 0 is the central house,
+    then blocks of HOUSES_PER_BLOCK fill outwards from the center.
+    """
+    if index == 0:
+        return 0, 0, "down"
+
+    block, i = divmod(index - 1, HOUSES_PER_BLOCK)
+    bx, by, qx, qy = block_position(block)
+
+    # Base (Start of Cluster near center), then block strides away from center
+    block_start_x = (MAIN_AVENUE_WIDTH / 2) * qx + (bx * BLOCK_STRIDE_X * qx)
+    block_start_y = (MAIN_AVENUE_WIDTH / 2) * qy + (by * BLOCK_STRIDE_Y * qy)
+
+    # Inner Grid (0..3, 0..3), expanding OUTWARDS from block start
+    ix = i % CLUSTER_COLS
+    iy = i // CLUSTER_COLS
+    house_x = block_start_x + (ix * HOUSE_GAP * qx)
+    house_y = block_start_y + (iy * HOUSE_GAP * qy)
+
+    # Facing Logic: Face the vertical axis (Left/Right)
+    facing = "left" if house_x > 0 else "right"
+    return house_x, house_y, facing
+
+def block_road_tiles(block):
+    """
+    Road tiles surrounding one block.
+    """
+    bx, by, qx, qy = block_position(block)
+
+    # Road lines indices: Inner = bx, Outer = bx+1
+    # Coordinate Formula: 0 if 0, else 2 + idx*8
+    def get_r_coord(idx):
+        if idx == 0: return 0
+        return 2 + idx * 8
+
+    rx_in = get_r_coord(bx) * qx
+    rx_out = get_r_coord(bx + 1) * qx
+    ry_in = get_r_coord(by) * qy
+    ry_out = get_r_coord(by + 1) * qy
+
+    # Sort to handle negative quadrants correctly
+    sx = int(min(rx_in, rx_out))
+    ex = int(max(rx_in, rx_out))
+    sy = int(min(ry_in, ry_out))
+    ey = int(max(ry_in, ry_out))
+
+    tiles = set()
+    # Add Horizontal Segments (Top/Bottom of block)
+    for x in range(sx, ex + 1):
+        tiles.add((x, int(ry_in)))
+        tiles.add((x, int(ry_out)))
+
+    # Add Vertical Segments (Left/Right of block)
+    for y in range(sy, ey + 1):
+        tiles.add((int(rx_in), y))
+        tiles.add((int(rx_out), y))
+    return tiles
+
+def add_center_ring(road_tiles):
+    """
+    Clears the avenues under the central house (0,0) and puts a ring road around it.
+    """
+    for i in range(-CENTER_RING, CENTER_RING + 1):
+        road_tiles.discard((0, i))
+        road_tiles.discard((i, 0))
+
+    for i in range(-CENTER_RING, CENTER_RING + 1):
+        road_tiles.add((i, -CENTER_RING))
+        road_tiles.add((i, CENTER_RING))
+        road_tiles.add((-CENTER_RING, i))
+        road_tiles.add((CENTER_RING, i))
+
 def generate_city_slots(limit):
     slots = []
     facing_dir = []
-    
-    # 0. Central House for Author
-    slots.append((0, 0))
-    facing_dir.append("down")
-    
+    for index in range(limit):
+        x, y, facing = slot_for_index(index)
+        slots.append((x, y))
+        facing_dir.append(facing)
+
     # If limit is 1, we are done
     if limit <= 1:
-        return slots, facing_dir
-        
-    # Generate remaining slots
-    limit_remaining = limit - 1
-    
-    # "Grand Cross" Layout
-    # Hierarchy of spaces:
-    # 1. House-to-House: 2 units (Dense)
-    # 2. Block-to-Block: 4 units (Street)
-    # 3. Quadrant-to-Quadrant: 12 units (Main Avenue)
-    
-    HOUSE_GAP = 2
-    STREET_GAP = 2 # Reduced from 4 to be closer
-    MAIN_AVENUE_WIDTH = 6
-    
-    CLUSTER_ROWS = 4
-    CLUSTER_COLS = 4
-    HOUSES_PER_BLOCK = CLUSTER_ROWS * CLUSTER_COLS
-    
-    # Calculate Block Size
-    BLOCK_WIDTH = (CLUSTER_COLS - 1) * HOUSE_GAP
-    BLOCK_HEIGHT = (CLUSTER_ROWS - 1) * HOUSE_GAP
-    
-    # Stride (How much space one block takes including its street)
-    BLOCK_STRIDE_X = BLOCK_WIDTH + STREET_GAP
-    BLOCK_STRIDE_Y = BLOCK_HEIGHT + STREET_GAP
-    
-    # Number of houses needed
+        return slots, facing_dir, []
+
+    # Roads cover whole diagonal layers of blocks (plus a buffer of 4),
+    # not just the blocks with houses, so the city has streets to grow into
     total_blocks = math.ceil(limit / HOUSES_PER_BLOCK)
-    
-    # We distribute blocks into 4 Quadrants symmetrically
-    # 0: NE (+x, -y), 1: NW (-x, -y), 2: SW (-x, +y), 3: SE (+x, +y)
-    # Note: Y-axis direction depends on engine. Assuming:
-    # Right: +x, Down: +y, Left: -x, Up: -y
-    
-    # Quadrant Multipliers
-    quadrants = [
-        (1, -1),  # NE
-        (-1, -1), # NW
-        (-1, 1),  # SW
-        (1, 1)    # SE
-    ]
-    
-    # We will spiral OUTWARDS in terms of "Grid Coordinates" (col, row) of blocks
-    # Logic: For each quadrant, we fill blocks in a pattern (0,0), (1,0), (0,1), (1,1)...
-    # Simple way: Imagine a single quadrant filling up diagonally (Triangle/Diamond)
-    # Layer 0: (0,0)
-    # Layer 1: (1,0), (0,1)
-    # Layer 2: (2,0), (1,1), (0,2)
-    
-    # Generate abstract block positions for ONE quadrant
-    # Then mirror them to 4 quadrants
-    
-    abstract_block_positions = []
+    positions = 0
     layer = 0
-    while len(abstract_block_positions) * 4 < total_blocks + 4: # +4 buffer
-        for x in range(layer + 1):
-            y = layer - x
-            abstract_block_positions.append((x, y))
+    while positions * 4 < total_blocks + 4:
+        positions += layer + 1
         layer += 1
-        
-    # Generate Houses
-    current_block_idx = 0
-    current_quadrant = 0
-    
-    # We iterate until we fill 'limit' houses
-    # We cycle through quadrants for each BLOCK we place.
-    # So Q1 gets Block 0, Q2 gets Block 0... then Q1 gets Block 1...
-    
-    # But wait, 'limit' is house count, not block count.
-    # We fill one block fully, then move to next block in next quadrant?
-    # Or fill all blocks partially?
-    # Better: Fill block by block.
-    
-    houses_placed = 0
+
     road_tiles = set()
-    
-    # Loop over abstract positions (0,0), (1,0)...
-    for bx, by in abstract_block_positions:
-        # For this abstract position, place it in all 4 quadrants (subject to limit)
-        
-        for q_idx in range(4):
-            if houses_placed >= limit: break
-            
-            qx, qy = quadrants[q_idx]
-            
-            # Start position of this block in World Space
-            # ALGORITHM UPDATE: Fill OUTWARDS from center.
-            # Base (Start of Cluster near center)
-            base_x = (MAIN_AVENUE_WIDTH / 2) * qx
-            base_y = (MAIN_AVENUE_WIDTH / 2) * qy
-            
-            # Add block strides (Move block origin away from center)
-            block_start_x = base_x + (bx * BLOCK_STRIDE_X * qx)
-            block_start_y = base_y + (by * BLOCK_STRIDE_Y * qy)
-            
-            # Fill the block with houses
-            for i in range(HOUSES_PER_BLOCK):
-                if houses_placed >= limit_remaining: break
-                
-                # Inner Grid (0..3, 0..3)
-                ix = i % CLUSTER_COLS
-                iy = i // CLUSTER_COLS
-                
-                # World Pos - Expanding OUTWARDS from block start
-                # qx/qy determines direction of expansion
-                house_x = block_start_x + (ix * HOUSE_GAP * qx)
-                house_y = block_start_y + (iy * HOUSE_GAP * qy)
-                
-                slots.append((house_x, house_y))
-                
-                # Facing Logic: Face the vertical axis (Left/Right)
-                if house_x > 0:
-                    facing_dir.append("left")
-                else:
-                    facing_dir.append("right")
-                
-            # Facing Logic: Face the vertical axis (Left/Right)
-                if house_x > 0:
-                    facing_dir.append("left")
-                else:
-                    facing_dir.append("right")
-                
-                houses_placed += 1
-            
-            # --- Road Generation for this Block ---
-            # We add the roads surrounding this specific block to the set.
-            # Road lines indices: Inner = bx, Outer = bx+1
-            # Coordinate Formula: 0 if 0, else 2 + idx*8
-            def get_r_coord(idx):
-                if idx == 0: return 0
-                return 2 + idx * 8
-            
-            rx_in = get_r_coord(bx) * qx
-            rx_out = get_r_coord(bx + 1) * qx
-            ry_in = get_r_coord(by) * qy
-            ry_out = get_r_coord(by + 1) * qy
-            
-            # Sort to handle negative quadrants correctly
-            sx = int(min(rx_in, rx_out))
-            ex = int(max(rx_in, rx_out))
-            sy = int(min(ry_in, ry_out))
-            ey = int(max(ry_in, ry_out))
-            
-            # Add Horizontal Segments (Top/Bottom of block)
-            for x in range(sx, ex + 1):
-                road_tiles.add((x, int(ry_in)))
-                road_tiles.add((x, int(ry_out)))
-                
-            # Add Vertical Segments (Left/Right of block)
-            for y in range(sy, ey + 1):
-                road_tiles.add((int(rx_in), y))
-                road_tiles.add((int(rx_out), y))
-                
-    if slots:
-        # --- Central House Adjustment (Post-Process) ---
-        # 1. Clear the road UNDER the central house (0,0) and immediate avenue connections
-        # to make space for the ring.
-        
-        for i in range(-2, 3):
-             if (0, i) in road_tiles: road_tiles.remove((0, i))
-             if (i, 0) in road_tiles: road_tiles.remove((i, 0))
-             
-        # 2. Add Ring Road around Central House
-        # House at 0,0. Ring at +/- 2.
-        ring_min = -2
-        ring_max = 2
-        
-        # Horizontal segments
-        for x in range(ring_min, ring_max + 1):
-            road_tiles.add((x, ring_min))
-            road_tiles.add((x, ring_max))
-            
-        # Vertical segments
-        for y in range(ring_min, ring_max + 1):
-            road_tiles.add((ring_min, y))
-            road_tiles.add((ring_max, y))
-                
+    for block in range(positions * 4):
+        road_tiles |= block_road_tiles(block)
+    add_center_ring(road_tiles)
+
     return slots, facing_dir, list(road_tiles)
 
 import random
 
+# Stargazer sync checkpoint (see sync_stargazers)
+SYNC_STATE_FILE = "sync_state.json"
+TREE_CHANCE = 0.2
+
+def make_house(username, x, y, facing, has_terrace):
+    attrs = string_to_pseudo_random(username)
+    return {
+        "x": x,
+        "y": y,
+        "color": string_to_color(username),
+        "roofStyle": attrs[0],
+        "doorStyle": attrs[1],
+        "windowStyle": attrs[2],
+        "chimneyStyle": attrs[3],
+        "wallStyle": attrs[4],
+        "username": username,
+        "facing": facing,
+        "has_terrace": has_terrace
+    }
+
 def generate_houses(stargazers, contributors, owner_name):
     # Sort
     stargazers.sort(key=lambda x: x.get('starred_at', '0'))
@@ -372,7 +247,7 @@ def generate_houses(stargazers, contributors, owner_name):
         
         place_tree = False
         if i > 0 and remaining_slots > remaining_houses:
-            if random.random() < 0.2:
+            if random.random() < TREE_CHANCE:
                 place_tree = True
                 
         if place_tree:
@@ -385,175 +260,216 @@ def generate_houses(stargazers, contributors, owner_name):
         else:
             strgzr = full_list[stargazer_idx]
             username = strgzr['user']['login']
-            attrs = string_to_pseudo_random(username)
-            facing = facings[i]
             
             # Check if contributor
             has_terrace = username in contributors
             
-            house = {
-                "x": slot_x,
-                "y": slot_y,
-                "color": string_to_color(username),
-                "roofStyle": attrs[0],
-                "doorStyle": attrs[1],
-                "windowStyle": attrs[2],
-                "chimneyStyle": attrs[3],
-                "wallStyle": attrs[4],
-                "username": username,
-                "facing": facing,
-                "has_terrace": has_terrace
-            }
+            house = make_house(username, slot_x, slot_y, facings[i], has_terrace)
             processed_houses.append(house)
             stargazer_idx += 1
 
     return processed_houses, roads
 
-def recalculate_layout(houses):
-    # Recalculate slots for the entire list (existing + new)
-    slots, facings, roads = generate_city_slots(len(houses))
-    
-    # Update positions and facings
-    for i, house in enumerate(houses):
-        if i < len(slots):
-            house['x'] = slots[i][0]
-            house['y'] = slots[i][1]
-            house['facing'] = facings[i]
-            
-    # Save Houses
-    with open("stargazers_houses.json", "w") as f:
-        json.dump(houses, f, indent=4)
-        
-    # Save Roads
-    road_data = [{"x": int(r[0]), "y": int(r[1])} for r in roads]
-    with open("roads.json", "w") as f:
-        json.dump(road_data, f, indent=4)
-        
-    print(f"Updated layout with {len(houses)} houses and {len(road_data)} road tiles.")
+def write_json(path, data):
+    # Write to a temp file first so an interrupted run never leaves half a file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
 
-def add_user(username):
-    filename = "stargazers_houses.json"
-    if not os.path.exists(filename):
-        print(f"File {filename} not found. Please run with owner/repo first to generate the base city.")
-        return
+def load_city():
+    """
+    Returns (houses, road tile set) from stargazers_houses.json and roads.json, empty if missing.
+    """
+    houses = []
+    roads = set()
+    if os.path.exists("stargazers_houses.json"):
+        with open("stargazers_houses.json", "r") as f:
+            houses = json.load(f)
+    if os.path.exists("roads.json"):
+        with open("roads.json", "r") as f:
+            roads = {(r["x"], r["y"]) for r in json.load(f)}
+    return houses, roads
 
-    with open(filename, "r") as f:
-        houses = json.load(f)
-        
-    # Check if user exists
-    if any(h.get('username') == username for h in houses):
-        print(f"User {username} already exists in the city.")
-        return
+def save_city(houses, roads):
+    write_json("stargazers_houses.json", houses)
+    write_json("roads.json", [{"x": int(x), "y": int(y)} for x, y in sorted(roads)])
 
-    # Generate attributes for new user
-    attrs = string_to_pseudo_random(username)
-    
-    # Create new house object (position will be set by recalculate_layout)
-    new_house = {
-        "x": 0, "y": 0, # Placeholders
-        "color": string_to_color(username),
-        "roofStyle": attrs[0],
-        "doorStyle": attrs[1],
-        "windowStyle": attrs[2],
-        "chimneyStyle": attrs[3],
-        "wallStyle": attrs[4],
-        "username": username,
-        "facing": "down",
-        "has_terrace": False # Default for manual add
-    }
-    
-    # Randomly add a tree before the user (20% chance) to maintain density
-    if random.random() < 0.2:
-        print("Randomly planting a new tree...")
-        houses.append({
-            "x": 0, "y": 0, # Position set by recalculate_layout
-            "obstacle": "tree"
-        })
-    
-    houses.append(new_house)
-    print(f"Adding new house for {username}...")
-    recalculate_layout(houses)
+def append_to_city(houses, roads, entry):
+    """
+    Places entry (house or tree) in the next free slot. Slots are used in
+    order, so that's slot len(houses). Opening a new block adds its roads.
+    """
+    index = len(houses)
+    x, y, facing = slot_for_index(index)
+    entry["x"] = x
+    entry["y"] = y
+    if "username" in entry:
+        entry["facing"] = facing
+    houses.append(entry)
+
+    if index > 0 and (index - 1) % HOUSES_PER_BLOCK == 0:
+        new_tiles = block_road_tiles((index - 1) // HOUSES_PER_BLOCK) - roads
+        if new_tiles:
+            roads |= new_tiles
+            add_center_ring(roads)
+
+def load_sync_state(repo_name, per_page):
+    if not os.path.exists(SYNC_STATE_FILE):
+        return {}
+    with open(SYNC_STATE_FILE, "r") as f:
+        state = json.load(f)
+    # Page numbers only mean something for the same repo and page size
+    if state.get("repo") != repo_name or state.get("per_page") != per_page:
+        return {}
+    return state
+
+def sync_stargazers(owner, repo, token=None, limit=None):
+    """
+    Adds stargazers newer than the last sync to the existing city, without
+    re-laying it out. Stargazers come in starred_at order, so new ones are
+    on the checkpointed page or after it. After each page the city is
+    written, then the checkpoint, so an interrupted run resumes on that page.
+    limit caps how many new stargazers are added per run.
+    """
+    repo_name = f"{owner}/{repo}"
+    fetcher = PageFetcher(token, accept="application/vnd.github.v3.star+json",
+                          user_agent="GitVille-Stargazer-Fetcher", cache=http_cache)
+    state = load_sync_state(repo_name, fetcher.per_page)
+    start = state.get("page", 1)
+    # Don't prefetch pages past what the limit can use (one extra for the overlap)
+    max_page = start + -(-limit // fetcher.per_page) if limit is not None else None
+
+    contributors = get_contributors(owner, repo, token)
+    houses, roads = load_city()
+    if not houses:
+        append_to_city(houses, roads, make_house(owner, 0, 0, "down", owner in contributors))
+
+    # Dedupe by login, the checkpoint page is fetched again on every sync
+    known = {h["username"] for h in houses if "username" in h}
+    added = 0
+
+    print(f"Syncing stargazers of {repo_name} from page {start} "
+          f"(last seen: {state.get('login', 'none')} at {state.get('starred_at', '-')})...")
+    try:
+        for page, data in fetcher.iter_pages(f"/repos/{owner}/{repo}/stargazers", start=start,
+                                             max_page=max_page):
+            data.sort(key=lambda x: x.get('starred_at', '0'))
+            for item in data:
+                if limit is not None and added >= limit:
+                    break
+                username = item['user']['login']
+                if username in known:
+                    continue
+                if random.random() < TREE_CHANCE:
+                    append_to_city(houses, roads, {"x": 0, "y": 0, "obstacle": "tree"})
+                append_to_city(houses, roads, make_house(username, 0, 0, "down", username in contributors))
+                known.add(username)
+                added += 1
+                state["login"] = username
+                state["starred_at"] = item.get("starred_at")
+
+            # Houses first: if we stop in between, the page is fetched again and deduped
+            save_city(houses, roads)
+            state.update(repo=repo_name, per_page=fetcher.per_page, page=page, count=len(known))
+            write_json(SYNC_STATE_FILE, state)
+            print(f"Synced page {page} (+{len(data)} stargazers, {added} new)")
+
+            if limit is not None and added >= limit:
+                print(f"Reached limit of {limit} new stargazers, run again to continue.")
+                break
+    except FetchError as e:
+        print(f"Sync stopped: {e}. Run again to resume from page {state.get('page', start)}.")
+
+    print(f"Added {added} stargazers, city has {len(houses)} plots and {len(roads)} road tiles.")
+
+def add_users(usernames):
+    """
+    Appends houses for usernames to the existing city in one pass. New
+    houses go into the next free slots, roads are only added for newly
+    opened blocks, and both files are written once at the end.
+    """
+    if not os.path.exists("stargazers_houses.json"):
+        print("File stargazers_houses.json not found. Please run with owner/repo first to generate the base city.")
+        return 0
+
+    houses, roads = load_city()
+    known = {h["username"] for h in houses if "username" in h}
+    added = 0
+
+    for username in usernames:
+        if username in known:
+            print(f"User {username} already exists in the city.")
+            continue
+
+        # Randomly add a tree before the user (20% chance) to maintain density
+        if random.random() < TREE_CHANCE:
+            print("Randomly planting a new tree...")
+            append_to_city(houses, roads, {"x": 0, "y": 0, "obstacle": "tree"})
+
+        # has_terrace defaults to False for manual add
+        print(f"Adding new house for {username}...")
+        append_to_city(houses, roads, make_house(username, 0, 0, "down", False))
+        known.add(username)
+        added += 1
+
+    if added:
+        save_city(houses, roads)
+        print(f"Updated city with {len(houses)} plots and {len(roads)} road tiles.")
+    return added
+
+def add_user(username):
+    return add_users([username])
+
+def read_usernames(path):
+    """
+    One username per line. Blank lines and # comments are skipped.
+    """
+    with open(path, "r") as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return [line for line in lines if line]
 
 def get_followers(username, token=None, limit=1000):
-    url = f"https://api.github.com/users/{username}/followers"
-    followers = []
-    page = 1
-    per_page = 100
-    
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "User-Agent": "GitVille-Follower-Fetcher"
-    }
-    if token:
-        headers["Authorization"] = f"token {token}"
-        
+    fetcher = PageFetcher(token, user_agent="GitVille-Follower-Fetcher", cache=http_cache)
     print(f"Fetching max {limit} followers for user {username}...")
-    
-    import time
-    
-    while len(followers) < limit:
-        attempts = 0
-        success = False
-        
-        while attempts < 3:
-            try:
-                req = urllib.request.Request(f"{url}?page={page}&per_page={per_page}", headers=headers)
-                with urllib.request.urlopen(req, timeout=10) as response:
-                    content = response.read().decode()
-                    if not content.strip():
-                        data = []
-                    else:
-                        data = json.loads(content)
-                        
-                    if not data:
-                        success = True
-                        return followers
-                    
-                    # Wrap followers to match stargazer structure: {'user': user_obj}
-                    # API returns list of users directly: [{'login':...}, ...]
-                    wrapped_data = [{'user': user} for user in data]
-                    
-                    remaining = limit - len(followers)
-                    followers.extend(wrapped_data[:remaining])
-                    
-                    print(f"Fetched followers page {page} (+{len(wrapped_data[:remaining])}, total {len(followers)})")
-                    
-                    if len(data) < per_page:
-                        success = True
-                    else:
-                        success = True
-                        
-                    page += 1
-                    break
-                    
-            except (urllib.error.HTTPError, urllib.error.URLError, Exception) as e:
-                print(f"Follower fetch attempt {attempts+1} failed: {e}")
-                attempts += 1
-                time.sleep(2)
-                
-        if not success or (len(followers) >= limit):
-            if not success:
-                print("Failed to fetch followers page after retries.")
-            break
-            
-    return followers
+    data = fetcher.fetch_pages(f"/users/{username}/followers", limit=limit, label="followers")
+    # Wrap followers to match stargazer structure: {'user': user_obj}
+    # API returns list of users directly: [{'login':...}, ...]
+    return [{'user': user} for user in data]
 
 def main():
+    global http_cache
+
     if len(sys.argv) < 2:
-        print("Usage: python fetch_stargazers.py owner/repo [count] [token]")
+        print("Usage: python fetch_stargazers.py owner/repo [count] [token] [--no-cache] [--sync]")
         print("       python fetch_stargazers.py username (to add single user)")
+        print("       python fetch_stargazers.py --add-users users.txt (one username per line)")
         repo_input = "n8n-io/n8n"
+    elif sys.argv[1] == "--add-users":
+        if len(sys.argv) < 3:
+            print("Usage: python fetch_stargazers.py --add-users users.txt")
+            return
+        usernames = read_usernames(sys.argv[2])
+        print(f"Adding {len(usernames)} users from {sys.argv[2]} to existing city...")
+        add_users(usernames)
+        return
     else:
         repo_input = sys.argv[1]
     
     # Defaults
     limit = 100
     token = os.environ.get("GITHUB_TOKEN")
+    use_cache = True
+    sync = False
     
-    # Parse optional args (count or token)
+    # Parse optional args (count, token, --no-cache or --sync)
     if len(sys.argv) > 2:
         for arg in sys.argv[2:]:
-            if arg.isdigit():
+            if arg == "--no-cache":
+                use_cache = False
+            elif arg == "--sync":
+                sync = True
+            elif arg.isdigit():
                 limit = int(arg)
             else:
                 token = arg
@@ -567,6 +483,18 @@ def main():
     owner, repo = repo_input.split('/')
     
     print(f"Fetch limit set to: {limit}")
+    if use_cache:
+        http_cache = HttpCache()
+
+    if sync:
+        if owner == repo:
+            # Followers come newest first, there is no stable page to resume from
+            print("Sync mode only works for stargazers, not for profile repositories.")
+            return
+        sync_stargazers(owner, repo, token, limit=limit)
+        if http_cache:
+            print(http_cache.summary())
+        return
     
     # Special Case: Profile Repo (owner == repo) -> Fetch Followers
     if owner == repo:
@@ -591,6 +519,8 @@ def main():
             
         print(f"Successfully generated {len(houses)} houses in stargazers_houses.json")
         print(f"Successfully generated {len(road_data)} road tiles in roads.json")
+        if http_cache:
+            print(http_cache.summary())
     else:
         print("Error fetching users.")
 
@@ -150,24 +150,50 @@ def string_to_pseudo_random(s):
 
 # --- Main Logic ---
 # --- Main Logic ---
+def load_summary_dates(diary_path):
+    """
+    Non-empty days from the diary_summary.json the app keeps next to the
+    diary, or None if there is none or it is older than the diary.
+    """
+    summary_path = os.path.join(os.path.dirname(diary_path), "diary_summary.json")
+    try:
+        with open(summary_path, "r") as f:
+            summary = json.load(f)
+        st = os.stat(diary_path)
+    except (OSError, ValueError):
+        return None
+    if summary.get("version") != 1 or summary.get("source") != [st.st_mtime_ns, st.st_size]:
+        return None
+    return [d for d, row in summary.get("days", {}).items() if row.get("preview") or row.get("tags")]
+
+
 def generate(diary_path, output_dir):
     if not os.path.exists(diary_path):
         print(f"diary_data.json not found at {diary_path}")
         return
 
-    with open(diary_path, "r") as f:
-        try:
-            data = json.load(f)
-        except:
-            data = {}
+    # The app's summary table knows which days have text, without the answers
+    valid_dates = load_summary_dates(diary_path)
+    if valid_dates is None:
+        with open(diary_path, "r") as f:
+            try:
+                data = json.load(f)
+            except:
+                data = {}
             
-    # Filter valid entries (non-empty)
-    # The user manual said "if i entry anything"
-    valid_dates = []
-    for date_str, entries in data.items():
-        # Check if there's any non-empty answer
-        if any(v.strip() for v in entries.values()):
-            valid_dates.append(date_str)
+        # Filter valid entries (non-empty)
+        # The user manual said "if i entry anything"
+        valid_dates = []
+        if data.get("version") == 2:
+            # Schema layout: answers are a list, tags are kept next to them
+            for date_str, entry in data.get("entries", {}).items():
+                if entry.get("tags") or any(a.strip() for a in entry.get("answers", [])):
+                    valid_dates.append(date_str)
+        else:
+            for date_str, entries in data.items():
+                # Check if there's any non-empty answer (or tags)
+                if any(v if isinstance(v, list) else v.strip() for v in entries.values()):
+                    valid_dates.append(date_str)
             
     # Sort dates (Oldest first? Or Newest? Grand Cross usually centers the "first" or "main" one)
     # Let's sort oldest first so the city grows outwards as time passes.
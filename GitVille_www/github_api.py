@@ -0,0 +1,299 @@
+"""
+Paginated GitHub REST fetching for fetch_stargazers.py.
+
+Pages are requested in parallel by a small thread pool. The number of pages
+comes from the rel="last" link of the first page; without one the rel="next"
+links are followed one page at a time. X-RateLimit-Remaining/Reset
+are tracked so workers pause before the budget runs out. Failed requests
+are retried with exponential backoff.
+
+With an HttpCache, responses are stored on disk with their ETag and
+Last-Modified, and later runs send conditional requests. A 304 reuses
+the stored page and doesn't count against the rate limit.
+
+Set GITHUB_API_URL to point at another server, e.g. fake_github_server.py.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+API_BASE = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+PER_PAGE = 100  # GitHub maximum
+MAX_WORKERS = 4  # Parallel page requests
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0  # Seconds, doubled on every retry
+BACKOFF_MAX = 60.0
+RATE_LIMIT_RESERVE = 0  # Requests to keep in hand before pausing for the reset
+HTTP_CACHE_DIR = ".http_cache"
+
+LINK_RE = re.compile(r'<([^>]+)>;\s*rel="([^"]+)"')
+
+
+class FetchError(Exception):
+    pass
+
+
+def parse_link_header(value):
+    """
+    Returns {rel: url} from a Link header.
+    """
+    return {rel: url for url, rel in LINK_RE.findall(value or "")}
+
+
+def page_from_url(url):
+    """
+    Returns the page parameter of url, or None if there is none.
+    """
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(url or "").query)
+    try:
+        return int(query["page"][0])
+    except (KeyError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Shared view of the API rate limit, updated from response headers.
+    wait() blocks while the budget is used up, until the reset time.
+    """
+
+    def __init__(self, reserve=RATE_LIMIT_RESERVE):
+        self.lock = threading.Lock()
+        self.reserve = reserve
+        self.remaining = None
+        self.reset_at = 0.0
+
+    def update(self, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        with self.lock:
+            if remaining is not None and remaining.isdigit():
+                self.remaining = int(remaining)
+            if reset is not None and reset.isdigit():
+                self.reset_at = float(reset)
+
+    def limited(self, headers):
+        """
+        Called on 403/429 responses. Returns seconds to wait, or None if it isn't a rate limit.
+        """
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        self.update(headers)
+        with self.lock:
+            if self.remaining == 0 and self.reset_at:
+                return max(1.0, self.reset_at - time.time() + 1)
+        return None
+
+    def wait(self):
+        while True:
+            with self.lock:
+                if self.remaining is None or self.remaining > self.reserve:
+                    # Optimistically reserve one request
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return
+                delay = self.reset_at - time.time() + 1
+                if delay <= 0:
+                    # Reset passed, the next response refreshes the numbers
+                    self.remaining = None
+                    return
+            print(f"Rate limit reached, waiting {delay:.0f}s for reset...")
+            time.sleep(min(delay, BACKOFF_MAX))
+
+
+class HttpCache:
+    """
+    Response cache on disk, one JSON file per URL (and Accept header).
+    Each file stores the body with its ETag, Last-Modified and Link headers.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.hits = 0  # 304 Not Modified
+        self.misses = 0  # Full 200 responses
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url, accept):
+        key = hashlib.sha1(f"{accept} {url}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, url, accept):
+        try:
+            with open(self._path(url, accept)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, accept, headers, data):
+        if not headers.get("ETag") and not headers.get("Last-Modified"):
+            return
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "link": headers.get("Link"),
+            "data": data,
+        }
+        path = self._path(url, accept)
+        # Workers write different files, the thread id keeps temp names apart anyway
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.misses += 1
+
+    def hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def summary(self):
+        return f"HTTP cache: {self.hits} pages not modified, {self.misses} fetched"
+
+
+class PageFetcher:
+    def __init__(self, token=None, accept="application/vnd.github.v3+json",
+                 user_agent="GitVille-Fetcher", max_workers=MAX_WORKERS,
+                 per_page=PER_PAGE, api_base=None, cache=None):
+        self.headers = {"Accept": accept, "User-Agent": user_agent}
+        if token:
+            self.headers["Authorization"] = f"token {token}"
+        self.max_workers = max_workers
+        self.per_page = per_page
+        self.api_base = (api_base or API_BASE).rstrip("/")
+        self.rate_limiter = RateLimiter()
+        self.cache = cache
+
+    def page_url(self, path, page, params=None):
+        query = dict(params or {})
+        query.update({"page": page, "per_page": self.per_page})
+        return f"{self.api_base}{path}?{urllib.parse.urlencode(query)}"
+
+    def request(self, url):
+        """
+        GETs url with retries. Returns (data, headers). Raises FetchError when out of attempts.
+        """
+        accept = self.headers["Accept"]
+        cached = self.cache.get(url, accept) if self.cache else None
+        headers = dict(self.headers)
+        if cached:
+            headers.update(self.cache.conditional_headers(cached))
+
+        for attempt in range(MAX_ATTEMPTS):
+            self.rate_limiter.wait()
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (0.5 + random.random())
+            try:
+                req = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(req, timeout=10) as response:
+                    self.rate_limiter.update(response.headers)
+                    content = response.read().decode()
+                    data = json.loads(content) if content.strip() else []
+                    if self.cache:
+                        self.cache.put(url, accept, response.headers, data)
+                    return data, response.headers
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and cached:
+                    # urllib raises on 304, the stored page is still current
+                    self.rate_limiter.update(e.headers)
+                    self.cache.hit()
+                    return cached["data"], {"Link": e.headers.get("Link") or cached.get("link")}
+                if e.code in (403, 429):
+                    wait = self.rate_limiter.limited(e.headers)
+                    if wait is None:
+                        raise FetchError(f"{url}: HTTP {e.code}")
+                    delay = wait
+                elif e.code < 500:
+                    # Client errors (404, 422...) won't get better by retrying
+                    raise FetchError(f"{url}: HTTP {e.code}")
+                print(f"Attempt {attempt + 1} failed: HTTP {e.code}")
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                print(f"Attempt {attempt + 1} failed: {e}")
+            if attempt < MAX_ATTEMPTS - 1:
+                time.sleep(delay)
+        raise FetchError(f"{url}: giving up after {MAX_ATTEMPTS} attempts")
+
+    def iter_pages(self, path, params=None, start=1, max_page=None):
+        """
+        Yields (page, items) in page order, beginning at start.
+        The start page is fetched first. If its Link header has rel="last",
+        the remaining pages are requested in parallel. Without it the pages
+        are followed one rel="next" at a time. Raises FetchError when a page
+        can't be fetched.
+        """
+        first, headers = self.request(self.page_url(path, start, params))
+        yield start, first
+
+        links = parse_link_header(headers.get("Link"))
+        if not first or "next" not in links:
+            return
+        last_page = page_from_url(links.get("last"))
+        if last_page is None:
+            yield from self._follow_next(links["next"], start, max_page)
+            return
+        if max_page is not None:
+            last_page = min(last_page, max_page)
+
+        pages = range(start + 1, last_page + 1)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.request, self.page_url(path, page, params)) for page in pages]
+            try:
+                for page, future in zip(pages, futures):
+                    data, _ = future.result()
+                    yield page, data
+                    if not data:
+                        return
+            finally:
+                # Stopped early (error or the caller has enough), drop the queued pages
+                for future in futures:
+                    future.cancel()
+
+    def _follow_next(self, url, page, max_page=None):
+        """
+        Yields (page, items) by following rel="next" links, for servers that
+        don't send rel="last". page is the number of the page url follows.
+        """
+        while url:
+            page = page_from_url(url) or page + 1
+            if max_page is not None and page > max_page:
+                return
+            data, headers = self.request(url)
+            yield page, data
+            if not data:
+                return
+            url = parse_link_header(headers.get("Link")).get("next")
+
+    def fetch_pages(self, path, params=None, limit=None, label="items"):
+        """
+        Fetches up to limit items from a paginated endpoint, in page order.
+        If a page fails, the items of the pages before it are returned.
+        """
+        items = []
+        max_page = -(-limit // self.per_page) if limit is not None else None
+        try:
+            for page, data in self.iter_pages(path, params, max_page=max_page):
+                items.extend(data)
+                print(f"Fetched {label} page {page} (+{len(data)}, total {len(items)})")
+                if limit is not None and len(items) >= limit:
+                    break
+        except FetchError as e:
+            print(f"Failed to fetch {label}: {e}")
+
+        return items[:limit] if limit is not None else items
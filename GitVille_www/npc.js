@@ -1,3 +1,13 @@
+const NPC_COLORS = ['#e74c3c', '#3498db', '#f1c40f', '#9b59b6', '#e67e22', '#1abc9c'];
+
+// Road walkers: population scales with the city
+const NPC_PER_HOUSE = 0.25;
+const NPC_MIN = 15;
+const NPC_MAX = 1500;
+const NPC_GRID_SCALE = 50; // NPC coords are Cartesian (Grid * TILE_WIDTH / 2)
+const NPC_STRIDE = 4; // Packed walker layout: x, y, color index, facing (-1/1)
+const NPC_TICK_ACTIVE_MS = 1000 / 30; // Worker tick while the user interacts
+
 class NPC {
     constructor(id, x, y, isTemporary = false, homeX = 0, homeY = 0) {
         this.id = id;
@@ -28,14 +38,14 @@ class NPC {
     }
 
     getRandomColor() {
-        const colors = ['#e74c3c', '#3498db', '#f1c40f', '#9b59b6', '#e67e22', '#1abc9c'];
-        return colors[Math.floor(Math.random() * colors.length)];
+        return NPC_COLORS[Math.floor(Math.random() * NPC_COLORS.length)];
     }
 
-    update() {
+    // dt: elapsed time in 60fps frames (1 at full frame rate)
+    update(dt = 1) {
         // Simple AI State Machine
         if (this.state === 'idle') {
-            this.idleTimer--;
+            this.idleTimer -= dt;
             this.bounce = 0;
             if (this.idleTimer <= 0) {
                 if (this.isTemporary && this.lifeTime <= 0) {
@@ -47,10 +57,10 @@ class NPC {
                 }
             }
         } else if (this.state === 'moving' || this.state === 'returning') {
-            this.move();
+            this.move(dt);
         }
 
-        if (this.isTemporary) this.lifeTime--;
+        if (this.isTemporary) this.lifeTime -= dt;
     }
 
     pickNewTarget() {
@@ -64,7 +74,7 @@ class NPC {
         this.state = 'moving';
     }
 
-    move() {
+    move(dt = 1) {
         const dx = this.targetX - this.x;
         const dy = this.targetY - this.y;
         const dist = Math.sqrt(dx * dx + dy * dy);
@@ -82,27 +92,33 @@ class NPC {
             return;
         }
 
-        // Normalize and move
-        this.x += (dx / dist) * this.speed;
-        this.y += (dy / dist) * this.speed;
+        // Normalize and move (never overshoot the target on long steps)
+        const step = Math.min(this.speed * dt, dist);
+        this.x += (dx / dist) * step;
+        this.y += (dy / dist) * step;
 
         // Bouncing animation
         this.bounce = Math.abs(Math.sin(Date.now() * 0.01)) * 2;
     }
 
     render(ctx) {
-        // Draw Isometric Character ("Chibi" Style)
-
         // Iso Projection
         const screenX = (this.x - this.y);
-        const screenY = (this.x + this.y) * 0.5 - this.z - this.bounce;
+        const screenY = (this.x + this.y) * 0.5 - this.z;
+        const dirX = (this.targetX - this.x > 0) ? 1 : -1;
+        NPC.draw(ctx, screenX, screenY, this.color, this.bounce, dirX);
+    }
+
+    // Draw Isometric Character ("Chibi" Style) standing at screenX/screenY
+    static draw(ctx, screenX, groundY, color, bounce, dirX) {
+        const screenY = groundY - bounce;
 
         // Shadow
         ctx.fillStyle = "rgba(0,0,0,0.2)";
         ctx.beginPath();
         // Shadow scales slightly with bounce to fake height
-        const sS = 1 - this.bounce * 0.1;
-        ctx.ellipse(screenX, screenY + this.bounce + 1, 6 * sS, 3.5 * sS, 0, 0, Math.PI * 2);
+        const sS = 1 - bounce * 0.1;
+        ctx.ellipse(screenX, screenY + bounce + 1, 6 * sS, 3.5 * sS, 0, 0, Math.PI * 2);
         ctx.fill();
 
         // Dimensions
@@ -111,7 +127,7 @@ class NPC {
         const headRad = 7; // Big head
 
         // Body (Rounded Rect / "Bean" shape)
-        ctx.fillStyle = this.color;
+        ctx.fillStyle = color;
 
         // Simple Rounded drawing
         ctx.beginPath();
@@ -140,7 +156,7 @@ class NPC {
         // Let's stick to the color but lighter for face area.
 
         // Draw "Hood" (Main Color)
-        ctx.fillStyle = this.color;
+        ctx.fillStyle = color;
         ctx.beginPath();
         ctx.arc(screenX, headY, headRad, 0, Math.PI * 2);
         ctx.fill();
@@ -152,9 +168,6 @@ class NPC {
         ctx.fill();
 
         // Eyes (Wide set, dot eyes)
-        const dx = this.targetX - this.x;
-        const dirX = (dx > 0) ? 1 : -1;
-
         ctx.fillStyle = "#2d3436";
         const eyeOff = 2.5;
         // Left Eye
@@ -169,18 +182,181 @@ class NPC {
     }
 }
 
+// Moves walkers along the road graph. Has no DOM dependencies so it can
+// run in npc_worker.js or, as a fallback, on the main thread.
+class NPCSimulation {
+    constructor(roadKeys, count, scale = NPC_GRID_SCALE) {
+        this.scale = scale;
+
+        // Road graph: one node per road tile, up to 4 neighbours (N, S, E, W)
+        const n = roadKeys.length;
+        const index = new Map();
+        this.nodeX = new Int32Array(n);
+        this.nodeY = new Int32Array(n);
+        roadKeys.forEach((key, i) => {
+            const [x, y] = key.split(',').map(Number);
+            this.nodeX[i] = x;
+            this.nodeY[i] = y;
+            index.set(key, i);
+        });
+
+        this.adj = new Int32Array(n * 4).fill(-1);
+        const dirs = [[0, -1], [0, 1], [1, 0], [-1, 0]];
+        for (let i = 0; i < n; i++) {
+            dirs.forEach(([dx, dy], d) => {
+                const nb = index.get(`${this.nodeX[i] + dx},${this.nodeY[i] + dy}`);
+                if (nb !== undefined) this.adj[i * 4 + d] = nb;
+            });
+        }
+
+        // Walker state (structure of arrays)
+        this.count = n > 0 ? count : 0;
+        this.from = new Int32Array(this.count);
+        this.to = new Int32Array(this.count);
+        this.progress = new Float32Array(this.count); // 0..1 along the current edge
+        this.speed = new Float32Array(this.count); // Units per 60fps frame
+        this.lane = new Float32Array(this.count); // Sidewalk offset from the road center
+        this.color = new Uint8Array(this.count);
+
+        for (let i = 0; i < this.count; i++) {
+            this.from[i] = Math.floor(Math.random() * n);
+            this.to[i] = this.pickNext(this.from[i], -1);
+            this.progress[i] = Math.random();
+            this.speed[i] = 0.5 + Math.random() * 0.5;
+            this.lane[i] = (Math.random() < 0.5 ? -1 : 1) * (17 + Math.random() * 5);
+            this.color[i] = Math.floor(Math.random() * NPC_COLORS.length);
+        }
+    }
+
+    // Random neighbour of node, avoiding U-turns unless at a dead end
+    pickNext(node, prev) {
+        let choice = -1;
+        let options = 0;
+        for (let d = 0; d < 4; d++) {
+            const nb = this.adj[node * 4 + d];
+            if (nb < 0 || nb === prev) continue;
+            options++;
+            if (Math.random() * options < 1) choice = nb;
+        }
+        if (choice >= 0) return choice;
+        return prev >= 0 ? prev : node;
+    }
+
+    step(dt = 1) {
+        for (let i = 0; i < this.count; i++) {
+            let p = this.progress[i] + (this.speed[i] * dt) / this.scale;
+            while (p >= 1) {
+                p -= 1;
+                const next = this.pickNext(this.to[i], this.from[i]);
+                this.from[i] = this.to[i];
+                this.to[i] = next;
+            }
+            this.progress[i] = p;
+        }
+    }
+
+    // Writes x, y, color index and facing of every walker into out (NPC_STRIDE floats each)
+    pack(out) {
+        for (let i = 0; i < this.count; i++) {
+            const a = this.from[i];
+            const b = this.to[i];
+            const p = this.progress[i];
+            const dx = this.nodeX[b] - this.nodeX[a];
+            const dy = this.nodeY[b] - this.nodeY[a];
+            let x = (this.nodeX[a] + dx * p) * this.scale;
+            let y = (this.nodeY[a] + dy * p) * this.scale;
+            // Walk on the sidewalk beside the direction of travel
+            if (dx !== 0) y += this.lane[i];
+            else x += this.lane[i];
+
+            const o = i * NPC_STRIDE;
+            out[o] = x;
+            out[o + 1] = y;
+            out[o + 2] = this.color[i];
+            out[o + 3] = (dx - dy) >= 0 ? 1 : -1; // Screen x direction
+        }
+        return out;
+    }
+}
+
 class NPCManager {
-    constructor(count = 10) {
-        this.npcs = [];
-        for (let i = 0; i < count; i++) {
-            this.npcs.push(new NPC(i, (Math.random() - 0.5) * 2000, (Math.random() - 0.5) * 2000));
+    constructor(count = 10, roads = null) {
+        this.npcs = []; // Wanderers and temporary residents, simulated here
+        this.walkers = null; // Latest packed road walker positions (see NPC_STRIDE)
+        this.walkerCount = 0;
+        this.sim = null; // Main thread fallback when workers are unavailable
+        this.worker = null;
+        this.tickRate = NPC_TICK_ACTIVE_MS;
+
+        if (roads && roads.size > 0) {
+            this.startRoadSimulation(Array.from(roads), count);
+        } else {
+            for (let i = 0; i < count; i++) {
+                this.npcs.push(new NPC(i, (Math.random() - 0.5) * 2000, (Math.random() - 0.5) * 2000));
+            }
+        }
+    }
+
+    static countForCity(houseCount) {
+        return Math.max(NPC_MIN, Math.min(NPC_MAX, Math.round(houseCount * NPC_PER_HOUSE)));
+    }
+
+    startRoadSimulation(roadKeys, count) {
+        const fallback = () => {
+            if (this.worker) this.worker.terminate();
+            this.worker = null;
+            this.sim = new NPCSimulation(roadKeys, count);
+            this.walkerCount = this.sim.count;
+            this.walkers = new Float32Array(this.sim.count * NPC_STRIDE);
+            this.sim.pack(this.walkers);
+        };
+
+        if (typeof Worker === 'undefined') {
+            fallback();
+            return;
         }
+        try {
+            this.worker = new Worker('npc_worker.js');
+        } catch (e) {
+            // e.g. pages opened from file://
+            fallback();
+            return;
+        }
+        this.worker.onmessage = (e) => this.onWorkerMessage(e.data);
+        this.worker.onerror = () => fallback();
+        this.worker.postMessage({ type: 'init', roads: roadKeys, count, rate: this.tickRate });
+    }
+
+    onWorkerMessage(msg) {
+        if (msg.type !== 'positions') return;
+        // Hand the previous buffer back so the worker can reuse it
+        if (this.walkers && this.walkers.length === msg.buffer.length) {
+            this.worker.postMessage({ type: 'recycle', buffer: this.walkers }, [this.walkers.buffer]);
+        }
+        this.walkers = msg.buffer;
+        this.walkerCount = msg.count;
+    }
+
+    // Worker tick interval in ms, 0 pauses the simulation
+    setTickRate(ms) {
+        if (ms === this.tickRate) return;
+        this.tickRate = ms;
+        if (this.worker) this.worker.postMessage({ type: 'rate', rate: ms });
+    }
+
+    isActive() {
+        return this.npcs.length > 0 || this.walkerCount > 0;
     }
 
-    update() {
-        this.npcs.forEach(npc => npc.update());
+    update(dt = 1) {
+        this.npcs.forEach(npc => npc.update(dt));
         // Remove dead NPCs
         this.npcs = this.npcs.filter(npc => !npc.shouldDelete);
+
+        if (this.sim) {
+            this.sim.step(dt);
+            this.sim.pack(this.walkers);
+        }
     }
 
     spawnNPC(x, y) {
@@ -195,14 +371,66 @@ class NPCManager {
         this.npcs.push(new NPC(id, x + 5, y + 5, true, x, y));
     }
 
-    render(ctx) {
+    // bounds: optional world space rect {left, top, right, bottom} to cull against
+    // simple: draw each NPC as a single fill (zoomed out views)
+    // Returns the number of NPCs drawn
+    render(ctx, bounds = null, simple = false) {
         // Sort by depth (Y + X) logic for World coords:
         // Screen Y is proportional to (x+y). Higher (x+y) is "closer" (lower on screen).
         // Standard painter's algo: Draw lower (x+y) first (Background), Higher (x+y) last (Foreground).
+        const visible = [];
+        const inView = (sx, sy) => !bounds ||
+            (sx >= bounds.left && sx <= bounds.right && sy >= bounds.top && sy <= bounds.bottom);
 
-        const sorted = [...this.npcs].sort((a, b) => (a.x + a.y) - (b.x + b.y));
+        for (const npc of this.npcs) {
+            if (inView(npc.x - npc.y, (npc.x + npc.y) * 0.5)) visible.push(npc);
+        }
 
-        sorted.forEach(npc => npc.render(ctx));
+        const w = this.walkers;
+        for (let i = 0; i < this.walkerCount; i++) {
+            const o = i * NPC_STRIDE;
+            const x = w[o];
+            const y = w[o + 1];
+            if (inView(x - y, (x + y) * 0.5)) visible.push(i);
+        }
+
+        const depth = (item) => typeof item === 'number'
+            ? w[item * NPC_STRIDE] + w[item * NPC_STRIDE + 1]
+            : item.x + item.y;
+        visible.sort((a, b) => depth(a) - depth(b));
+
+        if (simple) {
+            for (const item of visible) {
+                let x, y, color;
+                if (typeof item === 'number') {
+                    const o = item * NPC_STRIDE;
+                    x = w[o];
+                    y = w[o + 1];
+                    color = NPC_COLORS[w[o + 2]];
+                } else {
+                    x = item.x;
+                    y = item.y;
+                    color = item.color;
+                }
+                ctx.fillStyle = color;
+                ctx.fillRect(x - y - 4, (x + y) * 0.5 - 18, 8, 18);
+            }
+            return visible.length;
+        }
+
+        const t = Date.now() * 0.01;
+        for (const item of visible) {
+            if (typeof item !== 'number') {
+                item.render(ctx);
+                continue;
+            }
+            const o = item * NPC_STRIDE;
+            const x = w[o];
+            const y = w[o + 1];
+            const bounce = Math.abs(Math.sin(t + item)) * 2;
+            NPC.draw(ctx, x - y, (x + y) * 0.5, NPC_COLORS[w[o + 2]], bounce, w[o + 3]);
+        }
+        return visible.length;
     }
 }
 
@@ -0,0 +1,46 @@
+// Runs the road walker simulation (NPCSimulation in npc.js) off the main thread
+// and posts packed positions back every tick.
+importScripts('npc.js');
+
+let sim = null;
+let timer = null;
+let lastTick = 0;
+const spare = []; // Buffers handed back by the main thread
+
+function tick() {
+    const now = performance.now();
+    const dt = Math.min((now - lastTick) / (1000 / 60), 10);
+    lastTick = now;
+
+    sim.step(dt);
+    const buffer = spare.pop() || new Float32Array(sim.count * NPC_STRIDE);
+    sim.pack(buffer);
+    postMessage({ type: 'positions', buffer, count: sim.count }, [buffer.buffer]);
+}
+
+function setRate(ms) {
+    if (timer !== null) clearInterval(timer);
+    timer = null;
+    if (sim && ms > 0) {
+        lastTick = performance.now();
+        timer = setInterval(tick, ms);
+    }
+}
+
+onmessage = (e) => {
+    const msg = e.data;
+    switch (msg.type) {
+        case 'init':
+            sim = new NPCSimulation(msg.roads, msg.count);
+            spare.length = 0;
+            setRate(msg.rate);
+            tick(); // Publish initial positions right away
+            break;
+        case 'rate':
+            setRate(msg.rate);
+            break;
+        case 'recycle':
+            if (sim && msg.buffer.length === sim.count * NPC_STRIDE) spare.push(msg.buffer);
+            break;
+    }
+};
@@ -0,0 +1,130 @@
+// Fixed capacity particle pools for smoke and rain.
+// Particles live in Float32Arrays (no per particle objects, no GC churn)
+// and are drawn with one path per style.
+
+const SMOKE_CAPACITY = 512;
+const SMOKE_STRIDE = 6; // x, y, vx, vy, life, radius
+const SMOKE_ALPHA_BANDS = 8; // Smoke is batched into this many opacity levels
+
+const RAIN_CAPACITY = 500;
+const RAIN_STRIDE = 4; // x, y, length, velocity
+
+class SmokeSystem {
+    constructor(capacity = SMOKE_CAPACITY) {
+        this.capacity = capacity;
+        this.data = new Float32Array(capacity * SMOKE_STRIDE);
+        this.count = 0;
+        this.bandStyles = [];
+        for (let b = 0; b < SMOKE_ALPHA_BANDS; b++) {
+            const life = (b + 1) / SMOKE_ALPHA_BANDS;
+            this.bandStyles.push(`rgba(255, 255, 255, ${(life * 0.4).toFixed(3)})`);
+        }
+    }
+
+    spawn(x, y) {
+        if (this.count >= this.capacity) return; // Pool full, skip this puff
+        const o = this.count * SMOKE_STRIDE;
+        const d = this.data;
+        d[o] = x;
+        d[o + 1] = y;
+        d[o + 2] = (Math.random() - 0.5) * 0.5 + 0.5; // Drift right (wind)
+        d[o + 3] = -0.5 - Math.random() * 0.5; // Float up
+        d[o + 4] = 1.0; // Life
+        d[o + 5] = 2 + Math.random() * 2; // Radius
+        this.count++;
+    }
+
+    // dt: elapsed time in 60fps frames
+    update(dt = 1) {
+        const d = this.data;
+        let i = 0;
+        while (i < this.count) {
+            const o = i * SMOKE_STRIDE;
+            d[o + 4] -= 0.01 * dt;
+            if (d[o + 4] <= 0) {
+                // Swap remove: move the last particle into this slot
+                this.count--;
+                d.copyWithin(o, this.count * SMOKE_STRIDE, (this.count + 1) * SMOKE_STRIDE);
+                continue;
+            }
+            d[o] += d[o + 2] * dt;
+            d[o + 1] += d[o + 3] * dt;
+            d[o + 5] += 0.05 * dt; // Expand
+            i++;
+        }
+    }
+
+    render(ctx) {
+        if (this.count === 0) return;
+        const d = this.data;
+        for (let b = 0; b < SMOKE_ALPHA_BANDS; b++) {
+            const minLife = b / SMOKE_ALPHA_BANDS;
+            const maxLife = (b + 1) / SMOKE_ALPHA_BANDS;
+            let any = false;
+            ctx.beginPath();
+            for (let i = 0; i < this.count; i++) {
+                const o = i * SMOKE_STRIDE;
+                const life = d[o + 4];
+                if (life <= minLife || life > maxLife) continue;
+                ctx.moveTo(d[o] + d[o + 5], d[o + 1]);
+                ctx.arc(d[o], d[o + 1], d[o + 5], 0, Math.PI * 2);
+                any = true;
+            }
+            if (any) {
+                ctx.fillStyle = this.bandStyles[b];
+                ctx.fill();
+            }
+        }
+    }
+}
+
+// Screen space rain streaks
+class RainSystem {
+    constructor(capacity = RAIN_CAPACITY) {
+        this.capacity = capacity;
+        this.data = new Float32Array(capacity * RAIN_STRIDE);
+        this.count = 0;
+    }
+
+    // Fills the pool over a few frames so rain fades in
+    grow(w, h, amount = 50) {
+        const end = Math.min(this.capacity, this.count + amount);
+        const d = this.data;
+        for (let i = this.count; i < end; i++) {
+            const o = i * RAIN_STRIDE;
+            d[o] = Math.random() * w;
+            d[o + 1] = Math.random() * h;
+            d[o + 2] = Math.random() * 20 + 10;
+            d[o + 3] = Math.random() * 10 + 15;
+        }
+        this.count = end;
+    }
+
+    update(dt, w, h) {
+        const d = this.data;
+        for (let i = 0; i < this.count; i++) {
+            const o = i * RAIN_STRIDE;
+            d[o + 1] += d[o + 3] * dt;
+            d[o] -= 0.5 * dt; // Wind
+
+            // Reset
+            if (d[o + 1] > h) {
+                d[o + 1] = -d[o + 2];
+                d[o] = Math.random() * w;
+            }
+        }
+    }
+
+    render(ctx) {
+        const d = this.data;
+        ctx.strokeStyle = "rgba(174, 194, 224, 0.5)";
+        ctx.lineWidth = 1.5;
+        ctx.beginPath();
+        for (let i = 0; i < this.count; i++) {
+            const o = i * RAIN_STRIDE;
+            ctx.moveTo(d[o], d[o + 1]);
+            ctx.lineTo(d[o] - 2, d[o + 1] + d[o + 2]); // Slight tilt
+        }
+        ctx.stroke();
+    }
+}
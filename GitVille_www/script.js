@@ -43,12 +43,60 @@ const HOUSE_SIDE_SHADE = 0.8; // Multiplier for side face
 const HOUSE_TOP_SHADE = 1.0; // Multiplier for top face
 const HOUSE_FRONT_SHADE = 0.9; // Multiplier for front face
 
+// Cached layers are rendered at the smallest bucket >= camera.zoom,
+// so they are only ever scaled down when blitted.
+const ZOOM_BUCKETS = [0.25, 0.5, 0.75, 1.0, 1.5, 2.0];
+
+// Level of detail tiers for houses, trees and NPCs
+const LOD_FULL = 0; // Procedural house sprites
+const LOD_SIMPLE = 1; // Box plus roof in three fills, NPCs as single fills
+const LOD_POINT = 2; // One fill per house
+// Zoom below which each tier kicks in (tunable)
+const LOD_ZOOM = { simple: 0.45, point: 0.25 };
+// Thresholds shift by this much away from the current tier to prevent popping
+const LOD_HYSTERESIS = 0.03;
+// Grass tufts, flowers and bushes are skipped in ground chunks below this bucket
+const GROUND_DETAIL_MIN_BUCKET = 0.5;
+
+// House sprites: area around the tile center (world px) that one house can cover
+const HOUSE_SPRITE_BOUNDS = { left: 60, top: 150, width: 120, height: 190 };
+const HOUSE_SPRITE_BUDGET = 12000000; // Max cached sprite pixels (~48MB RGBA)
+const HOVER_EPSILON = 0.01; // Below this the house is drawn from its sprite
+const HOVER_SETTLE = 0.001; // Below this a fading hover animation is finished
+const HOUSE_CELL_SIZE = 8; // Tiles per side of a spatial index cell
+
+// Ground chunks: side length in device pixels and overlap. The cache budget
+// follows the viewport (see groundChunkBudget), this many chunks of margin
+// around the most chunks that can be on screen at once.
+const GROUND_CHUNK_PX = 512;
+const GROUND_CHUNK_PAD = 2;
+const GROUND_CHUNK_RING = 1;
+
+// Render loop: full frame rate while the user interacts, a slow tick for
+// ambient animation (NPCs, clouds, smoke, rain) otherwise.
+const FRAME_MS = 1000 / 60; // Animation speeds are tuned per 60fps frame
+const ACTIVE_WINDOW_MS = 1000; // Stay at full rate this long after the last input
+const IDLE_TICK_MS = 100; // Ambient animation rate when idle (10fps)
+const MAX_FRAME_STEP = 10; // Clamp dt (in frames) after long pauses
+
+// Performance HUD, enabled with ?hud=1 (CityMapScreen adds it when GITVILLE_HUD=1)
+const PERF_HUD_ENABLED =
+  new URLSearchParams(window.location.search).get("hud") === "1";
+const PERF_PHASES = ["ground", "houses", "npcs", "particles", "clouds", "weather"];
+const PERF_HISTORY = 300; // Frames kept for percentiles and traces
+const PERF_HUD_REFRESH_MS = 250; // How often the HUD text is recomputed
+const PERF_TRACE_URL = "/__trace";
+
+// Self checks of the frame scheduling and caches, logged to the console with ?selftest=1
+const SELF_CHECK_ENABLED =
+  new URLSearchParams(window.location.search).get("selftest") === "1";
+
 // --- State ---
 let camera = {
   x: 0,
   y: 0,
   zoom: 1.0,
-  minZoom: 0.5,
+  minZoom: 0.15,
   maxZoom: 2.0,
 };
 
@@ -64,10 +112,25 @@ let initialZoom = null;
 
 // World Data
 let houses = []; // Will be loaded from JSON
+let drawOrder = []; // Houses sorted back to front, rebuilt when data changes
+let houseLookup = new Map(); // "x,y" -> house
+let houseCells = new Map(); // "cx,cy" -> houses in that cell, in draw order
+let animatingHouses = new Set(); // Houses with a running hover animation
+let hoveredHouse = null; // House under the cursor (or the last tap)
+let visibleBounds = null; // Culling rect for houses, updated by renderVisibleGrid
 let roads = new Set(); // Set of "x,y" strings
+let roadMasks = new Map(); // "x,y" -> neighbor bitmask, see buildRoadMasks
 let worldConfig = { weather: "none" }; // Default config
 let cloudSystem; // Cloud Manager
 let npcManager; // NPC Manager
+let frameCount = 0; // Incremented once per rendered frame
+let lodTier = LOD_FULL; // Current level of detail, see updateLodTier
+let frameDt = 1; // Time since the previous frame, in 60fps frames
+let frameRequested = false;
+let frameHandle = null; // Pending requestAnimationFrame id
+let idleTimer = null;
+let lastFrameTime = 0;
+let lastInteraction = 0;
 
 // --- Initialization ---
 async function init() {
@@ -119,22 +182,113 @@ async function init() {
     );
   }
 
+  rebuildHouseIndex();
+  buildRoadMasks();
+  if (SELF_CHECK_ENABLED) runSelfChecks();
+
   // Init Clouds
   cloudSystem = new CloudSystem();
-  // Init NPCs
-  npcManager = new NPCManager(15);
+  // Init NPCs (road walkers scale with the city, simulated in npc_worker.js)
+  npcManager = new NPCManager(NPCManager.countForCity(houses.length), roads);
 
-  requestAnimationFrame(render);
+  requestRender();
 }
 
 function resizeCanvas() {
   canvas.width = window.innerWidth;
   canvas.height = window.innerHeight;
+  groundChunks.maxPixels = groundChunkBudget();
   // initial center if needed, but (0,0) is fine for now
+  requestRender();
+}
+
+// --- Frame Scheduling ---
+
+// Schedules a frame unless one is already pending. Safe to call often.
+function requestRender() {
+  if (frameRequested || document.hidden) return;
+  if (idleTimer !== null) {
+    clearTimeout(idleTimer);
+    idleTimer = null;
+  }
+  frameRequested = true;
+  frameHandle = requestAnimationFrame(render);
+}
+
+// Called by input handlers: camera or hover may have changed
+function markInteraction() {
+  lastInteraction = performance.now();
+  requestRender();
+}
+
+function hasAmbientAnimation() {
+  return (
+    (npcManager && npcManager.isActive()) ||
+    smokeSystem.count > 0 ||
+    worldConfig.weather === "rain" ||
+    (cloudSystem && worldConfig.timeOfDay !== "night")
+  );
+}
+
+// Recent input or a hover animation still moving needs every frame
+function wantsFullFrameRate(now) {
+  return now - lastInteraction < ACTIVE_WINDOW_MS || animatingHouses.size > 0;
+}
+
+function scheduleNextFrame(now) {
+  if (document.hidden) return;
+
+  if (wantsFullFrameRate(now)) {
+    if (npcManager) npcManager.setTickRate(NPC_TICK_ACTIVE_MS);
+    requestRender();
+  } else if (hasAmbientAnimation()) {
+    if (npcManager) npcManager.setTickRate(IDLE_TICK_MS);
+    idleTimer = setTimeout(() => {
+      idleTimer = null;
+      requestRender();
+    }, IDLE_TICK_MS);
+  }
+  // Otherwise nothing moves, the next input event wakes the loop
+}
+
+function onVisibilityChange() {
+  if (document.hidden) {
+    // Pause completely until the page is shown again
+    if (frameRequested) {
+      cancelAnimationFrame(frameHandle);
+      frameRequested = false;
+    }
+    if (idleTimer !== null) {
+      clearTimeout(idleTimer);
+      idleTimer = null;
+    }
+    if (npcManager) npcManager.setTickRate(0);
+  } else {
+    lastFrameTime = 0; // Don't fast-forward animations over the pause
+    requestRender();
+  }
 }
 
 // --- Input Handling ---
 function setupInputListeners() {
+  // Any input wakes the render loop at full frame rate
+  ["mousedown", "click", "wheel", "touchstart", "touchmove"].forEach((type) =>
+    canvas.addEventListener(type, markInteraction, { passive: true })
+  );
+  ["mousemove", "mouseup", "touchend"].forEach((type) =>
+    window.addEventListener(type, markInteraction)
+  );
+  document.addEventListener("visibilitychange", onVisibilityChange);
+
+  if (perfHud) {
+    window.addEventListener("keydown", (e) => {
+      if (e.key === "h") {
+        perfHud.visible = !perfHud.visible;
+        requestRender();
+      }
+    });
+  }
+
   // Mouse
   canvas.addEventListener("mousedown", (e) => {
     isDragging = true;
@@ -144,6 +298,11 @@ function setupInputListeners() {
 
   // Interaction Click
   canvas.addEventListener("click", (e) => {
+    if (perfHud && perfHud.hitTest(e.clientX, e.clientY)) {
+      perfHud.uploadTrace();
+      return;
+    }
+
     // Prevent click if we dragged
     // We can track drag distance, but for now let's assume if it wasn't a long drag
     // Wait, standard click behavior is fine usually.
@@ -156,7 +315,7 @@ function setupInputListeners() {
     const gy = Math.round(gridPos.y);
 
     // 3. Check House
-    const house = houses.find((h) => h.x === gx && h.y === gy);
+    const house = houseLookup.get(`${gx},${gy}`);
     if (house && !house.obstacle) {
       // Spawn NPC from this house center
       // NPC coords are Cartesian (Grid * Scale)
@@ -344,7 +503,15 @@ function worldToGrid(worldX, worldY) {
 }
 
 // --- Rendering ---
-function render() {
+function render(now) {
+  frameRequested = false;
+  frameCount++;
+  frameDt = lastFrameTime
+    ? Math.min((now - lastFrameTime) / FRAME_MS, MAX_FRAME_STEP)
+    : 1;
+  lastFrameTime = now;
+  if (perfHud) perfHud.beginFrame();
+
   // 0. Determine Palette
   const time = worldConfig.timeOfDay || "day"; // 'day' or 'night'
   const colors = PALETTE[time] || PALETTE.day;
@@ -364,83 +531,267 @@ function render() {
   ctx.translate(-camera.x, -camera.y);
 
   // 3. Render Ground
+  perfBegin("ground");
   renderVisibleGrid();
+  perfEnd("ground");
 
   // 4. Render Houses (Calculate hover first)
+  perfBegin("houses");
   updateHoverState();
   renderHouses();
+  perfEnd("houses");
 
   // 4b. Render NPCs (Ideally integrated with houses for depth, but overlaid for now)
   if (npcManager) {
-    npcManager.update();
-    npcManager.render(ctx);
+    perfBegin("npcs");
+    npcManager.update(frameDt);
+    const drawn = npcManager.render(ctx, visibleBounds, lodTier !== LOD_FULL);
+    perfCount("npcs", drawn);
+    perfEnd("npcs");
   }
 
   // 5. Draw Smoke / Particles (World Space)
-  drawParticles();
+  perfBegin("particles");
+  drawParticles(frameDt);
+  perfEnd("particles");
 
   // 5b. Draw Clouds (Day Only)
   if (cloudSystem && worldConfig.timeOfDay !== "night") {
-    cloudSystem.update();
+    perfBegin("clouds");
+    cloudSystem.update(frameDt);
     cloudSystem.render(ctx);
+    perfEnd("clouds");
   }
 
   // 6. Draw Weather (Overlay)
-  drawWeather();
+  perfBegin("weather");
+  drawWeather(frameDt);
+  perfEnd("weather");
 
   ctx.restore();
 
-  requestAnimationFrame(render);
+  if (perfHud) {
+    perfHud.endFrame(now);
+    perfHud.draw(ctx);
+  }
+
+  scheduleNextFrame(now);
 }
 
-// --- Particle System (Smoke) ---
-let particles = [];
-function drawParticles() {
-  // Update and Draw in one loop
-  for (let i = particles.length - 1; i >= 0; i--) {
-    const p = particles[i];
-    p.life -= 0.01;
-    p.x += p.vx;
-    p.y += p.vy;
-    p.radius += 0.05; // Expand
-
-    if (p.life <= 0) {
-      particles.splice(i, 1);
-      continue;
+// --- Performance HUD ---
+// Per phase timings and draw counts of the last PERF_HISTORY frames.
+// Tap the panel to upload a JSON trace, press "h" to hide/show it.
+class PerfHUD {
+  constructor() {
+    this.visible = true;
+    this.head = 0; // Next write slot in the ring buffers
+    this.filled = 0;
+    this.timestamps = new Float64Array(PERF_HISTORY);
+    this.totals = new Float32Array(PERF_HISTORY);
+    this.phases = {};
+    for (const phase of PERF_PHASES) {
+      this.phases[phase] = new Float32Array(PERF_HISTORY);
     }
 
-    ctx.fillStyle = `rgba(255, 255, 255, ${p.life * 0.4})`;
-    ctx.beginPath();
-    ctx.arc(p.x, p.y, p.radius, 0, Math.PI * 2);
-    ctx.fill();
+    this.frameStart = 0;
+    this.phaseStart = 0;
+    this.current = {};
+    this.counts = {};
+    this.lines = [];
+    this.lastRefresh = 0;
+    this.status = "";
+    this.statusUntil = 0;
+    this.panel = { x: 8, y: 8, w: 0, h: 0 };
+  }
+
+  beginFrame() {
+    this.frameStart = performance.now();
+    for (const phase of PERF_PHASES) this.current[phase] = 0;
+    this.counts = { houses: 0, tiles: 0, chunks: 0, npcs: 0 };
+  }
+
+  begin() {
+    this.phaseStart = performance.now();
+  }
+
+  end(phase) {
+    this.current[phase] += performance.now() - this.phaseStart;
+  }
+
+  count(name, n) {
+    this.counts[name] = (this.counts[name] || 0) + n;
+  }
+
+  endFrame(now) {
+    const i = this.head;
+    this.timestamps[i] = now;
+    this.totals[i] = performance.now() - this.frameStart;
+    for (const phase of PERF_PHASES) this.phases[phase][i] = this.current[phase];
+    this.head = (i + 1) % PERF_HISTORY;
+    this.filled = Math.min(this.filled + 1, PERF_HISTORY);
+  }
+
+  // Indices of the recorded frames, oldest first
+  frameIndices() {
+    const start = (this.head - this.filled + PERF_HISTORY) % PERF_HISTORY;
+    const out = [];
+    for (let k = 0; k < this.filled; k++) out.push((start + k) % PERF_HISTORY);
+    return out;
+  }
+
+  static percentiles(values) {
+    const sorted = Float32Array.from(values).sort();
+    const at = (q) =>
+      sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))] : 0;
+    return { p50: at(0.5), p95: at(0.95), p99: at(0.99), max: at(1) };
+  }
+
+  summary() {
+    const idx = this.frameIndices();
+    const last = idx[idx.length - 1];
+    // FPS over the last second of recorded frames
+    let frames = 0;
+    for (let k = idx.length - 1; k >= 0; k--) {
+      if (this.timestamps[last] - this.timestamps[idx[k]] > 1000) break;
+      frames++;
+    }
+
+    const phases = {};
+    for (const phase of PERF_PHASES) {
+      const values = idx.map((i) => this.phases[phase][i]);
+      const sum = values.reduce((a, b) => a + b, 0);
+      phases[phase] = {
+        avg: idx.length ? sum / idx.length : 0,
+        p95: PerfHUD.percentiles(values).p95,
+      };
+    }
+
+    return {
+      fps: frames,
+      frameMs: PerfHUD.percentiles(idx.map((i) => this.totals[i])),
+      phases,
+      counts: { ...this.counts },
+    };
+  }
+
+  refresh(now) {
+    const s = this.summary();
+    const f = s.frameMs;
+    const c = s.counts;
+    this.lines = [
+      `FPS ${s.fps}  frame p50 ${f.p50.toFixed(1)} p95 ${f.p95.toFixed(1)} p99 ${f.p99.toFixed(1)} ms`,
+      ...PERF_PHASES.map(
+        (p) =>
+          `${p.padEnd(9)} ${s.phases[p].avg.toFixed(2)} ms  p95 ${s.phases[p].p95.toFixed(2)}`
+      ),
+      `houses ${c.houses}  npcs ${c.npcs}  chunks ${c.chunks}  tiles ${c.tiles}`,
+      `zoom ${camera.zoom.toFixed(2)}  lod ${lodTier}  smoke ${smokeSystem.count}`,
+    ];
+    this.lastRefresh = now;
+  }
+
+  draw(ctx) {
+    if (!this.visible) return;
+    const now = performance.now();
+    if (now - this.lastRefresh > PERF_HUD_REFRESH_MS) this.refresh(now);
+
+    const lines = this.lines.slice();
+    lines.push(now < this.statusUntil ? this.status : "tap to save trace");
+
+    const lineHeight = 14;
+    const p = this.panel;
+    p.w = 330;
+    p.h = lines.length * lineHeight + 8;
+
+    ctx.save();
+    ctx.fillStyle = "rgba(0, 0, 0, 0.65)";
+    ctx.fillRect(p.x, p.y, p.w, p.h);
+    ctx.fillStyle = "#e0ffe0";
+    ctx.font = "11px monospace";
+    ctx.textBaseline = "top";
+    lines.forEach((line, k) => ctx.fillText(line, p.x + 6, p.y + 4 + k * lineHeight));
+    ctx.restore();
+  }
+
+  hitTest(x, y) {
+    const p = this.panel;
+    return this.visible && x >= p.x && x <= p.x + p.w && y >= p.y && y <= p.y + p.h;
+  }
+
+  toTrace() {
+    const idx = this.frameIndices();
+    return {
+      createdAt: new Date().toISOString(),
+      userAgent: navigator.userAgent,
+      viewport: { width: canvas.width, height: canvas.height, dpr: window.devicePixelRatio || 1 },
+      camera: { x: camera.x, y: camera.y, zoom: camera.zoom },
+      world: { houses: houses.length, roads: roads.size, ...worldConfig },
+      summary: this.summary(),
+      frames: idx.map((i) => {
+        const frame = { t: this.timestamps[i], total: this.totals[i] };
+        for (const phase of PERF_PHASES) frame[phase] = this.phases[phase][i];
+        return frame;
+      }),
+    };
+  }
+
+  async uploadTrace() {
+    this.setStatus("saving trace...");
+    try {
+      const res = await fetch(PERF_TRACE_URL, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(this.toTrace()),
+      });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const info = await res.json();
+      this.setStatus(`saved ${info.saved}`);
+    } catch (e) {
+      console.error("Trace upload failed:", e);
+      this.setStatus(`trace upload failed: ${e.message}`);
+    }
+  }
+
+  setStatus(text) {
+    this.status = text;
+    this.statusUntil = performance.now() + 3000;
+    requestRender();
   }
 }
 
+const perfHud = PERF_HUD_ENABLED ? new PerfHUD() : null;
+
+function perfBegin(phase) {
+  if (perfHud) perfHud.begin(phase);
+}
+
+function perfEnd(phase) {
+  if (perfHud) perfHud.end(phase);
+}
+
+function perfCount(name, n = 1) {
+  if (perfHud) perfHud.count(name, n);
+}
+
+// --- Particle System (Smoke) ---
+// Pools live in particles.js
+const smokeSystem = new SmokeSystem();
+function drawParticles(dt) {
+  smokeSystem.update(dt);
+  smokeSystem.render(ctx);
+}
+
 // Helper to spawn smoke
 function spawnSmoke(x, y) {
-  particles.push({
-    x: x,
-    y: y,
-    vx: (Math.random() - 0.5) * 0.5 + 0.5, // Drift right (wind)
-    vy: -0.5 - Math.random() * 0.5, // Float up
-    life: 1.0,
-    radius: 2 + Math.random() * 2,
-  });
+  smokeSystem.spawn(x, y);
 }
 
 // --- Weather Components ---
-let rainDrops = [];
-function drawWeather() {
+const rainSystem = new RainSystem();
+function drawWeather(dt) {
   if (worldConfig.weather !== "rain") return;
 
-  // Reset overlay transform to draw HUD-style rain or World-style?
   // Rain looks best as a screen overlay (HUD style) so it covers everything including UI scale
-  // But currently we are inside ctx.save()/restore() with camera transform applied.
-  // If we want screen-space rain, we should restore first?
-  // Actually, render() restores at end. We can briefly restore or just invert transform?
-  // EASIEST: Just draw large area covering camera view, but screen space is better for "lens effect".
-
-  // Let's do Screen Space Rain.
   ctx.save();
   ctx.setTransform(1, 0, 0, 1, 0, 0); // Reset to Identity (Screen Coordinates)
 
@@ -448,48 +799,17 @@ function drawWeather() {
   const h = canvas.height;
 
   // Init Rain if needed
-  if (rainDrops.length < 500) {
-    for (let i = 0; i < 50; i++) {
-      rainDrops.push({
-        x: Math.random() * w,
-        y: Math.random() * h,
-        l: Math.random() * 20 + 10,
-        v: Math.random() * 10 + 15,
-      });
-    }
-  }
-
-  ctx.strokeStyle = "rgba(174, 194, 224, 0.5)";
-  ctx.lineWidth = 1.5;
-  ctx.beginPath();
+  if (rainSystem.count < rainSystem.capacity) rainSystem.grow(w, h);
 
-  for (let i = 0; i < rainDrops.length; i++) {
-    const d = rainDrops[i];
-
-    ctx.moveTo(d.x, d.y);
-    ctx.lineTo(d.x - 2, d.y + d.l); // Slight tilt
-
-    // Update
-    d.y += d.v;
-    d.x -= 0.5; // Wind
-
-    // Reset
-    if (d.y > h) {
-      d.y = -d.l;
-      d.x = Math.random() * w;
-    }
-  }
-  ctx.stroke();
+  rainSystem.render(ctx);
+  rainSystem.update(dt, w, h);
 
   ctx.restore();
 }
 
 function renderVisibleGrid() {
   // Determine visible world bounds to minimize drawing
-  // This is an approximation. A robust solution projects screen corners to world space.
-
   // Screen boundaries in world space
-  // We need to inverse project the screen corners to 'World Plane' (not Grid index yet)
   // Top-Left Screen (0,0) -> World
   // Bottom-Right Screen (W,H) -> World
 
@@ -509,15 +829,52 @@ function renderVisibleGrid() {
   const worldRight = brX / camera.zoom + camera.x;
   const worldBottom = brY / camera.zoom + camera.y;
 
-  // Now convert these bounding box corners to Grid coordinates to find min/max Grid X/Y
-  // Since isometric grid is rotated 45deg, the bounding box in grid space is also rotated.
-  // We need to test all 4 corners to find min/max.
+  // Houses stick out of their tile, so widen the rect by the sprite bounds
+  // (a house is visible if its base lies within these world bounds)
+  const b = HOUSE_SPRITE_BOUNDS;
+  visibleBounds = {
+    left: worldLeft - (b.width - b.left),
+    right: worldRight + b.left,
+    top: worldTop - (b.height - b.top),
+    bottom: worldBottom + b.top,
+  };
+  Object.assign(
+    visibleBounds,
+    worldRectToGridBounds(
+      visibleBounds.left,
+      visibleBounds.top,
+      visibleBounds.right,
+      visibleBounds.bottom
+    )
+  );
+
+  // Composite the static ground from cached chunks
+  const time = worldConfig.timeOfDay || "day";
+  const bucket = getZoomBucket(camera.zoom);
+  const chunkWorld = GROUND_CHUNK_PX / bucket; // Chunk side in world px
+
+  const startCX = Math.floor(worldLeft / chunkWorld);
+  const endCX = Math.floor(worldRight / chunkWorld);
+  const startCY = Math.floor(worldTop / chunkWorld);
+  const endCY = Math.floor(worldBottom / chunkWorld);
+
+  for (let cy = startCY; cy <= endCY; cy++) {
+    for (let cx = startCX; cx <= endCX; cx++) {
+      drawGroundChunk(cx, cy, bucket, chunkWorld, time);
+      perfCount("chunks");
+    }
+  }
+}
 
+// Grid range covering a world space rect.
+// Since isometric grid is rotated 45deg, the bounding box in grid space is also rotated.
+// We need to test all 4 corners to find min/max.
+function worldRectToGridBounds(left, top, right, bottom) {
   const corners = [
-    worldToGrid(worldLeft, worldTop),
-    worldToGrid(worldRight, worldTop),
-    worldToGrid(worldRight, worldBottom),
-    worldToGrid(worldLeft, worldBottom),
+    worldToGrid(left, top),
+    worldToGrid(right, top),
+    worldToGrid(right, bottom),
+    worldToGrid(left, bottom),
   ];
 
   let minGridX = Infinity,
@@ -532,127 +889,244 @@ function renderVisibleGrid() {
     maxGridY = Math.max(maxGridY, p.y);
   });
 
-  // Add some padding to prevent popping at edges
-  const startX = Math.floor(minGridX) - 2;
-  const endX = Math.ceil(maxGridX) + 2;
-  const startY = Math.floor(minGridY) - 2;
-  const endY = Math.ceil(maxGridY) + 2;
+  return {
+    minGridX: Math.floor(minGridX),
+    maxGridX: Math.ceil(maxGridX),
+    minGridY: Math.floor(minGridY),
+    maxGridY: Math.ceil(maxGridY),
+  };
+}
+
+// --- Ground Chunks ---
+// The ground (grass, decorations, roads) never changes after load, so it is
+// rendered into square chunks of GROUND_CHUNK_PX device pixels per zoom bucket.
+
+// Cache budget in pixels for the current window size. Chunks are smallest on
+// screen just above a bucket boundary (zoom 0.26 renders at bucket 0.5, so a
+// chunk covers 266px), which is when the most of them are visible. On
+// 1920x1080 that is 9x6 chunks, 11x8 with the ring: ~23M pixels (~94MB RGBA).
+function groundChunkBudget() {
+  let minScale = Infinity;
+  let lowerZoom = camera.minZoom;
+  for (const bucket of ZOOM_BUCKETS) {
+    if (bucket < camera.minZoom) continue;
+    minScale = Math.min(minScale, lowerZoom / bucket);
+    lowerZoom = bucket;
+  }
+  const chunkScreen = GROUND_CHUNK_PX * minScale;
+  // A partly visible chunk at each edge, plus the ring
+  const cols = Math.ceil(window.innerWidth / chunkScreen) + 1 + GROUND_CHUNK_RING * 2;
+  const rows = Math.ceil(window.innerHeight / chunkScreen) + 1 + GROUND_CHUNK_RING * 2;
+  const size = GROUND_CHUNK_PX + GROUND_CHUNK_PAD * 2;
+  return cols * rows * size * size;
+}
 
-  // Draw tiles
-  ctx.lineWidth = 1;
+function drawGroundChunk(cx, cy, bucket, chunkWorld, time) {
+  const key = `${cx},${cy}|${bucket}|${time}`;
+  const left = cx * chunkWorld;
+  const top = cy * chunkWorld;
+  // Chunks overlap by a few pixels so filtering never shows seams
+  const pad = GROUND_CHUNK_PAD / bucket;
+
+  let chunk = groundChunks.get(key);
+  if (!chunk) {
+    const size = GROUND_CHUNK_PX + GROUND_CHUNK_PAD * 2;
+    if (!groundChunks.reserve(size * size)) {
+      // Cache is full of chunks on screen, draw this one directly
+      ctx.save();
+      ctx.beginPath();
+      ctx.rect(left, top, chunkWorld, chunkWorld);
+      ctx.clip();
+      drawGroundRect(
+        ctx,
+        left,
+        top,
+        left + chunkWorld,
+        top + chunkWorld,
+        time,
+        bucket >= GROUND_DETAIL_MIN_BUCKET
+      );
+      ctx.restore();
+      return;
+    }
+
+    chunk = createLayerCanvas(size, size);
+    const chunkCtx = chunk.getContext("2d");
+    chunkCtx.scale(bucket, bucket);
+    chunkCtx.translate(pad - left, pad - top);
+    drawGroundRect(
+      chunkCtx,
+      left - pad,
+      top - pad,
+      left + chunkWorld + pad,
+      top + chunkWorld + pad,
+      time,
+      bucket >= GROUND_DETAIL_MIN_BUCKET
+    );
+    groundChunks.set(key, chunk, size * size);
+  }
 
-  for (let gy = startY; gy <= endY; gy++) {
-    for (let gx = startX; gx <= endX; gx++) {
+  ctx.drawImage(
+    chunk,
+    left - pad,
+    top - pad,
+    chunkWorld + pad * 2,
+    chunkWorld + pad * 2
+  );
+}
+
+// Draws every tile overlapping a world rect into `target`.
+// detail: include grass tufts, flowers and bushes
+function drawGroundRect(target, left, top, right, bottom, time, detail) {
+  const colors = PALETTE[time] || PALETTE.day;
+  const grid = worldRectToGridBounds(left, top, right, bottom);
+  const halfW = TILE_WIDTH / 2;
+  const halfH = TILE_HEIGHT / 2;
+
+  target.lineWidth = 1;
+
+  for (let gy = grid.minGridY; gy <= grid.maxGridY; gy++) {
+    for (let gx = grid.minGridX; gx <= grid.maxGridX; gx++) {
       const worldPos = gridToWorld(gx, gy);
-      const tileKey = `${gx},${gy}`;
+      // The grid range is rotated, skip tiles fully outside the rect
+      if (
+        worldPos.x + halfW < left ||
+        worldPos.x - halfW > right ||
+        worldPos.y + halfH < top ||
+        worldPos.y - halfH > bottom
+      ) {
+        continue;
+      }
 
-      if (roads.has(tileKey)) {
-        drawRoadTile(gx, gy, worldPos);
+      perfCount("tiles");
+      const roadMask = roadMasks.get(`${gx},${gy}`);
+      if (roadMask !== undefined) {
+        drawRoadTile(worldPos, roadMask, target);
       } else {
-        // Natural Grass Pattern
-        const colors = PALETTE[worldConfig.timeOfDay || "day"] || PALETTE.day;
+        drawGrassTile(gx, gy, worldPos, colors, target, detail);
+      }
+    }
+  }
+}
 
-        // Use a pseudo-random hash to pick distinct grass shades
-        // Simple deterministic noise
-        const seed = Math.sin(gx * 12.9898 + gy * 78.233) * 43758.5453; // common GLSL pseudo-random
-        const noise = Math.abs(seed - Math.floor(seed));
+function drawGrassTile(gx, gy, worldPos, colors, ctx, detail) {
+  // Natural Grass Pattern
+  // Use a pseudo-random hash to pick distinct grass shades
+  // Simple deterministic noise
+  const seed = Math.sin(gx * 12.9898 + gy * 78.233) * 43758.5453; // common GLSL pseudo-random
+  const noise = Math.abs(seed - Math.floor(seed));
 
-        // 3 subtle variants
-        if (noise < 0.6) ctx.fillStyle = colors.grassBase; // Base
-        else if (noise < 0.9)
-          ctx.fillStyle = colors.grassDark; // Slightly Darker
-        else ctx.fillStyle = colors.grassLight; // Slightly Lighter
+  // 3 subtle variants
+  if (noise < 0.6) ctx.fillStyle = colors.grassBase; // Base
+  else if (noise < 0.9)
+    ctx.fillStyle = colors.grassDark; // Slightly Darker
+  else ctx.fillStyle = colors.grassLight; // Slightly Lighter
 
-        // Draw Diamond path
-        ctx.beginPath();
-        ctx.moveTo(worldPos.x, worldPos.y - TILE_HEIGHT / 2);
-        ctx.lineTo(worldPos.x + TILE_WIDTH / 2, worldPos.y);
-        ctx.lineTo(worldPos.x, worldPos.y + TILE_HEIGHT / 2);
-        ctx.lineTo(worldPos.x - TILE_WIDTH / 2, worldPos.y);
-        ctx.closePath();
-
-        // Fill with slightly overlapped rect to prevent subpixel lines?
-        // Canvas path fill is usually okay.
-        ctx.fill();
+  // Draw Diamond path
+  ctx.beginPath();
+  ctx.moveTo(worldPos.x, worldPos.y - TILE_HEIGHT / 2);
+  ctx.lineTo(worldPos.x + TILE_WIDTH / 2, worldPos.y);
+  ctx.lineTo(worldPos.x, worldPos.y + TILE_HEIGHT / 2);
+  ctx.lineTo(worldPos.x - TILE_WIDTH / 2, worldPos.y);
+  ctx.closePath();
 
-        // Organic Details (Procedural Placement + Wind)
-        // Threshold: noise > 0.70 means 30% of tiles get something
-        if (noise > 0.7) {
-          const decType = Math.floor((seed * 100) % 10);
-          // Generate a pseudo-random offset from center
-          const ox = ((seed * 57.1) % 40) - 20;
-          const oy = ((seed * 21.3) % 18) - 9;
-          const tx = worldPos.x + ox;
-          const ty = worldPos.y + oy;
-
-          // Wind Animation
-          const time = Date.now() * 0.002;
-          const sway = Math.sin(time + tx * 0.02 + ty * 0.03) * 2;
-
-          if (decType < 6) {
-            // Grass Tuft (Small strokes)
-            ctx.strokeStyle = "#76c47c"; // Slightly darker pastel green for contrast
-            ctx.lineWidth = 1.5;
-            ctx.beginPath();
-            ctx.moveTo(tx, ty);
-            ctx.lineTo(tx - 3 + sway, ty - 4);
-            ctx.moveTo(tx, ty);
-            ctx.lineTo(tx + 2 + sway, ty - 5);
-            ctx.stroke();
-          } else if (decType < 9) {
-            // Flowers (Simple dots)
-            const colors = [
-              "#ffb7b2",
-              "#ffdac1",
-              "#e2f0cb",
-              "#b5ead7",
-              "#c7ceea",
-            ]; // Pastel Rainbow
-            const cIdx = Math.floor((seed * 13) % colors.length);
-
-            const fx = tx + sway * 0.5;
-
-            ctx.fillStyle = colors[cIdx];
-            ctx.beginPath();
-            ctx.arc(fx, ty - 3, 2, 0, Math.PI * 2);
-            ctx.fill();
+  // Fill with slightly overlapped rect to prevent subpixel lines?
+  // Canvas path fill is usually okay.
+  ctx.fill();
 
-            // Stem
-            ctx.strokeStyle = "#76c47c";
-            ctx.beginPath();
-            ctx.moveTo(tx, ty);
-            ctx.lineTo(fx, ty - 3);
-            ctx.stroke();
+  // Organic Details (Procedural Placement)
+  // Baked into ground chunks, so they are drawn in their rest pose
+  // Threshold: noise > 0.70 means 30% of tiles get something
+  if (detail && noise > 0.7) {
+    const decType = Math.floor((seed * 100) % 10);
+    // Generate a pseudo-random offset from center
+    const ox = ((seed * 57.1) % 40) - 20;
+    const oy = ((seed * 21.3) % 18) - 9;
+    const tx = worldPos.x + ox;
+    const ty = worldPos.y + oy;
+
+    if (decType < 6) {
+      // Grass Tuft (Small strokes)
+      ctx.strokeStyle = "#76c47c"; // Slightly darker pastel green for contrast
+      ctx.lineWidth = 1.5;
+      ctx.beginPath();
+      ctx.moveTo(tx, ty);
+      ctx.lineTo(tx - 3, ty - 4);
+      ctx.moveTo(tx, ty);
+      ctx.lineTo(tx + 2, ty - 5);
+      ctx.stroke();
+    } else if (decType < 9) {
+      // Flowers (Simple dots)
+      const colors = [
+        "#ffb7b2",
+        "#ffdac1",
+        "#e2f0cb",
+        "#b5ead7",
+        "#c7ceea",
+      ]; // Pastel Rainbow
+      const cIdx = Math.floor((seed * 13) % colors.length);
+
+      const fx = tx;
+
+      ctx.fillStyle = colors[cIdx];
+      ctx.beginPath();
+      ctx.arc(fx, ty - 3, 2, 0, Math.PI * 2);
+      ctx.fill();
 
-            // White center
-            ctx.fillStyle = "#fff";
-            ctx.beginPath();
-            ctx.arc(fx, ty - 3, 0.8, 0, Math.PI * 2);
-            ctx.fill();
-          } else {
-            // Small Bush
-            ctx.fillStyle = "#8dd693"; // Bush Pastel Green
-            const bx = tx + sway * 0.3;
-            ctx.beginPath();
-            ctx.arc(bx, ty, 4, 0, Math.PI * 2);
-            ctx.arc(bx + 3, ty + 1, 3, 0, Math.PI * 2);
-            ctx.arc(bx - 2, ty + 2, 3, 0, Math.PI * 2);
-            ctx.fill();
-          }
-        }
+      // Stem
+      ctx.strokeStyle = "#76c47c";
+      ctx.beginPath();
+      ctx.moveTo(tx, ty);
+      ctx.lineTo(fx, ty - 3);
+      ctx.stroke();
 
-        // No grid lines for natural look
-      }
+      // White center
+      ctx.fillStyle = "#fff";
+      ctx.beginPath();
+      ctx.arc(fx, ty - 3, 0.8, 0, Math.PI * 2);
+      ctx.fill();
+    } else {
+      // Small Bush
+      ctx.fillStyle = "#8dd693"; // Bush Pastel Green
+      const bx = tx;
+      ctx.beginPath();
+      ctx.arc(bx, ty, 4, 0, Math.PI * 2);
+      ctx.arc(bx + 3, ty + 1, 3, 0, Math.PI * 2);
+      ctx.arc(bx - 2, ty + 2, 3, 0, Math.PI * 2);
+      ctx.fill();
     }
   }
+
+  // No grid lines for natural look
+}
+
+// Road autotile masks, one bit per connected neighbor
+const ROAD_N = 1;
+const ROAD_S = 2;
+const ROAD_E = 4;
+const ROAD_W = 8;
+
+// Precomputes the neighbor mask of every road tile. Call whenever `roads` changes.
+function buildRoadMasks() {
+  roadMasks = new Map();
+  for (const key of roads) {
+    const [gx, gy] = key.split(",").map(Number);
+    let mask = 0;
+    if (roads.has(`${gx},${gy - 1}`)) mask |= ROAD_N;
+    if (roads.has(`${gx},${gy + 1}`)) mask |= ROAD_S;
+    if (roads.has(`${gx + 1},${gy}`)) mask |= ROAD_E;
+    if (roads.has(`${gx - 1},${gy}`)) mask |= ROAD_W;
+    roadMasks.set(key, mask);
+  }
+  groundChunks.clear();
 }
 
-function drawRoadTile(gx, gy, pos) {
+function drawRoadTile(pos, mask, ctx) {
   // 1. Identify Neighbors
-  const hasN = roads.has(`${gx},${gy - 1}`);
-  const hasS = roads.has(`${gx},${gy + 1}`);
-  const hasE = roads.has(`${gx + 1},${gy}`);
-  const hasW = roads.has(`${gx - 1},${gy}`);
+  const hasN = (mask & ROAD_N) !== 0;
+  const hasS = (mask & ROAD_S) !== 0;
+  const hasE = (mask & ROAD_E) !== 0;
+  const hasW = (mask & ROAD_W) !== 0;
 
   // 2. Draw Sidewalk Base (Full Tile)
   ctx.fillStyle = "#bdc3c7"; // Concrete Color
@@ -886,23 +1360,94 @@ function drawRoadTile(gx, gy, pos) {
   ctx.globalAlpha = 1.0; // Reset
 }
 
-function renderHouses() {
+// Rebuilds the draw order, position lookup and spatial index.
+// Call whenever `houses` is replaced or edited.
+function rebuildHouseIndex() {
   // Sort houses for painter's algorithm
   // In isometric, depth value is typically (x + y).
   // Higher x + y means closer to the viewer (lower on screen)
   // So we render lower (x+y) first, and higher (x+y) last.
-
-  const sortedHouses = [...houses].sort((a, b) => {
+  drawOrder = [...houses].sort((a, b) => {
     return a.x + a.y - (b.x + b.y);
   });
 
-  // We ideally should cull houses that are offscreen here too,
-  // but unless we have thousands, iterating is cheap. Drawing is the cost.
+  houseLookup = new Map();
+  houseCells = new Map();
+  animatingHouses = new Set();
+  hoveredHouse = null;
 
-  for (const house of sortedHouses) {
-    if (house.obstacle === "tree") {
-      drawTree(house.x, house.y, ctx);
-    } else {
+  drawOrder.forEach((house, rank) => {
+    house.drawRank = rank;
+
+    const key = `${house.x},${house.y}`;
+    if (!houseLookup.has(key)) houseLookup.set(key, house);
+
+    const cellKey = `${Math.floor(house.x / HOUSE_CELL_SIZE)},${Math.floor(
+      house.y / HOUSE_CELL_SIZE
+    )}`;
+    let cell = houseCells.get(cellKey);
+    if (!cell) {
+      cell = [];
+      houseCells.set(cellKey, cell);
+    }
+    cell.push(house);
+
+    if (house.hoverAnim > 0) animatingHouses.add(house);
+  });
+}
+
+// Houses inside visibleBounds, back to front
+function getVisibleHouses() {
+  if (!visibleBounds) return drawOrder;
+  const b = visibleBounds;
+
+  const visible = [];
+  const cellMinX = Math.floor(b.minGridX / HOUSE_CELL_SIZE);
+  const cellMaxX = Math.floor(b.maxGridX / HOUSE_CELL_SIZE);
+  const cellMinY = Math.floor(b.minGridY / HOUSE_CELL_SIZE);
+  const cellMaxY = Math.floor(b.maxGridY / HOUSE_CELL_SIZE);
+
+  for (let cy = cellMinY; cy <= cellMaxY; cy++) {
+    for (let cx = cellMinX; cx <= cellMaxX; cx++) {
+      const cell = houseCells.get(`${cx},${cy}`);
+      if (!cell) continue;
+
+      for (const house of cell) {
+        // The grid range is a rotated rect, check the real world position
+        const iso = gridToWorld(house.x, house.y);
+        if (
+          iso.x >= b.left &&
+          iso.x <= b.right &&
+          iso.y >= b.top &&
+          iso.y <= b.bottom
+        ) {
+          visible.push(house);
+        }
+      }
+    }
+  }
+
+  // Cells are visited in grid order, restore painter's order
+  visible.sort((a, b) => a.drawRank - b.drawRank);
+  return visible;
+}
+
+function renderHouses() {
+  const visibleHouses = getVisibleHouses();
+  const bucket = getZoomBucket(camera.zoom);
+  const lod = updateLodTier(camera.zoom);
+  perfCount("houses", visibleHouses.length);
+
+  for (const house of visibleHouses) {
+    if (lod === LOD_POINT) {
+      drawHousePoint(house);
+    } else if (house.obstacle === "tree") {
+      if (lod === LOD_FULL) drawTree(house.x, house.y, ctx);
+      else drawTreeSimple(house);
+    } else if (lod === LOD_SIMPLE && house.hoverAnim <= HOVER_EPSILON) {
+      drawHouseSimple(house);
+    } else if (house.hoverAnim > HOVER_EPSILON || !blitHouseSprite(house, bucket)) {
+      // Animating houses (or a full sprite cache) take the procedural path
       drawHouse(
         house.x,
         house.y,
@@ -916,12 +1461,258 @@ function renderHouses() {
         house.username,
         house.abandoned,
         house.facing,
-        house.has_terrace
+        house.has_terrace,
+        ctx
       );
     }
   }
 }
 
+// --- Level of Detail ---
+
+function updateLodTier(zoom) {
+  // Move each threshold away from the current tier so zoom jitter around it
+  // doesn't flip back and forth
+  const h = LOD_HYSTERESIS;
+  const simpleAt = LOD_ZOOM.simple + (lodTier >= LOD_SIMPLE ? h : -h);
+  const pointAt = LOD_ZOOM.point + (lodTier >= LOD_POINT ? h : -h);
+
+  if (zoom < pointAt) lodTier = LOD_POINT;
+  else if (zoom < simpleAt) lodTier = LOD_SIMPLE;
+  else lodTier = LOD_FULL;
+  return lodTier;
+}
+
+// Box plus gable roof in three fills (same footprint as drawHouse)
+function drawHouseSimple(house) {
+  const c = gridToWorld(house.x, house.y);
+  const hw = 16;
+  const hd = 18;
+  const wallHeight = house.has_terrace ? 60 : 35;
+  const roofTop = wallHeight + (house.abandoned ? 22 : 30);
+  const swap = house.facing === "right";
+
+  const p = (lx, ly, lz) => {
+    if (swap) [lx, ly] = [ly, lx];
+    return [c.x + (lx - ly), c.y + (lx + ly) * 0.5 - lz];
+  };
+  const fillPoly = (points, color) => {
+    ctx.fillStyle = color;
+    ctx.beginPath();
+    ctx.moveTo(...points[0]);
+    for (let i = 1; i < points.length; i++) ctx.lineTo(...points[i]);
+    ctx.closePath();
+    ctx.fill();
+  };
+
+  const wall = house.abandoned ? "#95a5a6" : "#fdfbf7";
+  const wallShadow = house.abandoned ? "#7f8c8d" : "#e0dad1";
+  const roof = house.abandoned ? "#535c68" : house.color;
+
+  // Front wall with gable
+  fillPoly(
+    [
+      p(-hw, hd, 0),
+      p(hw, hd, 0),
+      p(hw, hd, wallHeight),
+      p(0, hd, roofTop),
+      p(-hw, hd, wallHeight),
+    ],
+    swap ? wallShadow : wall
+  );
+  // Side wall
+  fillPoly(
+    [p(hw, -hd, 0), p(hw, hd, 0), p(hw, hd, wallHeight), p(hw, -hd, wallHeight)],
+    swap ? wall : wallShadow
+  );
+  // Roof slope
+  fillPoly(
+    [
+      p(hw, -hd, wallHeight),
+      p(hw, hd, wallHeight),
+      p(0, hd, roofTop),
+      p(0, -hd, roofTop),
+    ],
+    roof
+  );
+}
+
+function drawTreeSimple(house) {
+  const c = gridToWorld(house.x, house.y);
+  ctx.fillStyle = "#4CAF50";
+  ctx.beginPath();
+  ctx.arc(c.x, c.y - 30, 16, 0, Math.PI * 2);
+  ctx.fill();
+}
+
+// A single fill per house or tree
+function drawHousePoint(house) {
+  const c = gridToWorld(house.x, house.y);
+  if (house.obstacle === "tree") {
+    ctx.fillStyle = "#4CAF50";
+    ctx.fillRect(c.x - 14, c.y - 40, 28, 40);
+  } else {
+    ctx.fillStyle = house.abandoned ? "#535c68" : house.color;
+    ctx.fillRect(c.x - 20, c.y - 55, 40, 60);
+  }
+}
+
+// --- Layer Caches ---
+
+function createLayerCanvas(width, height) {
+  if (typeof OffscreenCanvas !== "undefined") {
+    return new OffscreenCanvas(width, height);
+  }
+  const layer = document.createElement("canvas");
+  layer.width = width;
+  layer.height = height;
+  return layer;
+}
+
+function getZoomBucket(zoom) {
+  for (const bucket of ZOOM_BUCKETS) {
+    if (bucket >= zoom) return bucket;
+  }
+  return ZOOM_BUCKETS[ZOOM_BUCKETS.length - 1];
+}
+
+// LRU cache of pre-rendered canvases, bounded by total pixel count.
+// Entries used during the current frame are never evicted; reserve() and
+// set() return false instead so callers can fall back to drawing directly.
+// Call reserve() before rendering a layer so a refused one isn't drawn twice.
+class LayerCache {
+  constructor(maxPixels) {
+    this.maxPixels = maxPixels;
+    this.pixels = 0;
+    this.entries = new Map();
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return null;
+    // Re-insert to mark as most recently used
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    entry.lastFrame = frameCount;
+    return entry.value;
+  }
+
+  // Evicts old entries until pixels more fit. False if only entries in use
+  // are left, or if pixels alone is over the budget.
+  reserve(pixels) {
+    if (pixels > this.maxPixels) return false;
+    while (this.pixels + pixels > this.maxPixels && this.entries.size > 0) {
+      const [oldestKey, oldest] = this.entries.entries().next().value;
+      if (oldest.lastFrame === frameCount) return false;
+      this.entries.delete(oldestKey);
+      this.pixels -= oldest.pixels;
+    }
+    return true;
+  }
+
+  set(key, value, pixels) {
+    if (!this.reserve(pixels)) return false;
+    this.entries.set(key, { value, pixels, lastFrame: frameCount });
+    this.pixels += pixels;
+    return true;
+  }
+
+  clear() {
+    this.entries.clear();
+    this.pixels = 0;
+  }
+}
+
+const houseSprites = new LayerCache(HOUSE_SPRITE_BUDGET);
+const groundChunks = new LayerCache(groundChunkBudget());
+
+function houseSpriteKey(house, bucket) {
+  const isNight = worldConfig.timeOfDay === "night";
+  return [
+    house.color,
+    house.roofStyle !== undefined ? house.roofStyle : Math.abs(house.x + house.y) % 4,
+    house.doorStyle,
+    house.windowStyle,
+    house.chimneyStyle,
+    house.wallStyle,
+    house.facing,
+    house.has_terrace ? 1 : 0,
+    isNight ? (isHouseLit(house.x, house.y) ? "lit" : "dark") : "day",
+    // Abandoned houses use their grid position for wobble, cracks and rubble
+    house.abandoned ? `${house.x},${house.y}` : "",
+    bucket,
+  ].join("|");
+}
+
+// Draws a house from its cached sprite. Returns false if no sprite could be cached.
+function blitHouseSprite(house, bucket) {
+  const key = houseSpriteKey(house, bucket);
+  let sprite = houseSprites.get(key);
+
+  if (!sprite) {
+    const bounds = HOUSE_SPRITE_BOUNDS;
+    const width = Math.ceil(bounds.width * bucket);
+    const height = Math.ceil(bounds.height * bucket);
+    if (!houseSprites.reserve(width * height)) return false;
+    const layer = createLayerCanvas(width, height);
+    const layerCtx = layer.getContext("2d");
+    const iso = gridToWorld(house.x, house.y);
+
+    // Map the house's world position onto the sprite anchor
+    layerCtx.scale(bucket, bucket);
+    layerCtx.translate(bounds.left - iso.x, bounds.top - iso.y);
+
+    const meta = { smokeX: null, smokeY: null };
+    drawHouse(
+      house.x,
+      house.y,
+      house.color,
+      house.roofStyle,
+      house.doorStyle,
+      house.windowStyle,
+      house.chimneyStyle,
+      house.wallStyle,
+      0,
+      house.username,
+      house.abandoned,
+      house.facing,
+      house.has_terrace,
+      layerCtx,
+      meta
+    );
+
+    sprite = {
+      canvas: layer,
+      width: width / bucket,
+      height: height / bucket,
+      smokeX: meta.smokeX,
+      smokeY: meta.smokeY,
+    };
+    houseSprites.set(key, sprite, width * height);
+  }
+
+  const iso = gridToWorld(house.x, house.y);
+  ctx.drawImage(
+    sprite.canvas,
+    iso.x - HOUSE_SPRITE_BOUNDS.left,
+    iso.y - HOUSE_SPRITE_BOUNDS.top,
+    sprite.width,
+    sprite.height
+  );
+
+  // Chimney smoke is live, emit it from the tip recorded while rendering
+  if (sprite.smokeX !== null && Math.random() < 0.05 * frameDt) {
+    spawnSmoke(iso.x + sprite.smokeX, iso.y + sprite.smokeY);
+  }
+  return true;
+}
+
+// Stable per-house pseudo random choice of lit windows at night
+function isHouseLit(gx, gy) {
+  const seed = Math.abs(Math.sin(gx * 12.9898 + gy * 78.233) * 43758.5453);
+  return seed > 0.2; // 80% of houses lit
+}
+
 function updateHoverState() {
   // 1. Get Mouse in World
   const worldMouse = screenToWorld(currentMouseX, currentMouseY);
@@ -934,11 +1725,28 @@ function updateHoverState() {
   const gy = Math.round(gridP.y);
 
   // 4. Update Animations
-  for (const house of houses) {
-    const isHovered = house.x === gx && house.y === gy;
-    const target = isHovered ? 1.0 : 0.0;
+  stepHoverAnimations(houseLookup.get(`${gx},${gy}`) || null);
+}
+
+// Moves hoverAnim of the hovered house towards 1 and of the previous one
+// towards 0. Houses leave animatingHouses once they reach their target, so
+// a cursor resting on a house doesn't keep the loop at full frame rate.
+function stepHoverAnimations(hovered) {
+  if (hovered !== hoveredHouse) {
+    if (hoveredHouse) animatingHouses.add(hoveredHouse);
+    if (hovered) animatingHouses.add(hovered);
+    hoveredHouse = hovered;
+  }
+
+  for (const house of animatingHouses) {
+    const target = house === hovered ? 1.0 : 0.0;
     // Smooth Lerp
     house.hoverAnim += (target - house.hoverAnim) * 0.3;
+
+    if (Math.abs(target - house.hoverAnim) < HOVER_SETTLE) {
+      house.hoverAnim = target;
+      animatingHouses.delete(house);
+    }
   }
 }
 
@@ -955,8 +1763,12 @@ function drawHouse(
   username,
   abandoned,
   facing,
-  has_terrace
+  has_terrace,
+  ctx,
+  spriteMeta
 ) {
+  // ctx: target context (main canvas or a sprite layer)
+  // spriteMeta: set when rendering a sprite; receives the chimney tip instead of spawning smoke
   const isoCenter = gridToWorld(gx, gy);
 
   // --- "Sketchy" Style Hook (Abandoned Only) ---
@@ -1098,9 +1910,7 @@ function drawHouse(
     const isNight = worldConfig.timeOfDay === "night";
     // Randomly light up windows if night (mostly on)
     if (isNight) {
-      // Hash for stable randomness per house
-      const seed = Math.abs(Math.sin(gx * 12.9898 + gy * 78.233) * 43758.5453);
-      const isLit = seed > 0.2; // 80% of houses lit
+      const isLit = isHouseLit(gx, gy);
 
       if (isLit) {
         glassColor1 = "#f1c40f"; // Warm Yellow Light
@@ -2779,9 +3589,13 @@ function drawHouse(
     }
 
     // --- Smoke Emitter ---
-    // Chance to spawn smoke
-    if (Math.random() < 0.05) {
-      const tip = toScreen(cPos.lx, cPos.ly, zTop + 3);
+    const tip = toScreen(cPos.lx, cPos.ly, zTop + 3);
+    if (spriteMeta) {
+      // Sprites are static, the caller emits smoke relative to the tile center
+      spriteMeta.smokeX = tip.x - isoCenter.x;
+      spriteMeta.smokeY = tip.y - isoCenter.y;
+    } else if (Math.random() < 0.05 * frameDt) {
+      // Chance to spawn smoke (per 60fps frame)
       spawnSmoke(tip.x, tip.y);
     }
   }
@@ -2999,5 +3813,55 @@ function adjustColor(color, amount) {
   );
 }
 
+// --- Self Checks ---
+// Run with ?selftest=1, results go to the console. They use their own
+// houses and caches and put the shared state back afterwards.
+
+function runSelfChecks() {
+  const results = [];
+  const check = (name, ok) => results.push({ name, ok });
+
+  // A cursor parked on a house lets the loop drop to the idle/ambient tick
+  const saved = { animatingHouses, hoveredHouse, lastInteraction };
+  try {
+    animatingHouses = new Set();
+    hoveredHouse = null;
+    const house = { x: 0, y: 0, hoverAnim: 0 };
+    const other = { x: 1, y: 0, hoverAnim: 0 };
+
+    stepHoverAnimations(house);
+    for (let i = 0; i < 100 && animatingHouses.size > 0; i++) stepHoverAnimations(house);
+    check("hovered house settles", animatingHouses.size === 0 && house.hoverAnim === 1);
+    lastInteraction = 0;
+    check("idle cursor on a house drops the full frame rate", !wantsFullFrameRate(ACTIVE_WINDOW_MS));
+
+    stepHoverAnimations(other);
+    check("moving to another house animates both", animatingHouses.size === 2);
+    for (let i = 0; i < 100 && animatingHouses.size > 0; i++) stepHoverAnimations(other);
+    check("previous house fades out", house.hoverAnim === 0 && other.hoverAnim === 1);
+
+    stepHoverAnimations(null);
+    for (let i = 0; i < 100 && animatingHouses.size > 0; i++) stepHoverAnimations(null);
+    check("leaving all houses settles", animatingHouses.size === 0 && other.hoverAnim === 0);
+  } finally {
+    ({ animatingHouses, hoveredHouse, lastInteraction } = saved);
+  }
+
+  // LayerCache stays within its pixel budget
+  const cache = new LayerCache(100);
+  check("layer larger than the budget is refused", !cache.reserve(101) && !cache.set("big", {}, 101));
+  check("refused layer isn't cached", cache.entries.size === 0 && cache.pixels === 0);
+  cache.set("a", {}, 60);
+  frameCount++;
+  check("unused layer is evicted for a new one", cache.set("b", {}, 60) && !cache.get("a"));
+  check("layer in use this frame is kept", !cache.reserve(60) && cache.pixels === 60);
+  frameCount--;
+
+  const failed = results.filter((r) => !r.ok);
+  for (const r of results) console.log(`${r.ok ? "ok  " : "FAIL"} ${r.name}`);
+  console.log(failed.length ? `${failed.length} self check(s) failed` : "All self checks passed");
+  return failed.length;
+}
+
 // Start
 init();
@@ -0,0 +1,144 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from kivy.clock import Clock
+from kivy.core.audio import SoundLoader
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, StringProperty
+from kivy.utils import platform
+
+# On Android SoundLoader creates a MediaPlayer through pyjnius, and jnius objects
+# made on a thread that isn't attached to the JVM crash or leak. There the worker
+# only reads the file ahead and the sound is created on the main thread.
+LOAD_ON_WORKER = platform != 'android'
+PREFETCH_CHUNK = 1024 * 1024
+
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+
+def get_audio_service():
+    """
+    Returns the process-wide AudioService. Create it on the main thread.
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = AudioService()
+        return _shared_service
+
+
+class AudioService(EventDispatcher):
+    """
+    Keeps one loaded sound around so play/stop toggles don't load the file
+    again. preload() opens a track on a worker thread on desktop, where
+    SoundLoader.load decodes it. On Android the worker reads the file ahead
+    and the MediaPlayer is prepared on the main thread (see LOAD_ON_WORKER).
+    play() before it is ready starts as soon as it is. release() frees the
+    handle.
+    """
+    is_playing = BooleanProperty(False)
+    source = StringProperty("")  # Track of the loaded (or loading) sound
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sound = None
+        self._loading = None
+        self._play_when_loaded = False
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def preload(self, path):
+        if not path or not os.path.exists(path):
+            return
+        if path == self.source and (self.sound or self._loading == path):
+            return
+        self.release()
+        self.source = path
+        self._loading = path
+        self._executor.submit(self._load, path)
+
+    def _load(self, path):
+        if LOAD_ON_WORKER:
+            sound = self._open(path)
+            Clock.schedule_once(lambda dt: self._on_loaded(path, sound))
+        else:
+            self._prefetch(path)
+            Clock.schedule_once(lambda dt: self._on_prefetched(path))
+
+    @staticmethod
+    def _open(path):
+        try:
+            return SoundLoader.load(path)
+        except Exception as e:
+            print(f"Error loading sound: {e}")
+            return None
+
+    @staticmethod
+    def _prefetch(path):
+        # Reading the file once puts it in the page cache for the MediaPlayer
+        try:
+            with open(path, "rb") as f:
+                while f.read(PREFETCH_CHUNK):
+                    pass
+        except OSError as e:
+            print(f"Error reading sound: {e}")
+
+    def _on_prefetched(self, path):
+        # Main thread, so the sound can be created here on Android
+        if self._loading != path:
+            return  # Released or replaced while reading
+        self._on_loaded(path, self._open(path))
+
+    def _on_loaded(self, path, sound):
+        if self._loading != path:
+            # Released or replaced while loading
+            if sound:
+                sound.unload()
+            return
+        self._loading = None
+        if not sound:
+            print("Could not load sound file.")
+            self._play_when_loaded = False
+            self.source = ""
+            return
+        self.sound = sound
+        sound.bind(on_stop=self._on_sound_stop)
+        if self._play_when_loaded:
+            self._play_when_loaded = False
+            self.play(path)
+
+    def play(self, path):
+        if path != self.source or (not self.sound and self._loading != path):
+            self.preload(path)
+        if self.sound:
+            self.sound.play()
+            self.is_playing = True
+        elif self._loading == path:
+            self._play_when_loaded = True
+
+    def stop(self):
+        self._play_when_loaded = False
+        if self.sound and self.is_playing:
+            self.sound.stop()
+        self.is_playing = False
+
+    def toggle(self, path):
+        if self.is_playing or self._play_when_loaded:
+            self.stop()
+        else:
+            self.play(path)
+
+    def release(self):
+        """
+        Stops playback and frees the loaded sound (and any load in progress).
+        """
+        self.stop()
+        if self.sound:
+            self.sound.unbind(on_stop=self._on_sound_stop)
+            self.sound.unload()
+            self.sound = None
+        self._loading = None
+        self.source = ""
+
+    def _on_sound_stop(self, *args):
+        self.is_playing = False
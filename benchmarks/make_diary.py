@@ -0,0 +1,112 @@
+"""
+Synthetic diaries for the benchmarks.
+
+    python benchmarks/make_diary.py years out_dir [seed]
+
+Writes diary_data.json (in the layout the app stores), questions.json and
+tags.json for a diary of the given number of years ending on END_DATE.
+Days are skipped now and then, answers range from empty to a few hundred
+words, days carry 0-4 tags and the question list changes every year, so
+the files look like a long lived diary. The same seed gives the same diary.
+"""
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diary_manager import migrate_data
+
+# Fixed, so streaks and year windows are the same on every run
+END_DATE = date(2025, 12, 31)
+WRITTEN_CHANCE = 0.85
+
+# Rare enough that searching for it returns a handful of hits
+RARE_WORD = "zephyr"
+RARE_CHANCE = 0.003
+
+QUESTION_SETS = [
+    ["What was the highlight of your day?", "What challenged you today?", "What are you grateful for?"],
+    ["How was your day?", "Who did you meet?", "Plan for tomorrow?"],
+    ["What did you learn?", "What made you smile?", "What would you do differently?", "Plan for tomorrow?"],
+]
+
+TAGS = ["reading", "exercise", "chill", "work", "family", "friends", "travel",
+        "music", "cooking", "sick", "rain", "focus"]
+
+WORDS = ("the a and to of in it was we i my day today with for on at after before "
+         "morning evening night work walk coffee lunch dinner friend call meeting "
+         "book music rain sun park train home tired happy calm busy slow long short "
+         "finished started wrote read cooked talked laughed planned forgot remembered").split()
+
+# (chance, min words, max words) of an answer
+ANSWER_LENGTHS = [
+    (0.15, 0, 0),
+    (0.50, 3, 15),
+    (0.30, 20, 60),
+    (0.05, 150, 400),
+]
+
+
+def make_answer(rng):
+    roll = rng.random()
+    for chance, low, high in ANSWER_LENGTHS:
+        if roll < chance:
+            break
+        roll -= chance
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    if words and rng.random() < RARE_CHANCE:
+        words[rng.randrange(len(words))] = RARE_WORD
+    return " ".join(words)
+
+
+def make_diary(years, seed=0, end=END_DATE):
+    """
+    Returns the diary as {date: {question: answer, "tags": [...]}}.
+    """
+    rng = random.Random(seed)
+    start = end - timedelta(days=round(years * 365.25) - 1)
+    diary = {}
+    day = start
+    while day <= end:
+        if rng.random() < WRITTEN_CHANCE:
+            questions = QUESTION_SETS[(day.year - start.year) % len(QUESTION_SETS)]
+            entry = {q: make_answer(rng) for q in questions}
+            tags = rng.sample(TAGS, rng.choice([0, 0, 1, 1, 2, 3, 4]))
+            if tags:
+                entry["tags"] = tags
+            diary[day.strftime("%Y-%m-%d")] = entry
+        day += timedelta(days=1)
+    return diary
+
+
+def write_diary(out_dir, years, seed=0):
+    """
+    Writes a synthetic diary into out_dir and returns the path of diary_data.json.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    diary = make_diary(years, seed)
+    data_path = os.path.join(out_dir, "diary_data.json")
+    with open(data_path, "w") as f:
+        json.dump(migrate_data(diary), f, separators=(",", ":"))
+    with open(os.path.join(out_dir, "questions.json"), "w") as f:
+        json.dump(QUESTION_SETS[-1], f, indent=4)
+    with open(os.path.join(out_dir, "tags.json"), "w") as f:
+        json.dump(TAGS, f, indent=4)
+    return data_path
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python benchmarks/make_diary.py years out_dir [seed]")
+        return
+    years = float(sys.argv[1])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    path = write_diary(sys.argv[2], years, seed)
+    print(f"Wrote {os.path.getsize(path) / 1024:.1f} KiB to {path}")
+
+
+if __name__ == "__main__":
+    main()
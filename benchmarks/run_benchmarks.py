@@ -0,0 +1,292 @@
+"""
+Benchmarks for the diary and city code paths.
+
+    python benchmarks/run_benchmarks.py [--years 1,5,20] [--repeat N]
+                                        [--output results.json]
+                                        [--baseline benchmarks/baseline.json]
+                                        [--threshold 1.5] [--save-baseline]
+
+A synthetic diary (see make_diary.py) is generated for every size. For each
+one the suite times DiaryManager (startup, loading, saves, tags, search, date
+windows, schema dry run), the dashboard stats, generate_diary_city.generate
+and the fetch_stargazers layout functions with one house per diary day.
+
+Results are the median and minimum of --repeat runs in milliseconds, printed
+and written as JSON to --output. They are compared with the baseline on the
+minimum, which shrugs off a busy machine far better than the median. Every
+run is paired with a small fixed calibration workload, and times are scaled
+by how fast that ran then and now, so a slower or throttled machine doesn't
+look like a regression. A benchmark regresses when it is more than threshold times the
+baseline and at least MIN_DELTA_MS slower. The exit status is 1 if anything
+regressed. Refresh the baseline with --save-baseline after an intended
+change, and on a new machine.
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "GitVille_www"))
+
+import fetch_stargazers
+import generate_diary_city
+from diary_manager import DiaryManager
+from make_diary import END_DATE, QUESTION_SETS, RARE_WORD, write_diary
+
+DEFAULT_YEARS = [1, 5, 20]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.5
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+# Differences below this are timer noise, never a regression
+MIN_DELTA_MS = 0.5
+# Result field compared with the baseline
+COMPARE_KEY = "min_ms"
+
+
+def calibration_workload():
+    # Plain CPU work in the same shape as the code under test: dicts, strings, json
+    rows = {f"2020-01-{i:05d}": {"preview": "word " * (i % 40), "chars": i, "tags": ["a", "b"]}
+            for i in range(2000)}
+    text = json.dumps(rows)
+    sorted(json.loads(text).items(), key=lambda item: item[1]["chars"], reverse=True)
+
+
+def measure(fn, repeat, setup=None):
+    """
+    Runs fn(state) repeat times, state = setup() before each run (not timed).
+    Each run is preceded by a timed calibration_workload().
+    """
+    times = []
+    calibration = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        calibration_workload()
+        calibration.append((time.perf_counter() - started) * 1000)
+        # The code under test prints progress, keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn(state)
+            times.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(times), 4),
+        "min_ms": round(min(times), 4),
+        "runs": repeat,
+        "calibration_ms": round(min(calibration), 4),
+    }
+
+
+def diary_benchmarks(data_dir, repeat):
+    """
+    Yields (name, result) for the DiaryManager and dashboard paths.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        dm = DiaryManager(data_dir=data_dir)
+        dm.count_entries()  # Writes the summaries once
+    dates = [d for d, _ in dm.iter_entries(fields=())]
+    last_year = END_DATE.year
+    year_start, year_end = f"{last_year}-01-01", f"{last_year}-12-31"
+    summary_path = os.path.join(data_dir, "diary_summary.json")
+
+    yield "dm.startup", measure(lambda _: DiaryManager(data_dir=data_dir), repeat)
+
+    def drop_summary():
+        if os.path.exists(summary_path):
+            os.remove(summary_path)
+    yield "dm.startup_rebuild", measure(
+        lambda _: DiaryManager(data_dir=data_dir).count_entries(), repeat, drop_summary)
+
+    yield "dm.get_all_entries_cold", measure(
+        lambda _: dm.get_all_entries(), repeat, lambda: dm._cache.clear())
+    yield "dm.get_all_entries", measure(lambda _: dm.get_all_entries(), repeat)
+
+    sample = dates[::max(1, len(dates) // 100)][:100]
+    yield "dm.load_entry_x100", measure(lambda _: [dm.load_entry(d) for d in sample], repeat)
+
+    edited = dates[len(dates) // 2]
+    counter = iter(range(10 ** 9))
+
+    def edit():
+        entry = dm.load_entry(edited)
+        entry.pop("tags", None)
+        first = next(iter(entry))
+        entry[first] = f"edited {next(counter)}"
+        return entry
+    yield "dm.save_entry", measure(lambda entry: dm.save_entry(edited, entry), repeat, edit)
+    yield "dm.save_tags", measure(
+        lambda _: dm.save_tags(edited, ["reading", f"t{next(counter)}"]), repeat)
+
+    yield "dm.search_common", measure(lambda _: dm.search_entries("coffee"), repeat)
+    yield "dm.search_rare", measure(lambda _: dm.search_entries(RARE_WORD), repeat)
+
+    yield "dm.iter_year_tags", measure(
+        lambda _: dict(dm.iter_entries(year_start, year_end, fields=("tags",))), repeat)
+    yield "dm.recent_3", measure(
+        lambda _: list(islice(dm.iter_entries(reverse=True, fields=("preview",)), 3)), repeat)
+    yield "dm.year_activity", measure(lambda _: dm.get_year_activity(last_year), repeat)
+    yield "dm.apply_schema_dry_run", measure(
+        lambda _: dm.apply_schema((year_start, year_end), QUESTION_SETS[0], dry_run=True), repeat)
+
+    # Cold: the dashboard right after the app started (summaries parsed again)
+    yield "dashboard.stats_cold", measure(
+        lambda _: dm.get_dashboard_stats(END_DATE), repeat, lambda: dm._cache.clear())
+    yield "dashboard.stats", measure(lambda _: dm.get_dashboard_stats(END_DATE), repeat)
+
+
+def city_benchmarks(data_dir, repeat):
+    """
+    Yields (name, result) for generate_diary_city and the fetch_stargazers layout.
+    """
+    data_path = os.path.join(data_dir, "diary_data.json")
+    out_dir = tempfile.mkdtemp(prefix="bench_city_")
+    # Without a summary next to it the generator has to read the answers
+    bodies_dir = tempfile.mkdtemp(prefix="bench_bodies_")
+    shutil.copy(data_path, bodies_dir)
+    try:
+        yield "city.generate", measure(lambda _: generate_diary_city.generate(data_path, out_dir), repeat)
+        yield "city.generate_bodies", measure(
+            lambda _: generate_diary_city.generate(os.path.join(bodies_dir, "diary_data.json"), out_dir), repeat)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        shutil.rmtree(bodies_dir, ignore_errors=True)
+
+    with open(data_path, "r") as f:
+        houses = len(json.load(f)["entries"])
+    stargazers = [{"user": {"login": f"user{i}"}, "starred_at": f"2020-01-01T00:00:{i:08d}Z"}
+                  for i in range(houses)]
+    contributors = {f"user{i}" for i in range(0, houses, 10)}
+
+    yield "layout.generate_city_slots", measure(lambda _: fetch_stargazers.generate_city_slots(houses), repeat)
+    yield "layout.generate_houses", measure(
+        lambda _: fetch_stargazers.generate_houses(list(stargazers), contributors, "owner"), repeat)
+
+    def append_all(_):
+        city, roads = [], set()
+        for i in range(houses):
+            fetch_stargazers.append_to_city(city, roads, {"username": f"user{i}"})
+    yield "layout.append_to_city", measure(append_all, repeat)
+
+
+def run_suite(years_list, repeat):
+    results = {}
+    for years in years_list:
+        data_dir = tempfile.mkdtemp(prefix=f"bench_{years}y_")
+        try:
+            write_diary(data_dir, years)
+            for bench in (diary_benchmarks, city_benchmarks):
+                for name, result in bench(data_dir, repeat):
+                    key = f"{name}[{years}y]"
+                    results[key] = result
+                    print(f"  {key:<36} {result['median_ms']:>10.3f} ms")
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns [(name, time, baseline time, ratio, regressed)] for benchmarks in both.
+    time is scaled to the speed the machine had in the baseline run.
+    """
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        speed = result["calibration_ms"] / base.get("calibration_ms", result["calibration_ms"])
+        current, previous = result[COMPARE_KEY] / speed, base[COMPARE_KEY]
+        ratio = current / previous if previous else float("inf")
+        regressed = ratio > threshold and current - previous >= MIN_DELTA_MS
+        rows.append((name, current, previous, ratio, regressed))
+    return rows
+
+
+def main():
+    years_list = DEFAULT_YEARS
+    repeat = DEFAULT_REPEAT
+    threshold = DEFAULT_THRESHOLD
+    baseline_path = DEFAULT_BASELINE
+    output_path = None
+    save_baseline = False
+
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--years":
+            years_list = [int(y) for y in args.pop(0).split(",")]
+        elif arg == "--repeat":
+            repeat = int(args.pop(0))
+        elif arg == "--threshold":
+            threshold = float(args.pop(0))
+        elif arg == "--baseline":
+            baseline_path = args.pop(0)
+        elif arg == "--output":
+            output_path = args.pop(0)
+        elif arg == "--save-baseline":
+            save_baseline = True
+        else:
+            print(__doc__)
+            return 2
+
+    print(f"Running benchmarks for {', '.join(f'{y}y' for y in years_list)} diaries ({repeat} runs each)...")
+    results = run_suite(years_list, repeat)
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {output_path}")
+
+    if save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}, run with --save-baseline to create one.")
+        return 0
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)["results"]
+
+    rows = compare(results, baseline, threshold)
+    regressions = [row for row in rows if row[4]]
+    print(f"\nCompared with {baseline_path} on {COMPARE_KEY}, calibrated (threshold {threshold:.2f}x):")
+    for name, current, previous, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"  {name:<36} {current:>10.3f} ms  baseline {previous:>10.3f} ms  {ratio:>5.2f}x{flag}")
+    missing = set(baseline) - set(results)
+    if missing:
+        print(f"{len(missing)} baseline benchmark(s) not run this time.")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s).")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,7 +30,7 @@ version = 0.1
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy,plyer,mutagen,pyjnius,android
+requirements = python3,kivy,plyer,mutagen,pyjnius,android,pillow
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
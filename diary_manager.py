@@ -1,6 +1,12 @@
+import calendar
 import json
 import os
-from datetime import datetime, timedelta
+import shutil
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from kivy.app import App
 from kivy.utils import platform
 
@@ -17,20 +23,370 @@ try:
 except ImportError:
     generate_diary_city = None
 
+class ReadWriteLock:
+    """
+    Reentrant reader/writer lock: many readers or a single writer.
+    The writing thread may also take read locks. Waiting writers block new
+    readers so saves are not starved. Upgrading a read lock is not allowed.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            depth = getattr(self._local, "depth", 0)
+            # Nested reads, and reads inside our own write, never wait
+            if depth == 0 and self._writer != me:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+            self._readers += 1
+            self._local.depth = depth + 1
+
+    def release_read(self):
+        with self._cond:
+            self._local.depth -= 1
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if getattr(self._local, "depth", 0) > 0:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers > 0:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+# diary_data.json layout. v1 keyed every answer by its question text:
+#   {date: {question: answer, "tags": [...]}}
+# v2 stores each question list once and days refer to it by id:
+#   {"version": 2, "schemas": {id: [questions]},
+#    "entries": {date: {"schema": id, "answers": [...], "tags": [...]}}}
+DATA_VERSION = 2
+LEGACY_BACKUP_SUFFIX = ".v1.bak"
+
+# apply_schema modes: "merge" keeps answers of questions that stay, "keep_answered"
+# also keeps removed questions that were answered, "reset" clears all answers
+SCHEMA_MODES = ("merge", "keep_answered", "reset")
+
+# diary_summary.json: one small row per day, so list views, stats and the city
+# never need the answers. "source" is the (mtime_ns, size) of the data file it
+# was made from, a mismatch means it's rebuilt.
+#   {"version": 1, "source": [mtime_ns, size],
+#    "days": {date: {"preview": str, "chars": n, "words": n, "tags": [...]}}}
+SUMMARY_VERSION = 1
+PREVIEW_CHARS = 160
+
+# What iter_entries can build per day. All but "answers" come from the summaries.
+ENTRY_FIELDS = ("answers", "tags", "preview", "chars", "words")
+
+
+def empty_data():
+    return {"version": DATA_VERSION, "schemas": {}, "entries": {}}
+
+
+def pack_entry(entry, schemas, schema_ids):
+    """
+    Converts a {question: answer, "tags": [...]} dict to a v2 entry. A new
+    question list is added to schemas (id -> questions) and schema_ids
+    (tuple of questions -> id), both are updated in place.
+    """
+    questions = tuple(k for k in entry if k != "tags")
+    schema_id = schema_ids.get(questions)
+    if schema_id is None:
+        schema_id = str(max((int(k) for k in schemas), default=0) + 1)
+        schemas[schema_id] = list(questions)
+        schema_ids[questions] = schema_id
+    packed = {"schema": schema_id, "answers": [entry[q] for q in questions]}
+    if "tags" in entry:
+        packed["tags"] = list(entry["tags"])
+    return packed
+
+
+def unpack_entry(entry, schemas):
+    """
+    Compatibility view of a v2 entry: a new {question: answer, "tags": [...]} dict.
+    """
+    view = dict(zip(schemas.get(entry["schema"], ()), entry["answers"]))
+    if "tags" in entry:
+        view["tags"] = list(entry["tags"])
+    return view
+
+
+def reshape_entry(entry, questions, mode="merge"):
+    """
+    Returns a copy of the {question: answer} dict entry with the given questions.
+    """
+    if mode == "reset":
+        reshaped = {q: "" for q in questions}
+    else:
+        reshaped = {q: entry.get(q, "") for q in questions}
+    if mode == "keep_answered":
+        for q, answer in entry.items():
+            if q != "tags" and q not in reshaped and str(answer).strip():
+                reshaped[q] = answer
+    if "tags" in entry:
+        reshaped["tags"] = list(entry["tags"])
+    return reshaped
+
+
+# Day of year (0-based) of the 1st of each month in a non-leap year
+MONTH_STARTS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+
+def day_of_year(date_str):
+    """
+    Returns (year, 0-based day of year) of a "YYYY-MM-DD" string, without strptime.
+    """
+    year, month, day = int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10])
+    doy = MONTH_STARTS[month - 1] + day - 1
+    if month > 2 and calendar.isleap(year):
+        doy += 1
+    return year, doy
+
+
+def summarize_entry(answers, tags):
+    """
+    Summary row of a day. The preview is the first non-empty answer, like the
+    dashboard always showed it.
+    """
+    preview = ""
+    chars = words = 0
+    for answer in answers:
+        if not isinstance(answer, str):
+            continue
+        chars += len(answer)
+        words += len(answer.split())
+        if not preview and answer.strip():
+            preview = answer.strip()[:PREVIEW_CHARS]
+    return {"preview": preview, "chars": chars, "words": words, "tags": list(tags)}
+
+
+class YearActivity:
+    """
+    One year of the diary by day of year (0 = Jan 1): present is a bitset of
+    the days that have an entry, chars the character count of their answers.
+    """
+    __slots__ = ("year", "present", "chars")
+
+    def __init__(self, year, present=None, chars=None):
+        days = 366 if calendar.isleap(year) else 365
+        self.year = year
+        self.present = present if present is not None else bytearray((days + 7) // 8)
+        self.chars = chars if chars is not None else array("I", bytes(4 * days))
+
+    def __len__(self):
+        return len(self.chars)
+
+    def copy(self):
+        return YearActivity(self.year, bytearray(self.present), array("I", self.chars))
+
+    def has_day(self, doy):
+        return bool(self.present[doy >> 3] >> (doy & 7) & 1)
+
+    def set_day(self, doy, chars):
+        self.present[doy >> 3] |= 1 << (doy & 7)
+        self.chars[doy] = min(chars, 0xFFFFFFFF)
+
+    def clear_day(self, doy):
+        self.present[doy >> 3] &= ~(1 << (doy & 7)) & 0xFF
+        self.chars[doy] = 0
+
+    def days(self):
+        """
+        Yields the day of year of every day with an entry.
+        """
+        for i, byte in enumerate(self.present):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield i * 8 + bit
+
+
+def build_runs(years):
+    """
+    Run-length view of the days with an entry over all years:
+    a sorted list of [first day ordinal, length].
+    """
+    runs = []
+    for year in sorted(years):
+        base = date(year, 1, 1).toordinal()
+        for i, byte in enumerate(years[year].present):
+            if not byte:
+                continue
+            if byte == 0xFF:
+                # A whole byte of days extends (or starts) a run in one go
+                day = base + i * 8
+                if runs and runs[-1][0] + runs[-1][1] == day:
+                    runs[-1][1] += 8
+                else:
+                    runs.append([day, 8])
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    day = base + i * 8 + bit
+                    if runs and runs[-1][0] + runs[-1][1] == day:
+                        runs[-1][1] += 1
+                    else:
+                        runs.append([day, 1])
+    return runs
+
+
+def migrate_data(data):
+    """
+    Returns diary data in the current layout. v1 data is converted, days
+    sharing a question list end up sharing one schema.
+    """
+    if data.get("version") == DATA_VERSION:
+        return data
+    migrated = empty_data()
+    schema_ids = {}
+    for date_str in sorted(data):
+        migrated["entries"][date_str] = pack_entry(data[date_str], migrated["schemas"], schema_ids)
+    return migrated
+
+
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_diary_manager():
+    """
+    Returns the process-wide DiaryManager shared by all screens and services,
+    so they use one lock and one cache for the data files.
+    """
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = DiaryManager()
+        return _shared_manager
+
+
 class DiaryManager:
     RESERVED_KEYS = ["tags"]
 
-    def __init__(self):
-        self.data_dir = self.get_data_dir()
+    def __init__(self, data_dir=None):
+        # data_dir overrides the platform default (e.g. for scripts)
+        self.data_dir = data_dir or self.get_data_dir()
+
+        # All file access goes through this lock. Parsed files are cached
+        # per path and reused until their mtime/size changes on disk.
+        self.lock = ReadWriteLock()
+        # The city is regenerated from the files on disk after self.lock is
+        # released, this only keeps two regenerations from overlapping
+        self._city_lock = threading.Lock()
+        self._cache = {}
+        # (summaries, their sorted dates), see _date_index
+        self._index = (None, [])
+        # (summaries, {year: YearActivity}, runs or None), see _activity_for
+        self._activity = (None, {}, None)
         
         self.DATA_FILE = os.path.join(self.data_dir, "diary_data.json")
+        self.SUMMARY_FILE = os.path.join(self.data_dir, "diary_summary.json")
         self.QUESTIONS_FILE = os.path.join(self.data_dir, "questions.json")
         self.TAGS_FILE = os.path.join(self.data_dir, "tags.json")
         self.CONFIG_FILE = os.path.join(self.data_dir, "user_config.json")
+
+        # Callbacks notified after writes: callback(event, date_str)
+        # event is "entry" (date_str set) or "profile" (date_str None)
+        self.listeners = []
         
         self.ensure_files_exist()
         self.ensure_config_exists()
 
+    def add_listener(self, callback):
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify_listeners(self, event, date_str=None):
+        for callback in list(self.listeners):
+            try:
+                callback(event, date_str)
+            except Exception as e:
+                print(f"DiaryManager listener error: {e}")
+
+    def _read_json(self, path, default):
+        """
+        Returns the parsed contents of path (or default), cached until the file changes.
+        The result is shared: callers must not mutate it, public methods return copies.
+        """
+        with self.lock.read():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return default
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return default
+            self._cache[path] = (stamp, data)
+            return data
+
+    def _write_json(self, path, data, compact=False):
+        """
+        Atomically replaces path with data and caches it. data must not be mutated afterwards.
+        compact drops the indentation, for files that grow with the diary.
+        """
+        with self.lock.write():
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                if compact:
+                    json.dump(data, f, separators=(",", ":"))
+                else:
+                    json.dump(data, f, indent=4)
+            os.replace(tmp_path, path)
+            st = os.stat(path)
+            self._cache[path] = ((st.st_mtime_ns, st.st_size), data)
+
     def get_data_dir(self):
         if platform == 'android':
             app = App.get_running_app()
@@ -41,6 +397,10 @@ class DiaryManager:
         return os.path.dirname(os.path.abspath(__file__))
 
     def ensure_config_exists(self):
+        with self.lock.write():
+            self._ensure_config_exists()
+
+    def _ensure_config_exists(self):
         if not os.path.exists(self.CONFIG_FILE):
              default_config = {
                 "username": "User",
@@ -53,18 +413,23 @@ class DiaryManager:
                 "favorite_music": "",
                 "bio": ""
              }
-             with open(self.CONFIG_FILE, "w") as f:
-                 json.dump(default_config, f, indent=4)
+             self._write_json(self.CONFIG_FILE, default_config)
 
 
     def ensure_files_exist(self):
+        with self.lock.write():
+            self._ensure_files_exist()
+
+    def _ensure_files_exist(self):
         if not os.path.exists(self.DATA_FILE):
-            with open(self.DATA_FILE, "w") as f:
-                json.dump({}, f)
+            self._write_json(self.DATA_FILE, empty_data())
+        elif self._current_summary() is None:
+            # A current summary means the data file is already in this layout,
+            # so startup doesn't have to parse the answers
+            self._migrate_data_file()
         
         if not os.path.exists(self.TAGS_FILE):
-            with open(self.TAGS_FILE, "w") as f:
-                json.dump([], f)
+            self._write_json(self.TAGS_FILE, [])
         
         if not os.path.exists(self.QUESTIONS_FILE):
             # Create default questions if missing
@@ -73,35 +438,165 @@ class DiaryManager:
                 "What challenged you today?",
                 "What are you grateful for?"
             ]
-            with open(self.QUESTIONS_FILE, "w") as f:
-                json.dump(default_questions, f, indent=4)
+            self._write_json(self.QUESTIONS_FILE, default_questions)
+
+    def _migrate_data_file(self):
+        data = self._read_json(self.DATA_FILE, None)
+        if data is None or data.get("version") == DATA_VERSION:
+            return
+        # Keep the old file around, the first migration can't be undone otherwise
+        backup_path = self.DATA_FILE + LEGACY_BACKUP_SUFFIX
+        if not os.path.exists(backup_path):
+            shutil.copy2(self.DATA_FILE, backup_path)
+        self._write_json(self.DATA_FILE, migrate_data(data), compact=True)
+        print(f"Migrated {self.DATA_FILE} to version {DATA_VERSION}")
+
+    def _load_data(self):
+        """
+        Returns the cached diary data in the current layout. Shared, don't mutate.
+        """
+        data = self._read_json(self.DATA_FILE, None)
+        if data is None:
+            return empty_data()
+        if data.get("version") != DATA_VERSION:
+            # Old copy put back while running, rewritten on the next save
+            data = migrate_data(data)
+        return data
+
+    @staticmethod
+    def _file_stamp(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    def _current_summary(self):
+        summary = self._read_json(self.SUMMARY_FILE, None)
+        if (isinstance(summary, dict) and summary.get("version") == SUMMARY_VERSION
+                and summary.get("source") == self._file_stamp(self.DATA_FILE)):
+            return summary
+        return None
+
+    def _write_summaries(self, days):
+        # Right after writing the data file, so source is its new stamp
+        summary = {"version": SUMMARY_VERSION, "source": self._file_stamp(self.DATA_FILE), "days": days}
+        self._write_json(self.SUMMARY_FILE, summary, compact=True)
+        return summary
+
+    def _load_summaries(self):
+        """
+        Returns the cached summary rows {date_str: {"preview", "chars", "words", "tags"}},
+        rebuilt from the data file when missing or out of date. Shared, don't mutate.
+        Don't call with a read lock held (a rebuild needs the write lock).
+        """
+        summary = self._current_summary()
+        if summary is None:
+            with self.lock.write():
+                summary = self._current_summary()
+                if summary is None:
+                    # Written by an older version, or replaced by a copy
+                    self._migrate_data_file()
+                    days = {
+                        date_str: summarize_entry(entry["answers"], entry.get("tags", []))
+                        for date_str, entry in self._load_data()["entries"].items()
+                    }
+                    summary = self._write_summaries(days)
+        return summary["days"]
+
+    def _write_entries(self, data, updates):
+        """
+        Writes data with updates applied: {date_str: entry dict, or None to remove},
+        and the matching summaries.
+        """
+        old_days = self._load_summaries()
+        # The cached dicts are copied, never mutated
+        schemas = dict(data["schemas"])
+        schema_ids = {tuple(questions): schema_id for schema_id, questions in schemas.items()}
+        entries = dict(data["entries"])
+        for date_str, entry in updates.items():
+            if entry is None:
+                entries.pop(date_str, None)
+            else:
+                entries[date_str] = pack_entry(entry, schemas, schema_ids)
+        # Drop schemas no day uses anymore (the file is rewritten whole anyway)
+        used = {entry["schema"] for entry in entries.values()}
+        schemas = {schema_id: q for schema_id, q in schemas.items() if schema_id in used}
+        new_data = {"version": DATA_VERSION, "schemas": schemas, "entries": entries}
+        self._write_json(self.DATA_FILE, new_data, compact=True)
+
+        days = dict(old_days)
+        for date_str, entry in updates.items():
+            if entry is None:
+                days.pop(date_str, None)
+            else:
+                answers = (v for k, v in entry.items() if k != "tags")
+                days[date_str] = summarize_entry(answers, entry.get("tags", []))
+        self._write_summaries(days)
+
+        # Carry the date index over instead of sorting every date again
+        indexed, dates = self._index
+        if indexed is old_days:
+            dates = list(dates)
+            for date_str, entry in updates.items():
+                i = bisect_left(dates, date_str)
+                present = i < len(dates) and dates[i] == date_str
+                if entry is None and present:
+                    del dates[i]
+                elif entry is not None and not present:
+                    dates.insert(i, date_str)
+            self._index = (days, dates)
+
+        # Same for the per-year activity, copying only the years touched
+        indexed, years, _ = self._activity
+        if indexed is old_days:
+            years = dict(years)
+            copied = set()
+            for date_str, entry in updates.items():
+                year, doy = day_of_year(date_str)
+                if year not in copied:
+                    years[year] = years[year].copy() if year in years else YearActivity(year)
+                    copied.add(year)
+                if entry is None:
+                    years[year].clear_day(doy)
+                else:
+                    years[year].set_day(doy, days[date_str]["chars"])
+            self._activity = (days, years, None)
+
+    def _date_index(self, days):
+        """
+        Sorted dates of the summaries days, rebuilt only if days isn't the indexed one.
+        Shared, don't mutate.
+        """
+        indexed, dates = self._index
+        if indexed is not days:
+            dates = sorted(days)
+            self._index = (days, dates)
+        return dates
 
     def load_questions(self):
-        if os.path.exists(self.QUESTIONS_FILE):
-            with open(self.QUESTIONS_FILE, "r") as f:
-                return json.load(f)
-        return []
+        return list(self._read_json(self.QUESTIONS_FILE, []))
 
     def load_entry(self, date_str):
-        if os.path.exists(self.DATA_FILE):
-            try:
-                with open(self.DATA_FILE, "r") as f:
-                    data = json.load(f)
-                    return data.get(date_str, {})
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        data = self._load_data()
+        entry = data["entries"].get(date_str)
+        return unpack_entry(entry, data["schemas"]) if entry else {}
 
     def save_entry(self, date_str, answers):
-        data = {}
-        if os.path.exists(self.DATA_FILE):
-            try:
-                with open(self.DATA_FILE, "r") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = {}
+        with self.lock.write():
+            changed = self._save_entry(date_str, answers)
+        # The city and listeners run outside the lock so they can't stall other threads
+        if changed:
+            self.update_city_visualizer()
+            self.notify_listeners("entry", date_str)
+
+    def _save_entry(self, date_str, answers):
+        """
+        Writes the entry (or removes an empty ghost entry). Returns True if the file changed.
+        """
+        data = self._load_data()
         
-        existing_entry = data.get(date_str, {})
+        existing_entry = data["entries"].get(date_str, {})
         existing_tags = existing_entry.get("tags", [])
         
         full_entry = answers.copy()
@@ -123,19 +618,13 @@ class DiaryManager:
             default_keys = set(defaults)
             
             if answer_keys == default_keys:
-                if date_str in data:
-                    del data[date_str]
-                    with open(self.DATA_FILE, "w") as f:
-                        json.dump(data, f, indent=4)
-                    self.update_city_visualizer()
-                return
+                if date_str in data["entries"]:
+                    self._write_entries(data, {date_str: None})
+                    return True
+                return False
 
-        data[date_str] = full_entry
-        
-        with open(self.DATA_FILE, "w") as f:
-            json.dump(data, f, indent=4)
-
-        self.update_city_visualizer()
+        self._write_entries(data, {date_str: full_entry})
+        return True
 
     def update_city_visualizer(self):
         try:
@@ -146,7 +635,8 @@ class DiaryManager:
                 www_dir = os.path.join(self.data_dir, "GitVille_www")
                 
                 # We generate the data files there.
-                generate_diary_city.generate(self.DATA_FILE, www_dir)
+                with self._city_lock:
+                    generate_diary_city.generate(self.DATA_FILE, www_dir)
             else:
                 print("Generator module not found")
         except Exception as e:
@@ -167,70 +657,245 @@ class DiaryManager:
         """
         Updates the global default questions (questions.json).
         """
-        with open(self.QUESTIONS_FILE, "w") as f:
-            json.dump(questions_list, f, indent=4)
+        self._write_json(self.QUESTIONS_FILE, list(questions_list))
 
     def overwrite_entry_schema(self, date_str, questions_list):
         """
         Overwrites the questions for a specific day while trying to preserve answers.
         """
-        current_data = self.load_entry(date_str)
-        new_data = {}
-        # Preserve tags
-        if "tags" in current_data:
-            new_data["tags"] = current_data["tags"]
-            
-        for q in questions_list:
-            new_data[q] = current_data.get(q, "")
-        self.save_entry(date_str, new_data)
+        self.apply_schema((date_str, date_str), questions_list, create_missing=True)
+
+    def apply_schema(self, date_range, questions, mode="merge", create_missing=False, dry_run=False):
+        """
+        Gives every day in date_range the question list questions, with one write
+        and one city update. date_range is (start, end), inclusive "YYYY-MM-DD"
+        strings, None leaves a side open. Days without an entry are skipped unless
+        create_missing is set and both ends are given. See SCHEMA_MODES for mode.
+
+        Returns the impact: {"changed": [dates], "created": [dates],
+        "removed": [dates], "dropped_answers": n}. dry_run only reports.
+        """
+        if mode not in SCHEMA_MODES:
+            raise ValueError(f"Unknown schema mode: {mode}")
+        start, end = date_range
+        questions = list(questions)
+        report = {"changed": [], "created": [], "removed": [], "dropped_answers": 0}
+        updates = {}
+
+        with self.lock.write():
+            data = self._load_data()
+            schemas = data["schemas"]
+            entries = data["entries"]
+
+            dates = {d for d in entries if (start is None or d >= start) and (end is None or d <= end)}
+            if create_missing and start and end:
+                day = start
+                while day <= end:
+                    dates.add(day)
+                    day = self.get_date_offset(day, 1)
+
+            defaults = set(self.load_questions())
+            for date_str in sorted(dates):
+                entry = entries.get(date_str)
+                current = unpack_entry(entry, schemas) if entry else {}
+                reshaped = reshape_entry(current, questions, mode)
+                if list(reshaped.items()) == list(current.items()):
+                    continue
+
+                report["dropped_answers"] += sum(
+                    1 for q, answer in current.items()
+                    if q != "tags" and str(answer).strip() and reshaped.get(q) != answer
+                )
+
+                # Same ghost rule as _save_entry: empty days on the defaults aren't stored
+                has_content = reshaped.get("tags") or any(
+                    str(v).strip() for k, v in reshaped.items() if k != "tags"
+                )
+                if not has_content and set(reshaped) - {"tags"} == defaults:
+                    if entry:
+                        updates[date_str] = None
+                        report["removed"].append(date_str)
+                    continue
+
+                updates[date_str] = reshaped
+                report["changed" if entry else "created"].append(date_str)
+
+            if updates and not dry_run:
+                self._write_entries(data, updates)
+
+        if updates and not dry_run:
+            self.update_city_visualizer()
+            for date_str in updates:
+                self.notify_listeners("entry", date_str)
+        return report
 
     def get_all_entries(self):
         """
         Returns the entire dictionary of entries {date_str: {question: answer}}.
         """
-        if os.path.exists(self.DATA_FILE):
-            try:
-                with open(self.DATA_FILE, "r") as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        data = self._load_data()
+        schemas = data["schemas"]
+        return {date_str: unpack_entry(entry, schemas) for date_str, entry in data["entries"].items()}
+
+
+    def _activity_for(self, days):
+        """
+        Returns ({year: YearActivity}, runs) for the summaries days, built once
+        per version of the data. Shared, don't mutate.
+        """
+        indexed, years, runs = self._activity
+        if indexed is not days:
+            years = {}
+            for date_str, row in days.items():
+                year, doy = day_of_year(date_str)
+                if year not in years:
+                    years[year] = YearActivity(year)
+                years[year].set_day(doy, row["chars"])
+            runs = None
+        if runs is None:
+            runs = build_runs(years)
+        self._activity = (days, years, runs)
+        return years, runs
+
+    def get_year_activity(self, year):
+        """
+        Returns a YearActivity (a copy) with presence and character count per day of year.
+        """
+        years, _ = self._activity_for(self._load_summaries())
+        return years[year].copy() if year in years else YearActivity(year)
+
+    def get_streaks(self, today=None):
+        """
+        Returns (current, longest) count of consecutive days with an entry.
+        The current streak counts back from today, or from yesterday if today
+        has no entry yet.
+        """
+        _, runs = self._activity_for(self._load_summaries())
+        if not runs:
+            return 0, 0
+        longest = max(length for _, length in runs)
+
+        today = (today or date.today()).toordinal()
+        current = 0
+        for day in (today, today - 1):
+            # Last run starting on or before day
+            i = bisect_right(runs, [day, float("inf")]) - 1
+            if i >= 0 and runs[i][0] + runs[i][1] > day:
+                current = day - runs[i][0] + 1
+                break
+        return current, longest
+
+    def get_weekday_counts(self):
+        """
+        Returns the number of entries per weekday, Monday first.
+        """
+        years, _ = self._activity_for(self._load_summaries())
+        counts = [0] * 7
+        for year, activity in years.items():
+            jan1 = calendar.weekday(year, 1, 1)
+            for doy in activity.days():
+                counts[(jan1 + doy) % 7] += 1
+        return counts
+
+    def get_dashboard_stats(self, today=None):
+        """
+        Numbers for the dashboard stat cards, from the summaries only:
+        {"total", "streak", "longest_streak", "weekday_counts" (Monday first), "words"}.
+        """
+        days = self._load_summaries()
+        streak, longest = self.get_streaks(today)
+        return {
+            "total": len(days),
+            "streak": streak,
+            "longest_streak": longest,
+            "weekday_counts": self.get_weekday_counts(),
+            "words": sum(row["words"] for row in days.values()),
+        }
 
+    def count_entries(self):
+        return len(self._load_summaries())
+
+    def get_summary(self, date_str):
+        """
+        Returns a copy of the day's summary row, or None if the day has no entry.
+        """
+        row = self._load_summaries().get(date_str)
+        if row is None:
+            return None
+        row = dict(row)
+        row["tags"] = list(row["tags"])
+        return row
+
+    def iter_entries(self, start=None, end=None, reverse=False, fields=ENTRY_FIELDS):
+        """
+        Yields (date_str, {field: value}) for the days from start to end, oldest
+        first (newest first with reverse). start/end are inclusive "YYYY-MM-DD"
+        strings, None leaves a side open. fields picks what is built per day,
+        see ENTRY_FIELDS. Only days inside the window are visited, so a year
+        view or islice(..., 3) stays cheap, and the answers file is only read
+        if "answers" is asked for.
+        Iterates a snapshot, writes made meanwhile are not seen.
+        """
+        fields = tuple(fields)
+        for field in fields:
+            if field not in ENTRY_FIELDS:
+                raise ValueError(f"Unknown entry field: {field}")
+
+        days = self._load_summaries()
+        dates = self._date_index(days)
+        if "answers" in fields:
+            data = self._load_data()
+            schemas = data["schemas"]
+            entries = data["entries"]
+
+        lo = bisect_left(dates, start) if start else 0
+        hi = bisect_right(dates, end) if end else len(dates)
+        window = range(hi - 1, lo - 1, -1) if reverse else range(lo, hi)
+
+        for i in window:
+            date_str = dates[i]
+            summary = days[date_str]
+            row = {}
+            for field in fields:
+                if field == "answers":
+                    entry = entries.get(date_str)
+                    row["answers"] = dict(zip(schemas.get(entry["schema"], ()), entry["answers"])) if entry else {}
+                elif field == "tags":
+                    row["tags"] = list(summary["tags"])
+                else:
+                    row[field] = summary[field]
+            yield date_str, row
 
     def load_questions_for_date(self, date_str):
         """
         Determines the questions to display for a given date.
-        - If data exists for that date, return its keys (legacy/historic mode), excluding reserved keys.
+        - If data exists for that date, return the questions of its schema (historic mode).
         - If no data, return current global defaults.
         """
-        entry = self.load_entry(date_str)
-        if entry and len(entry) > 0:
-            # Filter out reserved keys
-            keys = [k for k in entry.keys() if k not in self.RESERVED_KEYS]
-            if keys:
-                return keys
-        return self.load_questions()
+        with self.lock.read():
+            data = self._load_data()
+            entry = data["entries"].get(date_str)
+            questions = data["schemas"].get(entry["schema"]) if entry else None
+            if questions:
+                return list(questions)
+            return self.load_questions()
 
     def get_tags(self, date_str):
-        entry = self.load_entry(date_str)
-        return entry.get("tags", [])
+        row = self._load_summaries().get(date_str)
+        return list(row["tags"]) if row else []
 
     def save_tags(self, date_str, tags_list):
-        data = {}
-        if os.path.exists(self.DATA_FILE):
-            try:
-                with open(self.DATA_FILE, "r") as f:
-                    data = json.load(f)
-            except:
-                data = {}
-        
-        if date_str not in data:
-            data[date_str] = {}
+        with self.lock.write():
+            self._save_tags(date_str, tags_list)
+        self.notify_listeners("entry", date_str)
+
+    def _save_tags(self, date_str, tags_list):
+        data = self._load_data()
+        entry = self.load_entry(date_str)
         
-        data[date_str]["tags"] = tags_list
+        entry["tags"] = list(tags_list)
         
         # Verify emptiness for cleanup
-        entry = data[date_str]
         all_empty = True
         
         if entry.get("tags"): # If tags list is not empty
@@ -247,36 +912,30 @@ class DiaryManager:
              defaults = self.load_questions()
              keys = [k for k in entry.keys() if k != "tags"]
              if set(keys) == set(defaults):
-                 if date_str in data:
-                    del data[date_str]
+                 self._write_entries(data, {date_str: None})
+                 return
         
-        with open(self.DATA_FILE, "w") as f:
-            json.dump(data, f, indent=4)
+        self._write_entries(data, {date_str: entry})
 
     def load_global_tags(self):
-        if os.path.exists(self.TAGS_FILE):
-            try:
-                with open(self.TAGS_FILE, "r") as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        return list(self._read_json(self.TAGS_FILE, []))
 
     def save_global_tags(self, tags_list):
-        with open(self.TAGS_FILE, "w") as f:
-            json.dump(tags_list, f, indent=4)
+        self._write_json(self.TAGS_FILE, list(tags_list))
 
     def add_global_tag(self, tag_text):
-        tags = self.load_global_tags()
-        if tag_text not in tags:
-            tags.append(tag_text)
-            self.save_global_tags(tags)
+        with self.lock.write():
+            tags = self.load_global_tags()
+            if tag_text not in tags:
+                tags.append(tag_text)
+                self.save_global_tags(tags)
 
     def remove_global_tag(self, tag_text):
-        tags = self.load_global_tags()
-        if tag_text in tags:
-            tags.remove(tag_text)
-            self.save_global_tags(tags)
+        with self.lock.write():
+            tags = self.load_global_tags()
+            if tag_text in tags:
+                tags.remove(tag_text)
+                self.save_global_tags(tags)
 
     def search_entries(self, query):
         """
@@ -287,14 +946,14 @@ class DiaryManager:
         if not query:
             return []
             
-        all_data = self.get_all_entries()
+        # Read only, no need for copies
+        data = self._load_data()
+        schemas = data["schemas"]
         results = []
         
-        for date_str, entries in all_data.items():
-            # Check matches in answers
-            for q, ans in entries.items():
-                if q == "tags": continue # Skip checking tags for now, or maybe include them?
-                
+        for date_str, entry in data["entries"].items():
+            # Check matches in answers (tags are kept outside the answers)
+            for q, ans in zip(schemas.get(entry["schema"], ()), entry["answers"]):
                 if isinstance(ans, str) and query in ans.lower():
                     results.append({
                         'date': date_str,
@@ -307,17 +966,12 @@ class DiaryManager:
         return results
 
     def get_user_profile(self):
-        if os.path.exists(self.CONFIG_FILE):
-            try:
-                with open(self.CONFIG_FILE, "r") as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
+        return dict(self._read_json(self.CONFIG_FILE, {}))
 
     def save_user_profile(self, profile_data):
-        current_data = self.get_user_profile()
-        current_data.update(profile_data)
-        with open(self.CONFIG_FILE, "w") as f:
-            json.dump(current_data, f, indent=4)
+        with self.lock.write():
+            current_data = self.get_user_profile()
+            current_data.update(profile_data)
+            self._write_json(self.CONFIG_FILE, current_data)
+        self.notify_listeners("profile")
 
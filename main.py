@@ -3,8 +3,9 @@ from kivy.lang import Builder
 from kivy.core.window import Window
 import screens
 import widgets
-from kivy.clock import Clock
 from notification_service import NotificationService
+from profile_store import get_profile_store
+from audio_service import get_audio_service
 
 from kivy.utils import platform
 
@@ -52,14 +53,29 @@ class MainApp(App):
         Window.bind(on_keyboard=self.hook_keyboard)
         try:
             # Start Notification Service
+            # Uses the shared DiaryManager, so saves reschedule the reminders
             self.notification_service = NotificationService()
-            # Check every minute (60 seconds)
-            Clock.schedule_interval(self.notification_service.check_and_notify, 60)
-            # Check immediately once
-            self.notification_service.check_and_notify()
+            self.notification_service.start()
         except Exception as e:
             print(f"Failed to start notification service: {e}")
 
+    def on_pause(self):
+        # Android may kill a paused app, write pending profile edits first
+        get_profile_store().flush()
+        # Kivy has no memory pressure hook, releasing on pause stands in for it:
+        # background apps are the first to be trimmed, don't hold decoded audio
+        get_audio_service().release()
+        return True
+
+    def on_stop(self):
+        get_profile_store().flush()
+
+    def on_resume(self):
+        # The clock doesn't run while paused, recompute the next reminder
+        if getattr(self, "notification_service", None):
+            self.notification_service.reschedule()
+        return True
+
     def hook_keyboard(self, window, key, *args):
         # Key 27 is Escape/Back on Android
         if key == 27:
@@ -2,8 +2,10 @@
 # Common imports are assumed to be in screens.py already or will be added.
 # New imports for Web Server
 import http.server
+import json
 import socketserver
 import threading
+import time
 import os
 import shutil
 from kivy.utils import platform
@@ -11,6 +13,7 @@ from kivy.app import App
 from kivy.core.window import Window
 from kivy.lang import Builder
 from kivy.uix.screenmanager import Screen
+from server_metrics import ServerMetrics
 
 # Load KV
 Builder.load_file("map_screen.kv")
@@ -19,6 +22,18 @@ Builder.load_file("map_screen.kv")
 PORT = 8080
 SERVER_STARTED = False
 
+# Opt-in request metrics, served as JSON on /__metrics (set GITVILLE_METRICS=1)
+METRICS_ENABLED = os.environ.get("GITVILLE_METRICS", "") == "1"
+METRICS_PATH = "/__metrics"
+SERVER_METRICS = ServerMetrics()
+
+# Opt-in performance HUD in the city viewer (set GITVILLE_HUD=1).
+# Tapping the HUD uploads a JSON frame trace to /__trace, saved in GitVille_www/traces.
+PERF_HUD_ENABLED = os.environ.get("GITVILLE_HUD", "") == "1"
+TRACE_PATH = "/__trace"
+TRACE_DIR_NAME = "traces"
+MAX_TRACE_BYTES = 5 * 1024 * 1024
+
 def setup_www_dir():
     # 1. Determine Bundle Directory (Source)
     # On Android, this is where the APK extracts assets
@@ -89,12 +104,93 @@ def start_local_server():
         def log_message(self, format, *args):
             pass # Silence logs
 
+        def handle(self):
+            if not METRICS_ENABLED:
+                super().handle()
+                return
+            SERVER_METRICS.connection_opened()
+            try:
+                super().handle()
+            finally:
+                SERVER_METRICS.connection_closed()
+
+        def handle_one_request(self):
+            self._status = None
+            self._bytes_sent = 0
+            started = time.perf_counter()
+            super().handle_one_request()
+            # _status stays None when the client closed without sending a request
+            if METRICS_ENABLED and self._status is not None:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                SERVER_METRICS.record(getattr(self, "path", "-"), self._status, self._bytes_sent, elapsed_ms)
+
+        def send_response(self, code, message=None):
+            self._status = code
+            super().send_response(code, message)
+
+        def send_header(self, keyword, value):
+            if keyword.lower() == "content-length" and self.command != "HEAD":
+                self._bytes_sent += int(value)
+            super().send_header(keyword, value)
+
+        def do_GET(self):
+            if METRICS_ENABLED and self.path.split("?", 1)[0] == METRICS_PATH:
+                body = SERVER_METRICS.to_json().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            super().do_GET()
+
+        def do_POST(self):
+            if not (PERF_HUD_ENABLED and self.path.split("?", 1)[0] == TRACE_PATH):
+                self.send_error(404)
+                return
+
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                self.send_error(400, "Invalid Content-Length")
+                return
+            if length <= 0 or length > MAX_TRACE_BYTES:
+                self.send_error(413 if length > 0 else 411)
+                return
+            try:
+                trace = json.loads(self.rfile.read(length))
+            except ValueError:
+                self.send_error(400, "Trace is not valid JSON")
+                return
+
+            trace_dir = os.path.join(web_dir, TRACE_DIR_NAME)
+            os.makedirs(trace_dir, exist_ok=True)
+            name = time.strftime("trace-%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}.json"
+            with open(os.path.join(trace_dir, name), "w") as f:
+                json.dump(trace, f, indent=2)
+
+            body = json.dumps({"saved": f"{TRACE_DIR_NAME}/{name}"}).encode()
+            self.send_response(201)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    class ThreadedServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+        # Allow reuse address to prevent "Address already in use" on restarts
+        allow_reuse_address = True
+        # The WebView requests several files at once, don't queue them behind each other
+        daemon_threads = True
+
     def serve():
         try:
-             # Allow reuse address to prevent "Address already in use" on restarts
-            socketserver.TCPServer.allow_reuse_address = True
-            with socketserver.TCPServer(("", PORT), Handler) as httpd:
+            with ThreadedServer(("", PORT), Handler) as httpd:
                 print(f"Local Server running at http://localhost:{PORT}")
+                if METRICS_ENABLED:
+                    print(f"Server metrics at http://localhost:{PORT}{METRICS_PATH}")
+                if PERF_HUD_ENABLED:
+                    print(f"Perf HUD traces are saved to {os.path.join(web_dir, TRACE_DIR_NAME)}")
                 httpd.serve_forever()
         except OSError as e:
             print(f"Server error (Port {PORT} maybe in use): {e}")
@@ -181,6 +277,8 @@ class CityMapScreen(Screen):
     def on_enter(self):
         start_local_server()
         url = f"http://localhost:{PORT}/index.html"
+        if PERF_HUD_ENABLED:
+            url += "?hud=1"
         
         if platform == 'android':
             if create_webview:
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from kivy.clock import Clock
+
+# Music Metadata
+try:
+    import mutagen
+    from mutagen.mp3 import MP3
+    from mutagen.id3 import ID3, APIC
+except ImportError:
+    mutagen = None
+
+MUSIC_CACHE_DIR_NAME = "music_cache"
+INDEX_FILE_NAME = "index.json"
+COVERS_DIR_NAME = "covers"
+
+_shared_metadata = None
+_shared_metadata_lock = threading.Lock()
+
+
+def get_music_metadata():
+    """
+    Returns the process-wide MusicMetadataCache, stored in the diary data dir.
+    """
+    global _shared_metadata
+    with _shared_metadata_lock:
+        if _shared_metadata is None:
+            from diary_manager import get_diary_manager
+            data_dir = get_diary_manager().data_dir
+            _shared_metadata = MusicMetadataCache(os.path.join(data_dir, MUSIC_CACHE_DIR_NAME))
+        return _shared_metadata
+
+
+def fallback_metadata(path):
+    return {"title": os.path.basename(path), "artist": "Unknown Artist", "cover": ""}
+
+
+class MusicMetadataCache:
+    """
+    Title, artist and cover art of music files, read with mutagen on a worker
+    thread. Results are cached by (path, size, mtime) in index.json, covers
+    are stored once per image content under covers/<sha1>.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.covers_dir = os.path.join(cache_dir, COVERS_DIR_NAME)
+        self.index_path = os.path.join(cache_dir, INDEX_FILE_NAME)
+        self.lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        os.makedirs(self.covers_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        # Called with self.lock held
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _key(path):
+        st = os.stat(path)
+        return f"{path}|{st.st_size}|{st.st_mtime_ns}"
+
+    def cached(self, path):
+        try:
+            key = self._key(path)
+        except OSError:
+            return None
+        with self.lock:
+            meta = self._index.get(key)
+        # The cover may have been cleaned up with the app cache
+        if meta and meta["cover"] and not os.path.exists(meta["cover"]):
+            return None
+        return dict(meta) if meta else None
+
+    def request(self, path, callback):
+        """
+        Calls callback(metadata) on the main thread with a dict of title, artist
+        and cover (image path or ""). Called synchronously on a cache hit.
+        """
+        meta = self.cached(path)
+        if meta is not None:
+            callback(meta)
+            return
+        self._executor.submit(self._extract_and_deliver, path, callback)
+
+    def _extract_and_deliver(self, path, callback):
+        try:
+            meta = self.extract(path)
+            key = self._key(path)
+            with self.lock:
+                self._index[key] = meta
+                self._save_index()
+        except Exception as e:
+            print(f"Metadata error: {e}")
+            meta = fallback_metadata(path)
+        Clock.schedule_once(lambda dt: callback(dict(meta)))
+
+    def extract(self, path):
+        if not mutagen:
+            return fallback_metadata(path)
+
+        try:
+            audio = MP3(path, ID3=ID3)
+        except Exception as e:
+            print(f"Metadata error: {e}")
+            return fallback_metadata(path)
+
+        meta = {
+            "title": str(audio['TIT2']) if 'TIT2' in audio else os.path.basename(path).replace('.mp3', ''),
+            "artist": str(audio['TPE1']) if 'TPE1' in audio else "Unknown Artist",
+            "cover": "",
+        }
+        for tag in (audio.tags or {}).values():
+            if isinstance(tag, APIC):
+                meta["cover"] = self._store_cover(tag.data, tag.mime)
+                break
+        return meta
+
+    def _store_cover(self, data, mime):
+        ext = ".png" if mime == "image/png" else ".jpg"
+        cover_path = os.path.join(self.covers_dir, hashlib.sha1(data).hexdigest() + ext)
+        # Same artwork on every track of an album: written once
+        if not os.path.exists(cover_path):
+            tmp_path = f"{cover_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as img:
+                img.write(data)
+            os.replace(tmp_path, cover_path)
+        return cover_path
@@ -1,54 +1,142 @@
 from plyer import notification
-from datetime import datetime
-from diary_manager import DiaryManager
+from datetime import datetime, timedelta
+from diary_manager import get_diary_manager
+from kivy.clock import Clock
 from kivy.utils import platform
 
+MORNING_REMINDER = "09:00"
+# Evening reminder when the profile has no custom reminder (daily_reminder off)
+DEFAULT_NIGHT_REMINDER = "21:00"
+# A reminder is still sent this long after its slot (e.g. app opened at 9:20)
+REMINDER_GRACE = timedelta(hours=1)
+
+
+def parse_time(value, fallback):
+    """
+    Parses "HH:MM" into (hour, minute), returns fallback's value if invalid.
+    """
+    try:
+        hour, minute = (int(p) for p in str(value).split(":", 1))
+        if 0 <= hour < 24 and 0 <= minute < 60:
+            return hour, minute
+    except ValueError:
+        pass
+    return parse_time(fallback, "00:00")
+
+
 class NotificationService:
-    def __init__(self):
+    """
+    Sends the morning and evening diary reminders.
+
+    Instead of polling, the next reminder instant is computed from the
+    profile and a single clock event is scheduled for it. The schedule is
+    recomputed when an entry or the profile is saved.
+    clock (needs schedule_once) and now (returns a datetime) can be
+    injected for testing.
+    """
+
+    def __init__(self, dm=None, clock=None, now=None):
+        self.dm = dm if dm is not None else get_diary_manager()
+        self.clock = clock if clock is not None else Clock
+        self.now = now if now is not None else datetime.now
+        self.event = None
+        self.last_notified_morning = ""
+        self.last_notified_night = ""
+
+    def start(self):
+        self.dm.add_listener(self.on_data_changed)
+        self.reschedule()
+
+    def stop(self):
+        self.dm.remove_listener(self.on_data_changed)
+        self.cancel()
+
+    def cancel(self):
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+
+    def on_data_changed(self, event, date_str=None):
+        # Writing today's entry or changing the reminder settings moves the next reminder
+        if event == "profile" or date_str == self.now().strftime("%Y-%m-%d"):
+            self.reschedule()
+
+    def reminder_slots(self):
+        """
+        Returns [(kind, (hour, minute)), ...] for one day, based on the profile.
+        """
+        profile = self.dm.get_user_profile()
+        if profile.get("daily_reminder"):
+            night = parse_time(profile.get("reminder_time"), DEFAULT_NIGHT_REMINDER)
+        else:
+            night = parse_time(DEFAULT_NIGHT_REMINDER, DEFAULT_NIGHT_REMINDER)
+        morning = parse_time(MORNING_REMINDER, MORNING_REMINDER)
+        return sorted([("morning", morning), ("night", night)], key=lambda slot: slot[1])
+
+    def next_reminder(self):
+        """
+        Returns (when, kind) of the next reminder to send, or None.
+        Today's remaining slots are skipped once today's entry is written.
+        """
+        now = self.now()
+        today_str = now.strftime("%Y-%m-%d")
+        slots = self.reminder_slots()
+        written_today = self.has_content(today_str)
+
+        for day in (0, 1):
+            date = (now + timedelta(days=day)).date()
+            date_str = date.strftime("%Y-%m-%d")
+            if day == 0 and written_today:
+                continue
+            for kind, (hour, minute) in slots:
+                when = datetime(date.year, date.month, date.day, hour, minute)
+                if when + REMINDER_GRACE <= now:
+                    continue
+                if self.already_notified(kind, date_str):
+                    continue
+                return max(when, now), kind
+        return None
+
+    def reschedule(self, *args):
         try:
-            self.dm = DiaryManager()
-            self.last_notified_morning = ""
-            self.last_notified_night = ""
+            self.cancel()
+            upcoming = self.next_reminder()
+            if upcoming is None:
+                return
+            when, kind = upcoming
+            delay = max(0.0, (when - self.now()).total_seconds())
+            self.event = self.clock.schedule_once(lambda dt: self.fire(kind), delay)
         except Exception as e:
-            print(f"NotificationService Update Error: {e}")
+            print(f"Notification scheduling error: {e}")
 
-    def check_and_notify(self, dt=None):
+    def fire(self, kind):
+        self.event = None
         try:
-            # Current time
-            now = datetime.now()
-            current_hour = now.hour
-            today_str = now.strftime("%Y-%m-%d")
-
-            # Check if entry exists for today
-            entry = self.dm.load_entry(today_str)
-            
-            # Determine if entry is "written" (has meaningful content)
-            # Entry is a dict. If empty or all values are empty string -> not written.
-            # We ignore 'tags' if present alone.
-            has_content = False
-            for key, value in entry.items():
-                if key != "tags" and str(value).strip():
-                    has_content = True
-                    break
-            
-            if has_content:
-                return # Already written!
-
-            # Morning Reminder (9 AM)
-            if current_hour == 9:
-                # Check if we already notified today for morning
-                if self.last_notified_morning != today_str:
+            today_str = self.now().strftime("%Y-%m-%d")
+            # Entry may have been written by other means since scheduling
+            if not self.has_content(today_str) and not self.already_notified(kind, today_str):
+                if kind == "morning":
                     self.send_morning_notification()
                     self.last_notified_morning = today_str
-
-            # Night Reminder (9 PM or 10 PM)
-            elif current_hour in [21, 22]: # 9 PM or 10 PM
-                # Check if we already notified today for night
-                if self.last_notified_night != today_str:
+                else:
                     self.send_night_notification()
                     self.last_notified_night = today_str
         except Exception as e:
-             print(f"Notification service error: {e}")
+            print(f"Notification service error: {e}")
+        self.reschedule()
+
+    def already_notified(self, kind, date_str):
+        if kind == "morning":
+            return self.last_notified_morning == date_str
+        return self.last_notified_night == date_str
+
+    def has_content(self, date_str):
+        # Entry is "written" if any answer is non-empty. We ignore 'tags'.
+        entry = self.dm.load_entry(date_str)
+        for key, value in entry.items():
+            if key != "tags" and str(value).strip():
+                return True
+        return False
 
     def send_morning_notification(self):
         self.send_notification(
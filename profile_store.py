@@ -0,0 +1,101 @@
+import threading
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+from kivy.properties import StringProperty, BooleanProperty
+from diary_manager import get_diary_manager
+
+# Edits within this many seconds (e.g. typing a bio) are written together
+WRITE_DELAY = 0.5
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_profile_store():
+    """
+    Returns the process-wide ProfileStore. Create it on the main thread.
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ProfileStore(get_diary_manager())
+        return _shared_store
+
+
+class ProfileStore(EventDispatcher):
+    """
+    In-memory copy of user_config.json with a Kivy property per field.
+    update() changes the properties right away and schedules one write
+    for everything changed since the last write. Bind to the properties
+    instead of re-reading the profile.
+    """
+    username = StringProperty("User")
+    joined_date = StringProperty("")
+    bio = StringProperty("")
+    favorite_music = StringProperty("")
+    profile_pic = StringProperty("")
+    favorite_photo = StringProperty("")
+    music_path = StringProperty("")
+    music_title = StringProperty("Unknown Title")
+    music_artist = StringProperty("Unknown Artist")
+    music_cover = StringProperty("")
+    daily_reminder = BooleanProperty(False)
+    reminder_time = StringProperty("")
+    theme_mode = StringProperty("dark")
+
+    def __init__(self, dm, **kwargs):
+        super().__init__(**kwargs)
+        self.dm = dm
+        self._data = {}
+        self._pending = {}
+        self._writing = False
+        self._write_trigger = Clock.create_trigger(self.flush, WRITE_DELAY)
+        self.reload()
+        # Picks up writes that don't go through the store
+        dm.add_listener(self.on_data_changed)
+
+    def reload(self):
+        self._data = self.dm.get_user_profile()
+        self._data.update(self._pending)
+        self._apply(self._data)
+
+    def _apply(self, fields):
+        for key, value in fields.items():
+            if key in self.properties() and value is not None:
+                setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def to_dict(self):
+        return dict(self._data)
+
+    def update(self, fields):
+        """
+        Applies a change set. Fields that didn't change are not written.
+        """
+        changed = {k: v for k, v in fields.items() if self._data.get(k) != v}
+        if not changed:
+            return
+        self._data.update(changed)
+        self._pending.update(changed)
+        self._apply(changed)
+        self._write_trigger()
+
+    def flush(self, *args):
+        """
+        Writes pending changes now, in a single save.
+        """
+        self._write_trigger.cancel()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._writing = True
+        try:
+            self.dm.save_user_profile(pending)
+        finally:
+            self._writing = False
+
+    def on_data_changed(self, event, date_str):
+        if event == "profile" and not self._writing:
+            Clock.schedule_once(lambda dt: self.reload())
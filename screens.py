@@ -9,15 +9,18 @@ from kivy.uix.modalview import ModalView
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.metrics import dp
-from diary_manager import DiaryManager
+from diary_manager import get_diary_manager
 from widgets import DiaryEntryItemCard, QuestionEditItem, BottomNavBar, NavButton, StatCard, RecentEntryItem, HeatmapCell, TagChip, ChecklistItem, SearchResultItem
+import calendar
 from datetime import datetime, timedelta
+from itertools import islice
 from map_screen import CityMapScreen
 import os
 from kivy.utils import platform
 from plyer import filechooser
 from kivy.clock import mainthread
-from kivy.core.audio import SoundLoader
+from kivy.core.window import Window
+from thumbnails import get_thumbnail_cache, cover_size
 # Fallback for desktop testing if plyer has issues or for specific behaviors
 if platform != 'android':
     try:
@@ -30,19 +33,15 @@ else:
     tk = None
     filedialog = None
 import shutil
-# Music Metadata
-try:
-    import mutagen
-    from mutagen.mp3 import MP3
-    from mutagen.id3 import ID3, APIC, TIT2, TPE1
-except ImportError:
-    mutagen = None
+from music_metadata import get_music_metadata
+from profile_store import get_profile_store
+from audio_service import get_audio_service
 
 
 
 
 # Initialize Data Manager
-dm = DiaryManager()
+dm = get_diary_manager()
 
 class WindowManager(ScreenManager):
     pass
@@ -67,33 +66,26 @@ class HomeDashboard(Screen):
         # 0. Greeting
         self.update_greeting()
 
-        # 1. Fetch Data
-        all_data = dm.get_all_entries()
+        # 1. Update Stats
+        self.calculate_stats()
         
-        # 2. Update Stats
-        self.calculate_stats(all_data)
+        # 3. Heatmap (reads only the shown year)
+        self.populate_heatmap()
         
-        # 3. Heatmap
-        self.populate_heatmap(all_data)
-        
-        # 4. Recent Entries
-        self.populate_recent_entries(all_data)
+        # 4. Recent Entries (reads only the newest days)
+        self.populate_recent_entries()
 
         # 5. Write Now Prompter Logic
         today_str = datetime.now().strftime("%Y-%m-%d")
-        today_data = all_data.get(today_str, {})
-        self.update_prompter(today_data)
+        self.update_prompter(dm.get_summary(today_str))
 
-    def update_prompter(self, today_data):
+    def update_prompter(self, today_summary):
         if 'write_now_card' not in self.ids: return
         card = self.ids.write_now_card
         
         # Check if entry is effectively empty
-        # If today_data is empty dict OR all values are empty strings
-        is_empty = True
-        if today_data:
-             if any(v.strip() for v in today_data.values()):
-                 is_empty = False
+        # No entry, or no answer with text (the preview is the first one)
+        is_empty = not today_summary or not today_summary["preview"]
         
         if is_empty:
             # Show Prompter
@@ -130,17 +122,14 @@ class HomeDashboard(Screen):
         if 'greeting_label' in self.ids:
             self.ids.greeting_label.text = greeting
 
-    def populate_recent_entries(self, all_data):
+    def populate_recent_entries(self):
         if 'recent_list' not in self.ids: return
         
         container = self.ids.recent_list
         container.clear_widgets()
         
-        # Sort dates descending
-        sorted_dates = sorted(all_data.keys(), reverse=True)
-        
-        # Take top 3
-        top_3 = sorted_dates[:3]
+        # Newest 3 days, walked backwards on the date index
+        top_3 = list(islice(dm.iter_entries(reverse=True, fields=("preview",)), 3))
         
         if not top_3:
             # Show a placeholder or just leave empty?
@@ -148,14 +137,9 @@ class HomeDashboard(Screen):
             # But for now, just empty is fine or a specific widget
             pass
 
-        for date_str in top_3:
-            entry_data = all_data[date_str]
-            # Find the first non-empty answer to preview
-            preview = "No text..."
-            for q, ans in entry_data.items():
-                if ans.strip():
-                    preview = ans.strip()
-                    break
+        for date_str, row in top_3:
+            # First non-empty answer, kept in the summary
+            preview = row["preview"] or "No text..."
             
             # Format Date: "Jan 10"
             dt = datetime.strptime(date_str, "%Y-%m-%d")
@@ -167,36 +151,18 @@ class HomeDashboard(Screen):
             item.date_ref = date_str
             container.add_widget(item)
 
-    def calculate_stats(self, all_data):
-        # Sort dates
-        sorted_dates = sorted(all_data.keys())
-        total_entries = len(all_data)
-        
-        # Streak
-        streak = 0
-        if sorted_dates:
-            today = datetime.now().date()
-            # Check backwards from today or yesterday
-            # Convert keys to date objs
-            dates_set = {datetime.strptime(d, "%Y-%m-%d").date() for d in sorted_dates}
-            
-            check_date = today
-            if check_date not in dates_set:
-                # If no entry today, check if streak ended yesterday
-                check_date = today - timedelta(days=1)
-            
-            while check_date in dates_set:
-                streak += 1
-                check_date -= timedelta(days=1)
+    def calculate_stats(self):
+        stats = dm.get_dashboard_stats()
+        total_entries = stats["total"]
+        
+        # Streak: from the manager's runs of consecutive days
+        streak = stats["streak"]
 
         # Most Active Day
         # Count entries per weekday
-        weekday_counts = {i: 0 for i in range(7)}
-        for d_str in all_data:
-            dt = datetime.strptime(d_str, "%Y-%m-%d")
-            weekday_counts[dt.weekday()] += 1
+        weekday_counts = stats["weekday_counts"]
         
-        most_active_idx = max(weekday_counts, key=weekday_counts.get)
+        most_active_idx = max(range(7), key=weekday_counts.__getitem__)
         days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
         most_active_day = days[most_active_idx] if total_entries > 0 else "N/A"
 
@@ -213,11 +179,7 @@ class HomeDashboard(Screen):
             self.ids.stat_active.ids.val_label.text = most_active_day
 
         # New Stat: Total Words
-        total_words = 0
-        for date_key, questions_dict in all_data.items():
-            for ans in questions_dict.values():
-                if isinstance(ans, str):
-                    total_words += len(ans.split())
+        total_words = stats["words"]
         
         if 'stat_words' in self.ids:
             self.ids.stat_words.value = str(total_words)
@@ -276,10 +238,9 @@ class HomeDashboard(Screen):
 
     def change_heatmap_year(self, offset):
         self.heatmap_year += offset
-        all_data = dm.get_all_entries()
-        self.populate_heatmap(all_data)
+        self.populate_heatmap()
 
-    def populate_heatmap(self, all_data):
+    def populate_heatmap(self):
         heatmap = self.ids.heatmap_container
         heatmap.clear_widgets()
         
@@ -320,6 +281,8 @@ class HomeDashboard(Screen):
         current_year = self.heatmap_year
         start_date = datetime(current_year, 1, 1).date()
         end_date = datetime(current_year, 12, 31).date()
+        # Presence and character count per day of year
+        activity = dm.get_year_activity(current_year)
         
         # Calculate how many weeks roughly needed.
         # But we build dynamically:
@@ -333,6 +296,7 @@ class HomeDashboard(Screen):
         jan1_weekday_idx = (start_date.weekday() + 1) % 7
         
         current = start_date
+        doy = 0
         # We need to iterate weeks.
         
         # But iterating by weeks is tricky if we want exact year boundaries.
@@ -359,7 +323,7 @@ class HomeDashboard(Screen):
         # Loop strictly through the year
         while current <= end_date:
             # Check Month Change
-            m = current.strftime("%b")
+            m = calendar.month_abbr[current.month]
             
             if m != last_month:
                 if last_month is not None:
@@ -410,10 +374,8 @@ class HomeDashboard(Screen):
                 day_in_week_count = weekday_idx
 
             # --- Cell Logic ---
-            date_str = current.strftime("%Y-%m-%d")
-            answers = all_data.get(date_str, {})
-            char_count = sum(len(v) for v in answers.values())
-            color = self.get_color_for_activity(char_count)
+            date_str = f"{current_year}-{current.month:02d}-{current.day:02d}"
+            color = self.get_color_for_activity(activity.chars[doy])
             
             cell = HeatmapCell()
             cell.color_val = color
@@ -430,6 +392,7 @@ class HomeDashboard(Screen):
                 day_in_week_count = 0
             
             current += timedelta(days=1)
+            doy += 1
             
         # Finish last week if partial
         if day_in_week_count > 0:
@@ -674,7 +637,12 @@ class CalendarViewScreen(Screen):
         container = self.ids.calendar_container
         container.clear_widgets()
         
-        all_data = dm.get_all_entries()
+        # Presence per day of year, tags only when filtering
+        activity = dm.get_year_activity(self.target_year)
+        year_tags = {}
+        if self.filter_tags:
+            year_tags = dict(dm.iter_entries(f"{self.target_year}-01-01", f"{self.target_year}-12-31", fields=("tags",)))
+        doy = 0
         
         # We'll render 12 months for self.target_year
         months = ["January", "February", "March", "April", "May", "June", 
@@ -723,10 +691,10 @@ class CalendarViewScreen(Screen):
             # Days
             current_d = start_date
             for _ in range(days_in_month):
-                d_str = current_d.strftime("%Y-%m-%d")
+                d_str = f"{self.target_year}-{m_idx:02d}-{current_d.day:02d}"
                 
                 # Check Data
-                has_entry = d_str in all_data
+                has_entry = activity.has_day(doy)
                 
                 # Colors
                 # Green: (0.137, 0.525, 0.211, 1) or similar accent
@@ -738,7 +706,7 @@ class CalendarViewScreen(Screen):
                      txt_color = (1, 1, 1, 1)
 
                      if self.filter_tags:
-                        entry_tags = all_data.get(d_str, {}).get("tags", [])
+                        entry_tags = year_tags[d_str]["tags"]
                         # Check intersection (AND logic: ALL filter tags must be present)
                         if all(tag in entry_tags for tag in self.filter_tags):
                             # Highlight Matched
@@ -752,6 +720,7 @@ class CalendarViewScreen(Screen):
                 grid.add_widget(cell)
                 
                 current_d += timedelta(days=1)
+                doy += 1
                 
             container.add_widget(grid)
             
@@ -839,21 +808,41 @@ class QuestionEditorScreen(Screen):
             self.questions.remove(q_text)
             self.populate_list()
 
+    @staticmethod
+    def describe_impact(report):
+        days = len(report["changed"]) + len(report["created"]) + len(report["removed"])
+        text = f"{days} day" if days == 1 else f"{days} days"
+        dropped = report["dropped_answers"]
+        if dropped:
+            text += f", {dropped} answer{'s' if dropped != 1 else ''} removed"
+        return text
+
     def prompt_save(self):
+        # Dry runs, so the buttons can tell what each choice changes. Both of the
+        # first two only touch the edited day.
+        today_impact = dm.apply_schema((self.date_target, self.date_target), self.questions,
+                                       create_missing=True, dry_run=True)
+        later_impact = dm.apply_schema((self.date_target, None), self.questions,
+                                       mode="keep_answered", dry_run=True)
+
         # Show Modal
-        view = ModalView(size_hint=(0.9, 0.4), auto_dismiss=True)
+        view = ModalView(size_hint=(0.9, 0.5), auto_dismiss=True)
         layout = BoxLayout(orientation='vertical', padding=20, spacing=20)
         
         layout.add_widget(Label(text="Apply Changes to?", font_size='18sp', bold=True))
         
-        btn_today = Button(text="Apply for Today Only\n(Resets today's answers)", halign='center', background_normal='', background_color=(0.2, 0.6, 0.8, 1))
+        btn_today = Button(text=f"Apply for Today Only\n({self.describe_impact(today_impact)})", halign='center', background_normal='', background_color=(0.2, 0.6, 0.8, 1))
         btn_today.bind(on_release=lambda x: self.save_today(view))
         
-        btn_future = Button(text="Apply from Today Onward\n(Updates defaults)", halign='center', background_normal='', background_color=(0.2, 0.8, 0.2, 1))
+        btn_future = Button(text=f"Apply from Today Onward\n(Updates defaults for new days, {self.describe_impact(today_impact)})", halign='center', background_normal='', background_color=(0.2, 0.8, 0.2, 1))
         btn_future.bind(on_release=lambda x: self.save_future(view))
         
+        btn_later = Button(text=f"Rewrite Written Days from Today...\n({self.describe_impact(later_impact)}, answers kept)", halign='center', background_normal='', background_color=(0.8, 0.5, 0.2, 1))
+        btn_later.bind(on_release=lambda x: self.confirm_rewrite_later(view, later_impact))
+        
         layout.add_widget(btn_today)
         layout.add_widget(btn_future)
+        layout.add_widget(btn_later)
         
         view.add_widget(layout)
         view.open()
@@ -867,17 +856,42 @@ class QuestionEditorScreen(Screen):
         view.dismiss()
         dm.save_questions_default(self.questions)
         
-        # Smart Merge for Today:
-        # We want the new schema to apply to today immediately.
-        # But we must preserve answers for questions that still exist.
-        current_data = dm.load_entry(self.date_target)
-        new_entry_data = {}
-        for q in self.questions:
-            # Preserve existing answer if available, else empty
-            new_entry_data[q] = current_data.get(q, "")
-            
-        # We overwrite today's entry with the new schema + preserved answers
-        dm.save_entry(self.date_target, new_entry_data)
+        # Smart Merge for Today: the new schema applies to the edited day right away,
+        # answers to questions that still exist are kept. New days get the defaults.
+        dm.apply_schema((self.date_target, self.date_target), self.questions, create_missing=True)
+        
+        self.go_back()
+
+    def confirm_rewrite_later(self, view, report):
+        # Rewriting many days is only done after the user saw what it changes
+        view.dismiss()
+        confirm = ModalView(size_hint=(0.9, 0.4), auto_dismiss=True)
+        layout = BoxLayout(orientation='vertical', padding=20, spacing=20)
+        
+        layout.add_widget(Label(
+            text=f"Rewrite {self.describe_impact(report)} from {self.date_target} on?\n"
+                 "Answers to removed questions are kept.",
+            halign='center'))
+        
+        buttons = BoxLayout(spacing=20)
+        btn_cancel = Button(text="Cancel", background_normal='', background_color=(0.5, 0.5, 0.5, 1))
+        btn_cancel.bind(on_release=lambda x: confirm.dismiss())
+        btn_rewrite = Button(text="Rewrite", background_normal='', background_color=(0.8, 0.5, 0.2, 1))
+        btn_rewrite.bind(on_release=lambda x: self.save_later(confirm))
+        buttons.add_widget(btn_cancel)
+        buttons.add_widget(btn_rewrite)
+        layout.add_widget(buttons)
+        
+        confirm.add_widget(layout)
+        confirm.open()
+
+    def save_later(self, view):
+        view.dismiss()
+        dm.save_questions_default(self.questions)
+        
+        # Every written day from the edited one on, answers that no longer have
+        # a question stay. One write for all of them.
+        dm.apply_schema((self.date_target, None), self.questions, mode="keep_answered")
         
         self.go_back()
 
@@ -963,6 +977,10 @@ class TagSelectionModal(ModalView):
         dm.save_tags(self.date_str, self.current_tags)
 
 
+# Display sizes of the profile images in diary.kv
+AVATAR_SIZE_DP = 120
+COVER_HEIGHT_DP = 180
+
 class ProfileScreen(Screen):
     username = StringProperty("")
     joined_date = StringProperty("")
@@ -977,121 +995,102 @@ class ProfileScreen(Screen):
     music_artist = StringProperty("Unknown Artist")
     music_cover = StringProperty("")
     is_playing = BooleanProperty(False)
-    current_sound = None
 
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pfp_request = None
+        self._photo_request = None
+        # The store keeps the profile in memory, its properties drive this screen
+        store = get_profile_store()
+        store.bind(
+            username=self.setter('username'),
+            joined_date=lambda store, value: setattr(self, 'joined_date', "Member since " + value),
+            bio=self.setter('bio'),
+            favorite_music=self.setter('fav_music'),
+            music_path=self.setter('music_path'),
+            music_title=self.setter('music_title'),
+            music_artist=self.setter('music_artist'),
+            music_cover=self.setter('music_cover'),
+            profile_pic=lambda *args: self.load_images(),
+            favorite_photo=lambda *args: self.load_images(),
+        )
+        get_audio_service().bind(is_playing=self.setter('is_playing'))
+
     def on_enter(self, *args):
         self.load_profile()
+        # Open the track in the background so the play button starts it instantly
+        get_audio_service().preload(self.music_path)
 
     def on_leave(self, *args):
-        # Stop music when leaving screen
-        if self.current_sound:
-            self.current_sound.stop()
-        self.is_playing = False
+        # Stop music when leaving screen and free the loaded track
+        get_audio_service().release()
+        get_profile_store().flush()
 
     def load_profile(self):
-        data = dm.get_user_profile()
-        self.username = data.get("username", "User")
-        self.joined_date = "Member since " + data.get("joined_date", "")
-        self.bio = data.get("bio", "")
-        self.fav_music = data.get("favorite_music", "")
-        self.music_path = data.get("music_path", "")
-        self.music_title = data.get("music_title", "Unknown Title")
-        self.music_artist = data.get("music_artist", "Unknown Artist")
-        self.music_cover = data.get("music_cover", "")
-        
-        pfp = data.get("profile_pic", "")
-        # Use a fallback if empty or file doesn't exist (though exist check is better done in kv or just fail silently)
-        self.pfp_source = pfp if pfp and os.path.exists(pfp) else "assets/default_avatar.png" 
-        
-        photo = data.get("favorite_photo", "")
-        self.fav_photo_source = photo if photo and os.path.exists(photo) else "assets/placeholder_photo.png"
+        store = get_profile_store()
+        self.username = store.username
+        self.joined_date = "Member since " + store.joined_date
+        self.bio = store.bio
+        self.fav_music = store.favorite_music
+        self.music_path = store.music_path
+        self.music_title = store.music_title
+        self.music_artist = store.music_artist
+        self.music_cover = store.music_cover
+        self.load_images()
+
+    def load_images(self):
+        # Photos are shown through downsampled thumbnails, decoded off the UI thread.
+        # Only a changed path is looked at again.
+        store = get_profile_store()
+        thumbs = get_thumbnail_cache()
+        pfp = store.profile_pic
+        if pfp != self._pfp_request:
+            self._pfp_request = pfp
+            if pfp and os.path.exists(pfp):
+                size = (dp(AVATAR_SIZE_DP), dp(AVATAR_SIZE_DP))
+                thumbs.request(pfp, size, lambda thumb: self._set_thumbnail('pfp_source', '_pfp_request', pfp, thumb))
+            else:
+                self.pfp_source = "assets/default_avatar.png"
+        
+        photo = store.favorite_photo
+        if photo != self._photo_request:
+            self._photo_request = photo
+            if photo and os.path.exists(photo):
+                size = cover_size(Window.width, dp(COVER_HEIGHT_DP))
+                thumbs.request(photo, size, lambda thumb: self._set_thumbnail('fav_photo_source', '_photo_request', photo, thumb))
+            else:
+                self.fav_photo_source = "assets/placeholder_photo.png"
+
+    def _set_thumbnail(self, prop, request_attr, path, thumb):
+        # Ignore thumbnails for a photo that has been replaced in the meantime
+        if getattr(self, request_attr, None) == path:
+            setattr(self, prop, thumb)
 
     def save_field(self, field, value):
-        dm.save_user_profile({field: value})
-        self.load_profile() # Reload to propagate changes
+        # Bound properties update right away, the file is written once per batch of edits
+        get_profile_store().update({field: value})
 
     def toggle_music(self):
-        if self.is_playing:
-            if self.current_sound:
-                self.current_sound.stop()
-            self.is_playing = False
-        else:
-            if self.music_path and os.path.exists(self.music_path):
-                # Unload previous to be safe
-                if self.current_sound:
-                    self.current_sound.unload()
-                
-                try:
-                    self.current_sound = SoundLoader.load(self.music_path)
-                    if self.current_sound:
-                        self.current_sound.play()
-                        self.is_playing = True
-                        self.current_sound.bind(on_stop=self.stop_playback_ui)
-                    else:
-                        print("Could not load sound file.")
-                except Exception as e:
-                    print(f"Error playing sound: {e}")
-            else:
-                 print("No music path or file missing")
-
-    def stop_playback_ui(self, *args):
-        self.is_playing = False
-
-    def extract_music_metadata(self, path):
-        if not mutagen:
+        if not self.is_playing and not (self.music_path and os.path.exists(self.music_path)):
+            print("No music path or file missing")
             return
-        
-        try:
-            audio = MP3(path, ID3=ID3)
-            
-            # Extract Title
-            if 'TIT2' in audio:
-                self.music_title = str(audio['TIT2'])
-                self.save_field('music_title', self.music_title)
-            else:
-                self.music_title = os.path.basename(path).replace('.mp3', '')
-                self.save_field('music_title', self.music_title)
-                
-            # Extract Artist
-            if 'TPE1' in audio:
-                self.music_artist = str(audio['TPE1'])
-                self.save_field('music_artist', self.music_artist)
-            else:
-                self.music_artist = "Unknown Artist"
-                self.save_field('music_artist', self.music_artist)
-
-            # Extract Cover Art
-            cover_found = False
-            for tag in audio.tags.values():
-                if isinstance(tag, APIC):
-                    # Save cover
-                    cover_data = tag.data
-                    cover_name = f"cover_{os.path.basename(path)}.jpg"
-                    # Ensure assets/cache exists
-                    cache_dir = os.path.join("assets", "cache")
-                    if not os.path.exists(cache_dir):
-                        os.makedirs(cache_dir)
-                    
-                    cover_path = os.path.join(cache_dir, cover_name)
-                    with open(cover_path, 'wb') as img:
-                        img.write(cover_data)
-                    
-                    self.music_cover = cover_path
-                    self.save_field('music_cover', cover_path)
-                    cover_found = True
-                    break
-            
-            if not cover_found:
-                self.music_cover = ""
-                self.save_field('music_cover', "")
+        get_audio_service().toggle(self.music_path)
 
-        except Exception as e:
-            print(f"Metadata error: {e}")
-            # Fallback
-            self.music_title = os.path.basename(path)
-            self.music_artist = "Unknown Artist"
-            self.music_cover = ""
+    def apply_music_metadata(self, path, meta):
+        # A newer track may have been picked while this one was being read
+        if self.music_path != path:
+            return
+        self.music_title = meta["title"]
+        self.music_artist = meta["artist"]
+        self.music_cover = meta["cover"]
+        # One write for the track and all its metadata
+        get_profile_store().update({
+            'music_path': path,
+            'music_title': meta["title"],
+            'music_artist': meta["artist"],
+            'music_cover': meta["cover"],
+        })
 
     def choose_image(self, field_name):
         # Wrapper for backward compatibility or specific image call
@@ -1130,6 +1129,7 @@ class ProfileScreen(Screen):
                 except:
                     pass
 
+    @mainthread
     def _on_selection(self, selection):
         if not selection:
             return
@@ -1137,13 +1137,15 @@ class ProfileScreen(Screen):
         path = selection[0]
         print(f"Selected: {path}")
         
+        # If music, read the metadata on a worker first and save everything together
+        if self.current_field == 'music_path':
+            self.music_path = path
+            get_audio_service().preload(path)
+            get_music_metadata().request(path, lambda meta: self.apply_music_metadata(path, meta))
+            return
+
         # Save field
         self.save_field(self.current_field, path)
-        
-        # If music, trigger metadata extraction
-        if self.current_field == 'music_path':
-            # Run extraction in rough way (better in thread but ok for now)
-            self.extract_music_metadata(path)
 
 
 class MusicPlayerCard(BoxLayout):
@@ -0,0 +1,143 @@
+"""
+Load test for the embedded city map server (map_screen.start_local_server).
+
+Start the app with GITVILLE_METRICS=1, open the Map tab once so the server is
+running, then:
+
+    python server_load_test.py [base_url] [clients] [requests_per_client]
+
+Each client fetches the files the viewer loads, in a loop. Every other round is
+sent as a conditional request (If-Modified-Since) like a browser revalidating
+its cache. The server side /__metrics snapshot is printed at the end if enabled.
+"""
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_URL = "http://localhost:8080"
+DEFAULT_CLIENTS = 8
+DEFAULT_REQUESTS = 50
+
+PATHS = [
+    "/index.html",
+    "/script.js",
+    "/particles.js",
+    "/clouds.js",
+    "/npc.js",
+    "/npc_worker.js",
+    "/houses.json",
+    "/roads.json",
+    "/world.json",
+]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[idx]
+
+
+def run_client(base_url, count, results, lock):
+    latencies = []
+    statuses = {}
+    bytes_read = 0
+    errors = 0
+    last_modified = {}
+
+    for i in range(count):
+        path = PATHS[i % len(PATHS)]
+        headers = {}
+        # Revalidate every other round trip over the file list
+        if (i // len(PATHS)) % 2 == 1 and path in last_modified:
+            headers["If-Modified-Since"] = last_modified[path]
+
+        req = urllib.request.Request(base_url + path, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=10) as response:
+                body = response.read()
+                status = response.status
+                bytes_read += len(body)
+                if response.headers.get("Last-Modified"):
+                    last_modified[path] = response.headers["Last-Modified"]
+        except urllib.error.HTTPError as e:
+            # 304 Not Modified is raised as an HTTPError by urllib
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            errors += 1
+            status = "error"
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[status] = statuses.get(status, 0) + 1
+
+    with lock:
+        results["latencies"].extend(latencies)
+        results["bytes"] += bytes_read
+        results["errors"] += errors
+        for status, n in statuses.items():
+            results["status"][status] = results["status"].get(status, 0) + n
+
+
+def fetch_metrics(base_url):
+    try:
+        with urllib.request.urlopen(base_url + "/__metrics", timeout=5) as response:
+            return json.loads(response.read().decode())
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def main():
+    base_url = sys.argv[1].rstrip("/") if len(sys.argv) > 1 else DEFAULT_URL
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CLIENTS
+    per_client = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_REQUESTS
+
+    print(f"Load testing {base_url} with {clients} clients x {per_client} requests...")
+
+    results = {"latencies": [], "bytes": 0, "errors": 0, "status": {}}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=run_client, args=(base_url, per_client, results, lock))
+        for _ in range(clients)
+    ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(results["latencies"])
+    total = len(latencies)
+    print(f"Requests:    {total} in {wall:.2f}s ({total / wall:.1f} req/s)")
+    print(f"Transferred: {results['bytes'] / 1024:.1f} KiB ({results['bytes'] / 1024 / wall:.1f} KiB/s)")
+    print(f"Errors:      {results['errors']}")
+    print(f"Status:      {results['status']}")
+    if latencies:
+        print(
+            "Latency ms:  "
+            f"p50={percentile(latencies, 0.50):.2f} "
+            f"p90={percentile(latencies, 0.90):.2f} "
+            f"p99={percentile(latencies, 0.99):.2f} "
+            f"max={latencies[-1]:.2f}"
+        )
+
+    metrics = fetch_metrics(base_url)
+    if metrics is None:
+        print("Server metrics not available (start the app with GITVILLE_METRICS=1).")
+        return
+
+    print("\nServer metrics:")
+    print(f"  peak connections: {metrics['connections']['peak']}")
+    print(f"  cache hit ratio:  {metrics['cache']['hit_ratio']}")
+    for path, stats in metrics["paths"].items():
+        lat = stats["latency_ms"]
+        print(f"  {path:<16} {stats['requests']:>6} req {stats['bytes'] / 1024:>9.1f} KiB  "
+              f"avg={lat['avg']}ms p95<={lat['p95']}ms")
+
+
+if __name__ == "__main__":
+    main()
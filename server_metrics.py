@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+
+# Upper bounds (ms) of the latency histogram buckets. The last bucket is open ended.
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class PathStats:
+    def __init__(self):
+        self.requests = 0
+        self.bytes_sent = 0
+        self.status_counts = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+
+    def record(self, status, nbytes, elapsed_ms):
+        self.requests += 1
+        self.bytes_sent += nbytes
+        key = str(status)
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+
+        self.latency_total_ms += elapsed_ms
+        if elapsed_ms > self.latency_max_ms:
+            self.latency_max_ms = elapsed_ms
+
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.latency_buckets[i] += 1
+                break
+        else:
+            self.latency_buckets[-1] += 1
+
+    def to_dict(self):
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes_sent,
+            "status": dict(self.status_counts),
+            "latency_ms": {
+                "avg": round(self.latency_total_ms / self.requests, 3) if self.requests else 0,
+                "max": round(self.latency_max_ms, 3),
+                "p50": round(self.percentile(0.50), 3),
+                "p95": round(self.percentile(0.95), 3),
+                "histogram": dict(zip(labels, self.latency_buckets)),
+            },
+        }
+
+    def percentile(self, q):
+        """
+        Estimates a latency percentile from the histogram (upper bound of the bucket).
+        """
+        if not self.requests:
+            return 0.0
+        target = q * self.requests
+        seen = 0
+        for i, count in enumerate(self.latency_buckets):
+            seen += count
+            if seen >= target:
+                if i < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[i])
+                return self.latency_max_ms
+        return self.latency_max_ms
+
+
+class ServerMetrics:
+    """
+    Thread-safe request counters for the embedded web server.
+    Served as JSON on /__metrics when metrics are enabled.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.paths = {}
+        self.total = PathStats()
+        self.active_connections = 0
+        self.peak_connections = 0
+        # A 304 (Not Modified) answer to a conditional GET counts as a cache hit,
+        # a full 200 body as a miss.
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def connection_opened(self):
+        with self.lock:
+            self.active_connections += 1
+            if self.active_connections > self.peak_connections:
+                self.peak_connections = self.active_connections
+
+    def connection_closed(self):
+        with self.lock:
+            self.active_connections -= 1
+
+    def record(self, path, status, nbytes, elapsed_ms):
+        # Strip query strings, the viewer busts caches with "?t=<timestamp>"
+        path = (path or "-").split("?", 1)[0]
+        with self.lock:
+            stats = self.paths.get(path)
+            if stats is None:
+                stats = self.paths[path] = PathStats()
+            stats.record(status, nbytes, elapsed_ms)
+            self.total.record(status, nbytes, elapsed_ms)
+
+            if status == 304:
+                self.cache_hits += 1
+            elif status == 200:
+                self.cache_misses += 1
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.cache_hits + self.cache_misses
+            uptime = time.time() - self.started_at
+            return {
+                "uptime_s": round(uptime, 1),
+                "requests_per_s": round(self.total.requests / uptime, 3) if uptime > 0 else 0,
+                "connections": {
+                    "active": self.active_connections,
+                    "peak": self.peak_connections,
+                },
+                "cache": {
+                    "hits": self.cache_hits,
+                    "misses": self.cache_misses,
+                    "hit_ratio": round(self.cache_hits / lookups, 4) if lookups else 0,
+                },
+                "total": self.total.to_dict(),
+                "paths": {p: s.to_dict() for p, s in sorted(self.paths.items())},
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
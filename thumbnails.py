@@ -0,0 +1,192 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from kivy.clock import Clock
+
+# Pillow is optional, without it the original image is shown as before
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+THUMBNAIL_DIR_NAME = "thumbnails"
+MAX_CACHE_BYTES = 20 * 1024 * 1024  # Oldest thumbnails are evicted beyond this
+JPEG_QUALITY = 85
+WIDTH_STEP = 256  # Cover widths are rounded up to this, so window resizes reuse thumbnails
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """
+    Returns the process-wide ThumbnailCache, stored in the diary data dir.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            from diary_manager import get_diary_manager
+            data_dir = get_diary_manager().data_dir
+            _shared_cache = ThumbnailCache(os.path.join(data_dir, THUMBNAIL_DIR_NAME))
+        return _shared_cache
+
+
+def cover_size(width, height):
+    """
+    Pixel size for an image shown at width x height with fit_mode "cover".
+    """
+    width = int(-(-width // WIDTH_STEP) * WIDTH_STEP)
+    return width, int(height)
+
+
+class ThumbnailCache:
+    """
+    Downsampled copies of user picked photos, decoded once on a worker thread.
+    Files are named after the source content hash and the target size, so the
+    same photo picked twice (or copied) shares its thumbnails.
+    """
+
+    def __init__(self, cache_dir, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # (path, mtime_ns, size) -> content hash, so files are hashed once per run
+        self._hashes = {}
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def request(self, path, size, callback):
+        """
+        Calls callback(thumbnail_path) on the main thread once a thumbnail of at
+        least size (w, h) pixels exists. Called synchronously on a cache hit.
+        Falls back to the original path if Pillow is missing or decoding fails.
+        """
+        if Image is None:
+            callback(path)
+            return
+
+        size = (int(size[0]), int(size[1]))
+        thumb = self.cached_path(path, size)
+        if thumb:
+            callback(thumb)
+            return
+
+        key = (path, size)
+        with self.lock:
+            callbacks = self._pending.get(key)
+            if callbacks is not None:
+                callbacks.append(callback)
+                return
+            self._pending[key] = [callback]
+        self._executor.submit(self._build, path, size)
+
+    def cached_path(self, path, size):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self.lock:
+            digest = self._hashes.get((path, st.st_mtime_ns, st.st_size))
+        if digest is None:
+            return None
+        for ext in (".jpg", ".png"):
+            thumb = self._thumb_path(digest, size, ext)
+            if os.path.exists(thumb):
+                self._touch(thumb)
+                return thumb
+        return None
+
+    def _thumb_path(self, digest, size, ext):
+        return os.path.join(self.cache_dir, f"{digest}_{size[0]}x{size[1]}{ext}")
+
+    def _hash_file(self, path):
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self.lock:
+            digest = self._hashes.get(key)
+        if digest is None:
+            h = hashlib.sha1()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            with self.lock:
+                self._hashes[key] = digest
+        return digest
+
+    def _build(self, path, size):
+        result = path
+        try:
+            digest = self._hash_file(path)
+            for ext in (".jpg", ".png"):
+                existing = self._thumb_path(digest, size, ext)
+                if os.path.exists(existing):
+                    self._touch(existing)
+                    result = existing
+                    break
+            else:
+                result = self._render(path, digest, size)
+                self._evict()
+        except Exception as e:
+            print(f"Thumbnail error for {path}: {e}")
+
+        with self.lock:
+            callbacks = self._pending.pop((path, size), [])
+
+        def deliver(dt):
+            for callback in callbacks:
+                callback(result)
+        Clock.schedule_once(deliver)
+
+    def _render(self, path, digest, size):
+        with Image.open(path) as img:
+            # Lets the JPEG decoder skip most of the pixels of big photos
+            img.draft("RGB", (size[0] * 2, size[1] * 2))
+            img = ImageOps.exif_transpose(img)
+
+            # Scale so the image still covers size, never upscale
+            scale = min(1.0, max(size[0] / img.width, size[1] / img.height))
+            target = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            if target != img.size:
+                img = img.resize(target, Image.LANCZOS)
+
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            ext = ".png" if has_alpha else ".jpg"
+            thumb = self._thumb_path(digest, size, ext)
+            tmp_path = thumb + ".tmp"
+            if has_alpha:
+                img.save(tmp_path, "PNG", optimize=True)
+            else:
+                img.convert("RGB").save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        os.replace(tmp_path, thumb)
+        return thumb
+
+    def _touch(self, thumb):
+        # mtime doubles as last use for eviction
+        try:
+            os.utime(thumb)
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            full = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, full))
+            total += st.st_size
+
+        entries.sort()
+        while total > self.max_bytes and len(entries) > 1:
+            _, nbytes, full = entries.pop(0)
+            try:
+                os.remove(full)
+                total -= nbytes
+            except OSError:
+                pass